@@ -9,13 +9,13 @@ project_dir = os.path.abspath(".")
 
 datas = [('custom_rules.json', '.'), ('app_icon.ico', '.'), ('app_icon.png', '.')]
 binaries = []
-hiddenimports = ['app_config', 'organizer', 'history', 'rules', 'scheduler', 'watchdog']
+hiddenimports = ['app_config', 'organizer', 'history', 'rules', 'matcher', 'scanner', 'executor', 'transfer', 'dedup', 'plan', 'watcher', 'scheduler', 'watchdog']
 # rules_ui is a single file, not a package, so we don't need collect_all
 
 
 
 a = Analysis(
-    ['gui.py', 'app_config.py', 'organizer.py', 'history.py', 'rules.py', 'scheduler.py'],
+    ['gui.py', 'app_config.py', 'organizer.py', 'history.py', 'rules.py', 'matcher.py', 'scanner.py', 'executor.py', 'transfer.py', 'dedup.py', 'plan.py', 'watcher.py', 'scheduler.py'],
     pathex=[project_dir],
     binaries=binaries,
     datas=datas,
@@ -46,6 +46,9 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 # Define paths for data files
 HISTORY_FILE = DATA_DIR / "organizer_history.json"
+
+# History storage backend: "journal" (append-only JSONL files) or "sqlite"
+HISTORY_BACKEND = os.environ.get("SFO_HISTORY_BACKEND", "journal")
 CUSTOM_RULES_FILE = DATA_DIR / "custom_rules.json"
 
 def initialize_data():
@@ -0,0 +1,109 @@
+"""
+Benchmark for keyword rule classification.
+
+Compares the legacy path (re-reading custom_rules.json on every call)
+against the cached RuleStore on a synthetic list of filenames, per-file
+classify_file against batched classify_many, and keyword matcher backends
+on an enlarged rule set.
+
+Usage:
+    python benchmarks/bench_rules.py [--count N] [--keywords K]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rules import (  # noqa: E402
+    KEYWORD_RULES, NUMPY_AVAILABLE, load_custom_rules, get_rule_store, classify_file, classify_many
+)
+from matcher import create_matcher  # noqa: E402
+
+WORDS = ["holiday", "draft", "final", "copy", "new", "scan", "export", "data", "notes", "misc"]
+EXTENSIONS = [".pdf", ".jpg", ".txt", ".xyz", ".log", ".bin", ".md", ".csv"]
+
+
+def make_names(count: int, seed: int = 42) -> list:
+    """Build a reproducible list of synthetic filenames, ~half with keywords."""
+    rng = random.Random(seed)
+    keywords = list(KEYWORD_RULES)
+    names = []
+    for i in range(count):
+        parts = [rng.choice(WORDS), str(i)]
+        if rng.random() < 0.5:
+            parts.insert(rng.randint(0, 2), rng.choice(keywords))
+        names.append("_".join(parts) + rng.choice(EXTENSIONS))
+    return names
+
+
+def legacy_classify_by_rules(filename: str):
+    """The pre-RuleStore implementation, kept here for comparison."""
+    filename_lower = filename.lower()
+    for keyword, category in load_custom_rules().items():
+        if keyword in filename_lower:
+            return category
+    for keyword, category in KEYWORD_RULES.items():
+        if keyword in filename_lower:
+            return category
+    return None
+
+
+def run(label: str, func, names: list) -> float:
+    """Time func over names and print classifications per second."""
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    elapsed = time.perf_counter() - start
+    rate = len(names) / elapsed if elapsed else float("inf")
+    print(f"{label:<12} {len(names):>9} names  {elapsed:8.3f}s  {rate:>12,.0f} /s")
+    return rate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark keyword rule classification")
+    parser.add_argument("--count", type=int, default=200_000, help="Number of synthetic names")
+    parser.add_argument("--keywords", type=int, default=10_000, help="Rule set size for backend comparison")
+    args = parser.parse_args()
+
+    names = make_names(args.count)
+    store = get_rule_store()
+    store.refresh(force=True)
+
+    # Sanity check: both paths must agree before we compare speed
+    sample = names[:1000]
+    assert [legacy_classify_by_rules(n) for n in sample] == [store.match(n) for n in sample]
+
+    before = run("before", legacy_classify_by_rules, names)
+    after = run("after", store.match, names)
+    print(f"speedup: {after / before:.1f}x")
+
+    # Whole-listing classification: per-file call chain vs one batch
+    print("\nclassify_file vs classify_many:")
+    run("per-file", lambda n: classify_file(n, Path(n).suffix), names)
+    for use_numpy in ((False, True) if NUMPY_AVAILABLE else (False,)):
+        label = "batch-numpy" if use_numpy else "batch"
+        start = time.perf_counter()
+        classify_many(names, use_numpy=use_numpy)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12} {len(names):>9} names  {elapsed:8.3f}s  {len(names) / elapsed:>12,.0f} /s")
+
+    # Matcher backends on a large synthetic rule set
+    rng = random.Random(7)
+    keywords = list(KEYWORD_RULES) + [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 10)))
+        for _ in range(args.keywords)
+    ]
+    lowered = [name.lower() for name in names[: max(1, args.count // 10)]]
+    print(f"\nmatcher backends with {len(keywords)} keywords:")
+    for backend in ("linear", "aho-corasick"):
+        matcher = create_matcher(keywords, backend)
+        run(backend, matcher.first_match, lowered)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
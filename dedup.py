@@ -0,0 +1,259 @@
+"""
+Content-hash duplicate detection for SFO File Organizer.
+
+Inboxes collect identical re-downloads that would otherwise be organized
+as name_1.ext, name_2.ext, ... find_duplicates narrows candidates in
+stages so most files are never read in full:
+
+1. group by size (a file with a unique size has no duplicate);
+2. hash the first and last PARTIAL_SIZE bytes of each remaining file;
+3. hash whole files, memory-mapped, only for groups that still collide.
+
+Stages 2 and 3 run on a MoveExecutor pool. Files already sitting in the
+destination category folders take part as possible originals, so a
+re-download of something organized last week is recognised too.
+
+dedup_plan applies a policy to a MovePlan: duplicates are left where they
+are ("skip"), moved into a Duplicates folder ("move"), or moved as usual
+and then turned into hard links to the original ("hardlink"), which
+frees their space. Moved and linked duplicates are ordinary history
+movements, so undo puts them back.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from executor import MoveExecutor, NameIndex, split_name
+from logging_config import get_logger
+from plan import MovePlan, MOVE_REASON_DUPLICATE, MOVE_REASON_HARDLINK
+
+# Bytes hashed from each end of a file in the partial-hash stage
+PARTIAL_SIZE = 64 * 1024
+
+# What to do with a duplicate
+DEDUP_SKIP = "skip"
+DEDUP_HARDLINK = "hardlink"
+DEDUP_MOVE = "move"
+DEDUP_ACTIONS = (DEDUP_SKIP, DEDUP_HARDLINK, DEDUP_MOVE)
+
+# Category folder duplicates are moved to with DEDUP_MOVE
+DUPLICATES_CATEGORY = "Duplicates"
+
+# Stem endings of names given to copies: name_1.ext, name (1).ext
+COPY_SUFFIX = re.compile(r"(?:_\d+| \(\d+\))$")
+
+
+def partial_hash(path: str) -> bytes:
+    """
+    Hash the first and last PARTIAL_SIZE bytes of a file.
+
+    Files no larger than 2 * PARTIAL_SIZE are hashed whole, so for them
+    this is already the full-content hash.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(f.read(PARTIAL_SIZE))
+        if size > 2 * PARTIAL_SIZE:
+            f.seek(size - PARTIAL_SIZE)
+        digest.update(f.read(PARTIAL_SIZE))
+    return digest.digest()
+
+
+def full_hash(path: str) -> bytes:
+    """Hash a whole file through a read-only memory map."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # hashlib releases the GIL for large buffers, so pool
+                # workers hash in parallel
+                with memoryview(mapped) as view:
+                    digest.update(view)
+    return digest.digest()
+
+
+def _regroup(groups: Iterable[List[str]], key_func, workers: int) -> List[List[str]]:
+    """Split each group by key_func(path), keeping only groups of two or more."""
+    paths = [path for group in groups for path in group]
+    keys = {}
+    for path, key, error in MoveExecutor(workers).run(paths, key_func):
+        if error is None:
+            keys[path] = key
+        else:
+            get_logger().warning(f"Could not read {path} for duplicate check: {error}")
+
+    result = []
+    for group in groups:
+        split = defaultdict(list)
+        for path in group:
+            if path in keys:
+                split[keys[path]].append(path)
+        result.extend(members for members in split.values() if len(members) > 1)
+    return result
+
+
+def _original_key(path: str, mtime: int) -> tuple:
+    """Sort key choosing the original of a group: oldest, then the plainest name."""
+    name = os.path.basename(path)
+    stem, _ = split_name(name)
+    return (mtime, COPY_SUFFIX.search(stem) is not None, len(name), path)
+
+
+def find_duplicates(
+    paths: Iterable[str],
+    workers: int = 1,
+    known: Iterable[str] = ()
+) -> Dict[str, str]:
+    """
+    Find files in paths whose content matches an earlier file.
+
+    Args:
+        paths: Candidate files.
+        workers: Threads used for hashing.
+        known: Files already organized. They are preferred as originals
+            and never reported as duplicates themselves.
+
+    Among the copies considered, the original is the one with the oldest
+    mtime; ties go to a name without a copy suffix (``_1``, `` (1)``),
+    then the shorter name, then the path, so the result never depends on
+    listing order.
+
+    Returns:
+        Mapping of each duplicate path to the path of its original.
+        Empty and unreadable files are never reported.
+    """
+    known_set = set()
+    mtimes = {}
+    by_size = defaultdict(list)
+    for is_known, group in ((True, known), (False, paths)):
+        for path in group:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if st.st_size:
+                by_size[st.st_size].append(path)
+                mtimes[path] = st.st_mtime_ns
+                if is_known:
+                    known_set.add(path)
+    size_of = {path: size for size, members in by_size.items() for path in members}
+
+    # A group needs at least one candidate and at least two members
+    groups = [
+        members for members in by_size.values()
+        if len(members) > 1 and not known_set.issuperset(members)
+    ]
+    groups = _regroup(groups, partial_hash, workers)
+
+    # Small files were hashed whole in the partial stage
+    small = [group for group in groups if size_of[group[0]] <= 2 * PARTIAL_SIZE]
+    large = [group for group in groups if size_of[group[0]] > 2 * PARTIAL_SIZE]
+    groups = small + _regroup(large, full_hash, workers)
+
+    duplicates = {}
+    for members in groups:
+        originals = [path for path in members if path in known_set] or members
+        original = min(originals, key=lambda path: _original_key(path, mtimes[path]))
+        for path in members:
+            if path != original and path not in known_set:
+                duplicates[path] = original
+    return duplicates
+
+
+def _existing_files(folders: Iterable[str]) -> Iterator[str]:
+    """Yield the files directly inside each existing folder."""
+    for folder in folders:
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    # Organizer markers are empty, so never candidates
+                    if entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def dedup_plan(plan: MovePlan, action: str, workers: int = 1) -> Tuple[MovePlan, int]:
+    """
+    Apply a duplicate policy to a move plan.
+
+    The plan's moves are materialized (duplicates can only be known once
+    every candidate has been seen).
+
+    Args:
+        plan: Plan from plan_organize().
+        action: DEDUP_SKIP, DEDUP_HARDLINK or DEDUP_MOVE.
+        workers: Threads used for hashing.
+
+    Returns:
+        (new plan, number of duplicates found).
+
+    Raises:
+        ValueError: If action is not a known policy.
+    """
+    if action not in DEDUP_ACTIONS:
+        raise ValueError(f"Unknown dedup action: {action}")
+    logger = get_logger()
+
+    moves = list(plan)
+    duplicates = find_duplicates(
+        (move.source for move in moves), workers, known=_existing_files(plan.dest_dirs)
+    )
+    planned_dest = {move.source: move.dest for move in moves}
+    duplicates_dir = os.path.join(plan.dest_dir, DUPLICATES_CATEGORY)
+    name_index: Optional[NameIndex] = None
+
+    result = []
+    for move in moves:
+        original = duplicates.get(move.source)
+        if original is None:
+            result.append(move)
+            continue
+        name = os.path.basename(move.source)
+        if action == DEDUP_SKIP:
+            logger.info(f"Duplicate of {original}, left in place: {name}")
+        elif action == DEDUP_MOVE:
+            if name_index is None:
+                name_index = NameIndex()
+                plan.dest_dirs.append(duplicates_dir)
+            dest = os.path.join(duplicates_dir, name_index.reserve(duplicates_dir, name))
+            result.append(move._replace(dest=dest, category=DUPLICATES_CATEGORY,
+                                        reason=MOVE_REASON_DUPLICATE, original=original))
+        else:
+            result.append(move._replace(reason=MOVE_REASON_HARDLINK,
+                                        original=planned_dest.get(original, original)))
+
+    return MovePlan(
+        plan.source_dir, plan.dest_dir, result,
+        skipped=plan.skipped, errors=plan.errors,
+        created=plan.created, dest_dirs=plan.dest_dirs
+    ), len(duplicates)
+
+
+def link_to_original(path: str, original: str) -> None:
+    """
+    Replace path with a hard link to original.
+
+    The contents are compared first (size, then full hash), so a file that
+    took the original's name in the meantime is never linked to. The link
+    is made under a temporary name and renamed over path, so a failure
+    leaves the existing file untouched.
+
+    Raises:
+        ValueError: If the two files no longer have the same content.
+        OSError: If either file cannot be read or the link cannot be made.
+    """
+    if os.stat(path).st_size != os.stat(original).st_size or full_hash(path) != full_hash(original):
+        raise ValueError(f"{original} no longer matches {path}")
+    temp_path = f"{path}.sfo-link"
+    os.link(original, temp_path)
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,225 @@
+"""
+Concurrent move execution for SFO File Organizer.
+
+Moves are planned (destination names resolved) on the calling thread and
+only the filesystem work runs on the pool, so duplicate-name resolution
+stays single-threaded and race-free. Results are yielded in submission
+order, which keeps undo history deterministic regardless of which worker
+finishes first.
+
+NameIndex resolves duplicate names in memory: each destination directory
+is listed once and later collisions are answered from the index.
+"""
+
+import os
+import sys
+import threading
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from transfer import transfer_file
+
+T = TypeVar("T")
+
+# Default number of in-flight tasks per worker
+WINDOW_PER_WORKER = 4
+
+# Default Windows (NTFS) and macOS (APFS, HFS+) volumes treat names that
+# differ only in case, or in Unicode normalization on macOS, as the same file
+FOLD_NAMES = os.name == "nt" or sys.platform == "darwin"
+
+
+def move_file(source: str, dest: str) -> None:
+    """Move a single file: a rename on one filesystem, a streamed copy across devices."""
+    transfer_file(source, dest)
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """Split a file name into (stem, suffix) with Path.stem/Path.suffix rules."""
+    dot = name.rfind(".")
+    if dot <= 0 or dot == len(name) - 1:
+        return name, ""
+    return name[:dot], name[dot:]
+
+
+def name_key(name: str) -> str:
+    """Key under which the filesystem considers two names the same file."""
+    if FOLD_NAMES:
+        return unicodedata.normalize("NFC", name).casefold()
+    return name
+
+
+class _DirectoryNames:
+    """
+    Names taken in one directory plus the next suffix to try per stem.
+
+    taken is None once the directory has outgrown the index; names are
+    then checked on disk instead.
+    """
+
+    __slots__ = ("taken", "next_suffix")
+
+    def __init__(self, taken: Optional[set]):
+        self.taken = taken
+        self.next_suffix = {}
+
+
+class NameIndex:
+    """
+    In-memory index of taken file names per destination directory.
+
+    Each directory is listed with a single scandir the first time it is
+    used. Names are compared with name_key, so on case-insensitive
+    platforms Image.png blocks image.png. Reserved names are added to the
+    index, and the next free ``_N`` suffix is remembered per stem, so
+    5,000 files all named image.png resolve in constant time each instead
+    of probing image_1.png, image_2.png, ... on disk. Thread-safe.
+
+    Args:
+        max_names: Bound on the names held across all directories (None =
+            unbounded). Past it the least recently used directories are
+            dropped (and re-listed if used again); a single directory
+            larger than the bound is no longer indexed and its names are
+            probed on disk. Names reserved but not yet on disk can then be
+            handed out twice, so callers must not overwrite on commit
+            (transfer_file never does).
+    """
+
+    def __init__(self, max_names: Optional[int] = None):
+        self.max_names = max_names
+        self._dirs: dict = {}  # Least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _load(self, directory: str) -> _DirectoryNames:
+        names = self._dirs.pop(directory, None)
+        if names is None:
+            taken = set()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        taken.add(name_key(entry.name))
+            except (FileNotFoundError, NotADirectoryError):
+                pass  # Directory will be created; nothing is taken yet
+            names = _DirectoryNames(taken)
+            self._size += len(taken)
+        self._dirs[directory] = names
+        return names
+
+    def _take(self, directory: str, names: _DirectoryNames, name: str) -> bool:
+        """Claim name if it is free; keep the index within max_names."""
+        if names.taken is None:
+            return not os.path.lexists(os.path.join(directory, name))
+        key = name_key(name)
+        if key in names.taken:
+            return False
+        names.taken.add(key)
+        self._size += 1
+        if self.max_names is not None and self._size > self.max_names:
+            self._evict(directory)
+        return True
+
+    def _evict(self, directory: str) -> None:
+        for other in list(self._dirs):
+            if self._size <= self.max_names:
+                return
+            if other != directory:
+                self._size -= len(self._dirs.pop(other).taken or ())
+        names = self._dirs[directory]
+        if self._size > self.max_names and names.taken is not None:
+            self._size -= len(names.taken)
+            names.taken = None
+            names.next_suffix.clear()
+
+    def reserve(self, directory, name: str) -> str:
+        """
+        Reserve a free name in directory, preferring name itself.
+
+        Args:
+            directory: Destination directory (str or Path).
+            name: Desired file name.
+
+        Returns:
+            name, or the first free ``stem_N.ext`` variant of it.
+        """
+        directory = os.fspath(directory)
+        with self._lock:
+            names = self._load(directory)
+            if self._take(directory, names, name):
+                return name
+
+            stem, ext = split_name(name)
+            counter = names.next_suffix.get((stem, ext), 1)
+            while True:
+                candidate = f"{stem}_{counter}{ext}"
+                counter += 1
+                if self._take(directory, names, candidate):
+                    break
+            if names.taken is not None:
+                names.next_suffix[(stem, ext)] = counter
+            return candidate
+
+    def add(self, directory, name: str) -> None:
+        """Mark name as taken in directory (e.g. a file created outside the index)."""
+        directory = os.fspath(directory)
+        with self._lock:
+            names = self._load(directory)
+            if names.taken is not None:
+                self._take(directory, names, name)
+
+
+class MoveExecutor:
+    """
+    Run file operations on a bounded thread pool.
+
+    Args:
+        workers: Number of worker threads. 1 (or less) runs inline.
+        window: Maximum tasks in flight; defaults to WINDOW_PER_WORKER * workers.
+            Bounds memory when feeding very large plans.
+    """
+
+    def __init__(self, workers: int = 1, window: Optional[int] = None):
+        self.workers = max(1, int(workers or 1))
+        self.window = window or self.workers * WINDOW_PER_WORKER
+
+    def run(
+        self,
+        items: Iterable[T],
+        action: Callable[[T], object]
+    ) -> Iterator[Tuple[T, object, Optional[BaseException]]]:
+        """
+        Apply action to every item, concurrently when workers > 1.
+
+        Args:
+            items: Work items, consumed lazily.
+            action: Callable run on a worker thread for each item.
+
+        Yields:
+            (item, result, error) in the same order as items. error is the
+            exception raised by action, or None on success.
+        """
+        if self.workers == 1:
+            for item in items:
+                try:
+                    yield item, action(item), None
+                except Exception as e:
+                    yield item, None, e
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sfo-move") as pool:
+            pending = deque()
+            for item in items:
+                pending.append((item, pool.submit(action, item)))
+                if len(pending) >= self.window:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    @staticmethod
+    def _collect(item, future) -> tuple:
+        try:
+            return item, future.result(), None
+        except Exception as e:
+            return item, None, e
@@ -26,7 +26,7 @@ except ImportError:
 
 from app_config import DEFAULT_SOURCE_DIR, FILE_CATEGORIES, get_resource_path, DATA_DIR
 from organizer import organize_files, WATCHDOG_AVAILABLE, flatten_directory
-from history import undo_last_session, get_history_summary, get_last_session
+from history import undo_last_session, get_history_summary, get_last_session, recover_incomplete_sessions
 
 
 class ToolTip:
@@ -554,7 +554,10 @@ class SFOFileOrganizerGUI:
         self.source_dir = tk.StringVar(value=DEFAULT_SOURCE_DIR)
         self.watch_mode = tk.BooleanVar(value=False)
         self.is_running = False
-        self.observer = None
+        self.watcher = None
+        
+        # Close out history sessions left open by a crashed run
+        threading.Thread(target=self._recover_history, daemon=True).start()
         
         # Build UI
         self.create_widgets()
@@ -1098,25 +1101,18 @@ class SFOFileOrganizerGUI:
             self.root.title("SFO File Organizer")
 
     def _start_watcher(self, source):
-        """Initialize and start the watchdog observer."""
-        from organizer import OrganizerHandler
-        from watchdog.observers import Observer
-        
-        self.observer = Observer()
-        handler = OrganizerHandler(source, source, use_ai=False, smart_context=self.smart_context.get())
+        """Initialize and start the watch service."""
+        from watcher import WatchRoot, WatchService
         
-        # Intercept handler logging to UI
-        # We'll rely on the handler calling organize_files which logs
-        
-        self.observer.schedule(handler, source, recursive=False)
-        self.observer.start()
+        # The service's workers log through the shared logger, like organize_files
+        self.watcher = WatchService([WatchRoot(source, source, smart_context=self.smart_context.get())], workers=1)
+        self.watcher.start()
 
     def _stop_watcher(self):
-        """Stop the watchdog observer."""
-        if self.observer:
-            self.observer.stop()
-            self.observer.join()
-            self.observer = None
+        """Stop the watch service."""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
     
     def start_preview(self):
         """Start the preview (dry-run) process."""
@@ -1157,6 +1153,15 @@ class SFOFileOrganizerGUI:
         except Exception as e:
             self.message_queue.put(("error", str(e), None))
     
+    def _recover_history(self):
+        """Close out history sessions left open by a crashed run (worker thread)."""
+        try:
+            recovered = recover_incomplete_sessions()
+        except Exception:
+            return
+        if recovered:
+            self.message_queue.put(("history_recovered", recovered, None))
+    
     def start_undo(self):
         """Start the undo process."""
         if self.watch_mode.get():
@@ -1167,14 +1172,14 @@ class SFOFileOrganizerGUI:
             )
             return
 
-        last_session = get_last_session()
+        last_session = get_last_session(include_movements=False)
         
         if not last_session:
             messagebox.showinfo("No History", "No organization sessions to undo.")
             return
         
         # Confirm undo
-        files_count = len(last_session.get("movements", []))
+        files_count = last_session.get("files_moved", 0)
         timestamp = last_session.get("timestamp", "Unknown")
         
         if not messagebox.askyesno(
@@ -1374,6 +1379,8 @@ class SFOFileOrganizerGUI:
                     self._handle_flatten_complete(data)
                 elif msg_type == "error":
                     self._handle_error(data)
+                elif msg_type == "history_recovered":
+                    self.log(f"Recovered {data} interrupted session(s) into history", "info")
                     
         except queue.Empty:
             pass
@@ -2,82 +2,961 @@
 History tracking module for SFO File Organizer.
 
 Tracks file movements to enable undo functionality.
+
+History is stored as an append-only journal under DATA_DIR/history:
+- sessions.jsonl: small session index. One header line per saved session,
+  plus patch lines (e.g. ``{"id": ..., "undone": true}``) that are folded
+  in when read.
+- <session id>.jsonl: one line per movement of that session.
+
+Saving a session costs O(session), and listing history only reads the
+index. The old single-file organizer_history.json is migrated on first use.
+
+SQLiteHistoryStore is an alternative backend (HISTORY_BACKEND = "sqlite")
+with indexed lookups by session and by source/destination path, so history
+doesn't need to be capped to stay fast.
+
+Movements are streamed to the store while a session runs: record_movement
+buffers them and flushes in batches with one fsync per group commit, so
+memory stays bounded and a crash loses at most the last unflushed batch.
+recover_incomplete_sessions() closes out sessions left open by a crash so
+they can be undone.
+
+In memory, movements are held in a MovementList: interned directory
+prefixes plus basenames instead of one dict of two full paths per move.
 """
 
+import os
 import json
+import fnmatch
+import sqlite3
+import uuid
 import logging
+import threading
+import time
+from array import array
 from pathlib import Path
 from datetime import datetime
-from datetime import datetime
-from typing import Optional
-from app_config import DATA_DIR
+from typing import Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from app_config import DATA_DIR, HISTORY_BACKEND
+from executor import MoveExecutor, move_file
+from transfer import copy_file
 
 logger = logging.getLogger("smart_file_organizer")
 
 # History file location
-HISTORY_FILE = DATA_DIR / "organizer_history.json"
+HISTORY_FILE = DATA_DIR / "organizer_history.json"  # Legacy, migrated on first use
+HISTORY_DIR = DATA_DIR / "history"
+HISTORY_DB = DATA_DIR / "organizer_history.db"
 MAX_HISTORY_SESSIONS = 10  # Keep last 10 sessions
 
+# Journal lines written between flushes when saving a whole session
+JOURNAL_FLUSH_EVERY = 1000
 
-def load_history() -> dict:
-    """Load history from JSON file."""
-    if HISTORY_FILE.exists():
+# Streaming: movements buffered per session before a group commit, and the
+# longest time a recorded movement may wait in memory before being synced
+STREAM_BATCH_SIZE = 500
+STREAM_SYNC_INTERVAL = 1.0  # seconds
+
+
+def _split_path(path: str):
+    """Split path into (directory prefix incl. trailing separator, basename)."""
+    cut = path.rfind(os.sep)
+    if os.altsep:
+        cut = max(cut, path.rfind(os.altsep))
+    return path[:cut + 1], path[cut + 1:]
+
+
+class MovementList:
+    """
+    Compact, append-only list of movements.
+    
+    Each path is stored as an id into a table of interned directory
+    prefixes plus its basename, so the source folder and category folders
+    shared by thousands of moves are held once. Ids live in 32-bit arrays
+    and a basename moved unchanged is shared between both sides. Items are
+    served as ``{"from": ..., "to": ...}`` dicts built on access (plus
+    ``"linked": True`` for files replaced by a hard link), so the list
+    reads like the old list of movement dicts.
+    
+    Args:
+        movements: Optional movement dicts to start with.
+    """
+    
+    __slots__ = ("_dirs", "_dir_ids", "_from_dirs", "_from_names", "_to_dirs", "_to_names", "_linked")
+    
+    def __init__(self, movements: Optional[Iterable[dict]] = None):
+        self._dirs = []
+        self._dir_ids = {}
+        self._from_dirs = array("I")
+        self._from_names = []
+        self._to_dirs = array("I")
+        self._to_names = []
+        self._linked = set()  # Indexes of linked movements (rare)
+        if movements is not None:
+            self.extend(movements)
+    
+    def _intern(self, directory: str) -> int:
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        return dir_id
+    
+    def add(self, original_path: str, new_path: str, linked: bool = False) -> None:
+        """Record one movement."""
+        from_dir, from_name = _split_path(original_path)
+        to_dir, to_name = _split_path(new_path)
+        if to_name == from_name:
+            to_name = from_name
+        self._from_dirs.append(self._intern(from_dir))
+        self._from_names.append(from_name)
+        self._to_dirs.append(self._intern(to_dir))
+        self._to_names.append(to_name)
+        if linked:
+            self._linked.add(len(self._to_names) - 1)
+    
+    def append(self, movement: dict) -> None:
+        """Record one movement given as a ``{"from", "to"}`` dict."""
+        self.add(movement["from"], movement["to"], movement.get("linked", False))
+    
+    def extend(self, movements: Iterable[dict]) -> None:
+        for movement in movements:
+            self.add(movement["from"], movement["to"], movement.get("linked", False))
+    
+    def clear(self) -> None:
+        """Drop all movements (the directory table is kept for reuse)."""
+        del self._from_dirs[:], self._to_dirs[:]
+        self._from_names.clear()
+        self._to_names.clear()
+        self._linked.clear()
+    
+    def __len__(self) -> int:
+        return len(self._from_names)
+    
+    def __getitem__(self, index: int) -> dict:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        dirs = self._dirs
+        movement = {
+            "from": dirs[self._from_dirs[index]] + self._from_names[index],
+            "to": dirs[self._to_dirs[index]] + self._to_names[index],
+        }
+        if index in self._linked:
+            movement["linked"] = True
+        return movement
+    
+    def __iter__(self) -> Iterator[dict]:
+        dirs = self._dirs
+        linked = self._linked
+        for index, (from_dir, from_name, to_dir, to_name) in enumerate(zip(
+            self._from_dirs, self._from_names, self._to_dirs, self._to_names
+        )):
+            movement = {"from": dirs[from_dir] + from_name, "to": dirs[to_dir] + to_name}
+            if linked and index in linked:
+                movement["linked"] = True
+            yield movement
+    
+    def __reversed__(self) -> Iterator[dict]:
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MovementList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"MovementList({len(self)} movements, {len(self._dirs)} directories)"
+
+
+def _stale_sessions(completed: list, max_sessions: int, keep: Optional[str] = None) -> list:
+    """
+    Pick the completed sessions to prune, oldest first.
+    
+    Args:
+        completed: Ids of completed sessions, oldest first.
+        max_sessions: Number of completed sessions to keep.
+        keep: Id that must survive (the session being completed).
+    """
+    excess = len(completed) - max_sessions
+    if excess <= 0:
+        return []
+    return [session_id for session_id in completed if session_id != keep][:excess]
+
+
+class _FileLock:
+    """
+    Exclusive advisory lock on a file, shared between processes.
+    
+    Not re-entrant: one holder per process at a time.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+    
+    def __enter__(self) -> "_FileLock":
+        self._file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            self._file.close()
+            raise
+        return self
+    
+    def __exit__(self, *exc) -> None:
         try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+
+
+class JournalHistoryStore:
+    """
+    Append-only, line-delimited history store.
+    
+    Several processes (e.g. the GUI and a CLI watch) may share one store:
+    index appends and the rewrite done when pruning take an advisory lock
+    on sessions.lock, so a rewrite never drops a line another process
+    appended meanwhile.
+    
+    Args:
+        directory: Folder holding sessions.jsonl and per-session journals.
+        max_sessions: Number of sessions to keep (None keeps everything).
+        legacy_file: Old JSON history file to import on first use.
+    """
+    
+    def __init__(
+        self,
+        directory: Path,
+        max_sessions: Optional[int] = MAX_HISTORY_SESSIONS,
+        legacy_file: Optional[Path] = None
+    ):
+        self.directory = Path(directory)
+        self.index_file = self.directory / "sessions.jsonl"
+        self.lock_file = self.directory / "sessions.lock"
+        self.max_sessions = max_sessions
+        self.legacy_file = legacy_file
+        self._lock = threading.Lock()
+        self._migrated = False
+    
+    def journal_path(self, session_id: str) -> Path:
+        """Path of the movement journal for a session."""
+        return self.directory / f"{session_id}.jsonl"
+    
+    def _ensure_ready(self) -> None:
+        if self._migrated:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._migrated = True
+        if self.legacy_file and self.legacy_file.exists() and not self.index_file.exists():
+            self._migrate_legacy()
+    
+    def _migrate_legacy(self) -> None:
+        """Import sessions from the old single-file JSON history."""
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for session in data.get("sessions", []):
+                session.setdefault("id", _new_session_id())
+                self._write_session(session, session.get("movements", []))
+            self.legacy_file.replace(self.legacy_file.with_suffix(".json.migrated"))
+            logger.info(f"Migrated {len(data.get('sessions', []))} sessions to journal history")
         except Exception as e:
-            logger.warning(f"Could not load history: {e}")
-    return {"sessions": []}
+            logger.warning(f"Could not migrate legacy history: {e}")
+    
+    def _append_index(self, record: dict) -> None:
+        with _FileLock(self.lock_file), open(self.index_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    
+    def _write_session(self, session: dict, movements) -> int:
+        """Append a whole session: header, movements, then completion."""
+        self._append_index(_session_header(session, completed=False))
+        count = self._append_movements(session["id"], movements, sync=False)
+        self._append_index({
+            "id": session["id"],
+            "completed": bool(session.get("completed", True)),
+            "files_moved": count,
+        })
+        return count
+    
+    def _append_movements(self, session_id: str, movements, sync: bool) -> int:
+        count = 0
+        with open(self.journal_path(session_id), "a", encoding="utf-8") as f:
+            for movement in movements:
+                record = {"from": movement["from"], "to": movement["to"]}
+                if movement.get("linked"):
+                    record["linked"] = True
+                f.write(json.dumps(record) + "\n")
+                count += 1
+                if count % JOURNAL_FLUSH_EVERY == 0:
+                    f.flush()
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        return count
+    
+    def save(self, session: dict) -> int:
+        """
+        Persist a whole session in one call.
+        
+        Returns:
+            Number of movements written.
+        """
+        with self._lock:
+            self._ensure_ready()
+            count = self._write_session(session, session["movements"])
+            self._prune(keep=session["id"])
+            return count
+    
+    def begin(self, session: dict) -> None:
+        """Write the header of a session that is about to stream movements."""
+        with self._lock:
+            self._ensure_ready()
+            self._append_index(_session_header(session, completed=False))
+    
+    def append(self, session_id: str, movements: list, sync: bool = True) -> None:
+        """Append a batch of movements to a session's journal (one fsync if sync)."""
+        with self._lock:
+            self._append_movements(session_id, movements, sync)
+    
+    def finish(self, session_id: str, files_moved: int, **fields) -> None:
+        """Mark a streamed session completed."""
+        with self._lock:
+            self._append_index({"id": session_id, "completed": True, "files_moved": files_moved, **fields})
+            self._prune(keep=session_id)
+    
+    def discard(self, session_id: str) -> None:
+        """Forget a session and delete its journal."""
+        with self._lock:
+            self._append_index({"id": session_id, "deleted": True})
+            try:
+                self.journal_path(session_id).unlink()
+            except OSError:
+                pass
+    
+    def count_movements(self, session_id: str) -> int:
+        """Count the movements journaled for a session."""
+        return sum(1 for _ in self.iter_movements(session_id))
+    
+    def _read_index(self) -> list:
+        """Fold index lines into one header dict per session, oldest first."""
+        sessions = {}
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn write from a crash; skip it
+                    session_id = record.get("id")
+                    if session_id is None:
+                        continue
+                    if record.get("deleted"):
+                        sessions.pop(session_id, None)
+                    elif session_id in sessions:
+                        sessions[session_id].update(record)
+                    elif "timestamp" in record:
+                        sessions[session_id] = record
+        except FileNotFoundError:
+            pass
+        return list(sessions.values())
+    
+    def sessions(self) -> list:
+        """Return session headers (no movements), oldest first."""
+        with self._lock:
+            self._ensure_ready()
+            return self._read_index()
+    
+    def get(self, session_id: str) -> Optional[dict]:
+        """Return one session header, or None."""
+        for session in self.sessions():
+            if session["id"] == session_id:
+                return session
+        return None
+    
+    def iter_movements(self, session_id: str) -> Iterator[dict]:
+        """Yield a session's movements in the order they were recorded."""
+        try:
+            with open(self.journal_path(session_id), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+        except FileNotFoundError:
+            return
+    
+    def update(self, session_id: str, **fields) -> None:
+        """Record changed header fields (e.g. undone) for a session."""
+        with self._lock:
+            self._ensure_ready()
+            self._append_index({"id": session_id, **fields})
+    
+    def find(self, path: str) -> list:
+        """
+        Find movements whose source or destination is path.
+        
+        This backend has no path index, so every journal is scanned.
+        
+        Returns:
+            List of {"session_id", "timestamp", "from", "to"} dicts, oldest first.
+        """
+        matches = []
+        for session in self.sessions():
+            for movement in self.iter_movements(session["id"]):
+                if path in (movement["from"], movement["to"]):
+                    matches.append({
+                        "session_id": session["id"],
+                        "timestamp": session["timestamp"],
+                        **movement,
+                    })
+        return matches
+    
+    def _prune(self, keep: Optional[str] = None) -> None:
+        """
+        Drop completed sessions beyond max_sessions and compact the index.
+        
+        Sessions still streaming (completed false) are never pruned or
+        counted, so a long-running session can't lose its journal to
+        another session finishing.
+        
+        Args:
+            keep: Id of the session just completed; it is never the one
+                pruned, even if it started before the others.
+        """
+        if self.max_sessions is None:
+            return
+        with _FileLock(self.lock_file):
+            sessions = self._read_index()
+            completed = [session for session in sessions if session.get("completed", True)]
+            stale = _stale_sessions([session["id"] for session in completed], self.max_sessions, keep)
+            if not stale:
+                return
+            for session_id in stale:
+                try:
+                    self.journal_path(session_id).unlink()
+                except OSError:
+                    pass
+            # The index is small (one line per session), so rewriting it is cheap
+            tmp = self.index_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for session in sessions:
+                    if session["id"] not in stale:
+                        f.write(json.dumps(session) + "\n")
+            os.replace(tmp, self.index_file)
+    
+    def clear(self) -> None:
+        """Delete all sessions."""
+        with self._lock:
+            self._ensure_ready()
+            for session in self._read_index():
+                try:
+                    self.journal_path(session["id"]).unlink()
+                except OSError:
+                    pass
+            with _FileLock(self.lock_file):
+                try:
+                    self.index_file.unlink()
+                except FileNotFoundError:
+                    pass
 
 
-def save_history(data: dict) -> None:
-    """Save history to JSON file."""
-    try:
-        # Keep only the last N sessions
-        if len(data["sessions"]) > MAX_HISTORY_SESSIONS:
-            data["sessions"] = data["sessions"][-MAX_HISTORY_SESSIONS:]
+class SQLiteHistoryStore:
+    """
+    SQLite-backed history store.
+    
+    Sessions live in one table and movements in another, indexed by
+    (session_id, seq) and by source and destination path. The database runs
+    in WAL mode and movements are inserted with executemany in batches.
+    
+    Args:
+        db_path: Database file path.
+        max_sessions: Number of sessions to keep (None keeps everything).
+        batch_size: Movements per INSERT batch.
+    """
+    
+    # Header fields stored in their own columns; anything else goes to `extra`
+    COLUMNS = ("timestamp", "source_dir", "dest_dir", "dry_run", "completed",
+               "undone", "undo_timestamp", "files_moved")
+    
+    _INSERT_MOVEMENT = "INSERT INTO movements (session_id, seq, from_path, to_path, linked) VALUES (?, ?, ?, ?, ?)"
+    
+    def __init__(self, db_path: Path, max_sessions: Optional[int] = None, batch_size: int = 5000):
+        self.db_path = Path(db_path)
+        self.max_sessions = max_sessions
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = None
+        self._next_seq = {}
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    source_dir TEXT,
+                    dest_dir TEXT,
+                    dry_run INTEGER DEFAULT 0,
+                    completed INTEGER DEFAULT 0,
+                    undone INTEGER DEFAULT 0,
+                    undo_timestamp TEXT,
+                    files_moved INTEGER DEFAULT 0,
+                    extra TEXT
+                );
+                CREATE TABLE IF NOT EXISTS movements (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    from_path TEXT NOT NULL,
+                    to_path TEXT NOT NULL,
+                    linked INTEGER DEFAULT 0,
+                    PRIMARY KEY (session_id, seq)
+                );
+                CREATE INDEX IF NOT EXISTS idx_movements_from ON movements(from_path);
+                CREATE INDEX IF NOT EXISTS idx_movements_to ON movements(to_path);
+                CREATE INDEX IF NOT EXISTS idx_sessions_timestamp ON sessions(timestamp);
+            """)
+            # Databases from before hard-link dedup lack the linked column
+            if "linked" not in {row[1] for row in conn.execute("PRAGMA table_info(movements)")}:
+                conn.execute("ALTER TABLE movements ADD COLUMN linked INTEGER DEFAULT 0")
+            self._conn = conn
+        return self._conn
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    @classmethod
+    def _row_to_session(cls, row) -> dict:
+        session = {"id": row[0]}
+        for name, value in zip(cls.COLUMNS, row[1:-1]):
+            if name in ("dry_run", "completed", "undone"):
+                value = bool(value)
+            if value is not None:
+                session[name] = value
+        if row[-1]:
+            session.update(json.loads(row[-1]))
+        return session
+    
+    def _split_fields(self, fields: dict) -> tuple:
+        columns = {k: v for k, v in fields.items() if k in self.COLUMNS}
+        extra = {k: v for k, v in fields.items()
+                 if k not in self.COLUMNS and k not in ("id", "movements")}
+        return columns, extra
+    
+    def _insert_session(self, conn: sqlite3.Connection, session: dict) -> None:
+        columns, extra = self._split_fields(_session_header(session, completed=False))
+        conn.execute(
+            f"INSERT OR REPLACE INTO sessions (id, {', '.join(columns)}, extra) "
+            f"VALUES (?, {', '.join('?' for _ in columns)}, ?)",
+            (session["id"], *columns.values(), json.dumps(extra) if extra else None),
+        )
+    
+    def _insert_movements(self, conn: sqlite3.Connection, session_id: str, movements) -> int:
+        """Insert movements with executemany in batch_size chunks; return the count."""
+        seq = self._next_seq.get(session_id)
+        if seq is None:
+            row = conn.execute("SELECT MAX(seq) FROM movements WHERE session_id = ?", (session_id,)).fetchone()
+            seq = (row[0] + 1) if row and row[0] is not None else 0
+        start = seq
+        batch = []
+        for movement in movements:
+            batch.append((session_id, seq, movement["from"], movement["to"], int(movement.get("linked", False))))
+            seq += 1
+            if len(batch) >= self.batch_size:
+                conn.executemany(self._INSERT_MOVEMENT, batch)
+                batch = []
+        if batch:
+            conn.executemany(self._INSERT_MOVEMENT, batch)
+        self._next_seq[session_id] = seq
+        return seq - start
+    
+    def save(self, session: dict) -> int:
+        """
+        Persist a whole session in one transaction.
         
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        logger.warning(f"Could not save history: {e}")
+        Returns:
+            Number of movements written.
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._insert_session(conn, session)
+                count = self._insert_movements(conn, session["id"], session["movements"])
+                conn.execute(
+                    "UPDATE sessions SET completed = ?, files_moved = ? WHERE id = ?",
+                    (int(bool(session.get("completed", True))), count, session["id"]),
+                )
+            self._next_seq.pop(session["id"], None)
+            self._prune(conn, keep=session["id"])
+            return count
+    
+    def begin(self, session: dict) -> None:
+        """Insert the header of a session that is about to stream movements."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._insert_session(conn, session)
+            self._next_seq[session["id"]] = 0
+    
+    def append(self, session_id: str, movements: list, sync: bool = True) -> None:
+        """
+        Insert a batch of movements in one transaction.
+        
+        Each batch is its own commit; with WAL that survives a process crash.
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._insert_movements(conn, session_id, movements)
+    
+    def finish(self, session_id: str, files_moved: int, **fields) -> None:
+        """Mark a streamed session completed."""
+        self.update(session_id, completed=True, files_moved=files_moved, **fields)
+        with self._lock:
+            self._next_seq.pop(session_id, None)
+            self._prune(self._connect(), keep=session_id)
+    
+    def discard(self, session_id: str) -> None:
+        """Delete a session and its movements."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM movements WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._next_seq.pop(session_id, None)
+    
+    def count_movements(self, session_id: str) -> int:
+        """Count the movements stored for a session."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM movements WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0]
+    
+    def sessions(self) -> list:
+        """Return session headers (no movements), oldest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT id, {', '.join(self.COLUMNS)}, extra FROM sessions ORDER BY timestamp, rowid"
+            ).fetchall()
+        return [self._row_to_session(row) for row in rows]
+    
+    def get(self, session_id: str) -> Optional[dict]:
+        """Return one session header, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT id, {', '.join(self.COLUMNS)}, extra FROM sessions WHERE id = ?",
+                (session_id,),
+            ).fetchone()
+        return self._row_to_session(row) if row else None
+    
+    def iter_movements(self, session_id: str) -> Iterator[dict]:
+        """Yield a session's movements in the order they were recorded."""
+        last_seq = -1
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT seq, from_path, to_path, linked FROM movements "
+                    "WHERE session_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (session_id, last_seq, self.batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for seq, from_path, to_path, linked in rows:
+                if linked:
+                    yield {"from": from_path, "to": to_path, "linked": True}
+                else:
+                    yield {"from": from_path, "to": to_path}
+            last_seq = rows[-1][0]
+    
+    def update(self, session_id: str, **fields) -> None:
+        """Change header fields (e.g. undone) for a session."""
+        columns, extra = self._split_fields(fields)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if columns:
+                    conn.execute(
+                        f"UPDATE sessions SET {', '.join(f'{k} = ?' for k in columns)} WHERE id = ?",
+                        (*columns.values(), session_id),
+                    )
+                if extra:
+                    row = conn.execute("SELECT extra FROM sessions WHERE id = ?", (session_id,)).fetchone()
+                    merged = json.loads(row[0]) if row and row[0] else {}
+                    merged.update(extra)
+                    conn.execute("UPDATE sessions SET extra = ? WHERE id = ?", (json.dumps(merged), session_id))
+    
+    def find(self, path: str) -> list:
+        """
+        Find movements whose source or destination is path (indexed).
+        
+        Returns:
+            List of {"session_id", "timestamp", "from", "to"} dicts, oldest first.
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT m.session_id, s.timestamp, m.from_path, m.to_path "
+                "FROM movements m JOIN sessions s ON s.id = m.session_id "
+                "WHERE m.from_path = ? "
+                "UNION ALL "
+                "SELECT m.session_id, s.timestamp, m.from_path, m.to_path "
+                "FROM movements m JOIN sessions s ON s.id = m.session_id "
+                "WHERE m.to_path = ? AND m.from_path != ? "
+                "ORDER BY 2",
+                (path, path, path),
+            ).fetchall()
+        return [{"session_id": r[0], "timestamp": r[1], "from": r[2], "to": r[3]} for r in rows]
+    
+    def _prune(self, conn: sqlite3.Connection, keep: Optional[str] = None) -> None:
+        """Drop completed sessions beyond max_sessions (see JournalHistoryStore._prune)."""
+        if self.max_sessions is None:
+            return
+        with conn:
+            completed = [row[0] for row in conn.execute(
+                "SELECT id FROM sessions WHERE completed ORDER BY timestamp, rowid"
+            )]
+            for session_id in _stale_sessions(completed, self.max_sessions, keep):
+                conn.execute("DELETE FROM movements WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+    
+    def clear(self) -> None:
+        """Delete all sessions."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM movements")
+                conn.execute("DELETE FROM sessions")
+
+
+HISTORY_BACKENDS = {
+    "journal": lambda: JournalHistoryStore(HISTORY_DIR, legacy_file=HISTORY_FILE),
+    "sqlite": lambda: SQLiteHistoryStore(HISTORY_DB),
+}
+
+
+_store = None
+
+# Ids of sessions this process started and has not saved yet. A session
+# carrying our pid but missing here was left by an earlier process that
+# had the same pid (e.g. PID 1 in a container) and is dead.
+_open_sessions = set()
+
+
+def get_history_store():
+    """Return the active history store (HISTORY_BACKEND by default)."""
+    global _store
+    if _store is None:
+        _store = HISTORY_BACKENDS.get(HISTORY_BACKEND, HISTORY_BACKENDS["journal"])()
+    return _store
+
 
+def set_history_store(store) -> None:
+    """Replace the active history store (e.g. to point at another folder)."""
+    global _store
+    _store = store
 
-def start_session(source_dir: str, dest_dir: str, dry_run: bool = False) -> dict:
+
+def set_history_backend(name: str) -> None:
+    """
+    Switch the active history store by backend name.
+    
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if name not in HISTORY_BACKENDS:
+        raise ValueError(f"Unknown history backend: {name}. Must be one of {sorted(HISTORY_BACKENDS)}")
+    set_history_store(HISTORY_BACKENDS[name]())
+
+
+def _session_header(session: dict, **overrides) -> dict:
+    """Public header fields of a session (no movements or private state)."""
+    header = {
+        key: value for key, value in session.items()
+        if key != "movements" and not key.startswith("_")
+    }
+    header.update(overrides)
+    return header
+
+
+def _session_alive(session: dict) -> bool:
+    """True if the process that started session is still writing it."""
+    pid = session.get("pid", 0)
+    if pid == os.getpid():
+        return session["id"] in _open_sessions
+    return _pid_alive(pid)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Best-effort check whether a process id is still running."""
+    if not pid:
+        return False
+    if os.name == "nt":
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+            if not handle:
+                return False
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            kernel32.CloseHandle(handle)
+            return code.value == 259  # STILL_ACTIVE
+        except Exception:
+            return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _new_session_id() -> str:
+    """Unique, time-sortable session id."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:6]}"
+
+
+def load_history() -> dict:
+    """
+    Load the full history, including every movement.
+    
+    Kept for compatibility; prefer get_history_summary() or
+    get_history_store().iter_movements() which don't load every session.
+    """
+    store = get_history_store()
+    sessions = []
+    for header in store.sessions():
+        session = dict(header)
+        session["movements"] = MovementList(store.iter_movements(header["id"]))
+        sessions.append(session)
+    return {"sessions": sessions}
+
+
+def start_session(
+    source_dir: str,
+    dest_dir: str,
+    dry_run: bool = False,
+    batch_size: Optional[int] = None,
+    sync_interval: Optional[float] = None
+) -> dict:
     """
     Start a new organization session.
     
+    Nothing is written until the first batch of movements is flushed, so
+    sessions that move nothing leave no trace in history.
+    
     Args:
         source_dir: Source directory path.
         dest_dir: Destination directory path.
         dry_run: Whether this is a dry run (not saved to history).
+        batch_size: Movements buffered before a group commit
+            (default STREAM_BATCH_SIZE).
+        sync_interval: Max seconds a movement may stay unsynced
+            (default STREAM_SYNC_INTERVAL).
     
     Returns:
-        Session dictionary to track movements.
+        Session dictionary to track movements. ``movements`` holds only the
+        not-yet-flushed buffer; ``files_moved`` is the running total.
     """
+    session_id = _new_session_id()
+    _open_sessions.add(session_id)
     return {
+        "id": session_id,
         "timestamp": datetime.now().isoformat(),
         "source_dir": source_dir,
         "dest_dir": dest_dir,
         "dry_run": dry_run,
-        "movements": [],
-        "completed": False
+        "movements": MovementList(),
+        "files_moved": 0,
+        "completed": False,
+        "pid": os.getpid(),
+        "_batch_size": batch_size or STREAM_BATCH_SIZE,
+        "_sync_interval": STREAM_SYNC_INTERVAL if sync_interval is None else sync_interval,
+        "_last_sync": time.monotonic(),
+        "_begun": False,
     }
 
 
-def record_movement(session: dict, original_path: str, new_path: str) -> None:
+def record_movement(session: dict, original_path: str, new_path: str, linked: bool = False) -> None:
     """
     Record a file movement in the session.
     
+    The movement is buffered and streamed to the history store once the
+    buffer reaches the session's batch size or its sync interval elapses.
+    
     Args:
         session: Current session dictionary.
         original_path: Original file path (before move).
         new_path: New file path (after move).
+        linked: The moved file is to be replaced by a hard link to an
+            identical file; undo then restores an independent copy.
+    """
+    session["movements"].add(original_path, new_path, linked)
+    session["files_moved"] = session.get("files_moved", 0) + 1
+    
+    if session.get("dry_run") or "_batch_size" not in session:
+        return
+    if (len(session["movements"]) >= session["_batch_size"]
+            or time.monotonic() - session["_last_sync"] >= session["_sync_interval"]):
+        flush_session(session)
+
+
+def flush_session(session: dict) -> None:
     """
-    session["movements"].append({
-        "from": original_path,
-        "to": new_path
-    })
+    Group-commit buffered movements to the history store.
+    
+    Args:
+        session: Session dictionary from start_session().
+    """
+    if session.get("dry_run") or not session["movements"]:
+        return
+    
+    store = get_history_store()
+    try:
+        if not session.get("_begun"):
+            store.begin(session)
+            session["_begun"] = True
+        store.append(session["id"], session["movements"], sync=True)
+    except Exception as e:
+        # Keep the buffer so the next flush (or save_session) can retry
+        logger.warning(f"Could not write history: {e}")
+        return
+    session["movements"].clear()
+    session["_last_sync"] = time.monotonic()
 
 
 def save_session(session: dict) -> None:
@@ -87,132 +966,336 @@ def save_session(session: dict) -> None:
     Args:
         session: Session dictionary to save.
     """
+    try:
+        _save_session(session)
+    finally:
+        # Saved or abandoned: either way this process is done writing it
+        _open_sessions.discard(session.get("id"))
+
+
+def _save_session(session: dict) -> None:
     if session.get("dry_run"):
         logger.debug("Dry run session - not saving to history")
         return
     
-    if not session["movements"]:
+    if "_begun" not in session:
+        # Session built by hand rather than start_session(): save in one go
+        if not session["movements"]:
+            logger.debug("No movements to save")
+            return
+        session["completed"] = True
+        try:
+            count = get_history_store().save(session)
+        except Exception as e:
+            logger.warning(f"Could not save history: {e}")
+            return
+        logger.info(f"Session saved with {count} movements")
+        return
+    
+    flush_session(session)
+    if not session["_begun"]:
         logger.debug("No movements to save")
         return
+    if session["movements"]:
+        logger.warning("History session left incomplete; it will be recovered on next start")
+        return
     
     session["completed"] = True
+    try:
+        get_history_store().finish(session["id"], session["files_moved"])
+    except Exception as e:
+        logger.warning(f"Could not save history: {e}")
+        return
+    
+    logger.info(f"Session saved with {session['files_moved']} movements")
+
+
+def recover_incomplete_sessions() -> int:
+    """
+    Close out sessions left open by a crash so they can be undone.
     
-    history = load_history()
-    history["sessions"].append(session)
-    save_history(history)
+    Sessions still owned by a running process are left alone. Recovered
+    sessions are marked completed with ``recovered: true``; sessions that
+    never recorded a movement are discarded.
     
-    logger.info(f"Session saved with {len(session['movements'])} movements")
+    Returns:
+        Number of sessions recovered.
+    """
+    store = get_history_store()
+    recovered = 0
+    for session in store.sessions():
+        if session.get("completed") or session.get("dry_run"):
+            continue
+        if _session_alive(session):
+            continue
+        count = store.count_movements(session["id"])
+        if count == 0:
+            store.discard(session["id"])
+            continue
+        store.finish(session["id"], count, recovered=True)
+        logger.info(f"Recovered incomplete session {session['id']} with {count} movements")
+        recovered += 1
+    return recovered
 
 
-def get_last_session() -> Optional[dict]:
+def get_last_session(include_movements: bool = True) -> Optional[dict]:
     """
     Get the most recent session that can be undone.
     
+    Args:
+        include_movements: Load the session's movements too. Pass False when
+            only the header (timestamp, files_moved, ...) is needed.
+    
     Returns:
         Last session dictionary or None if no sessions exist.
     """
-    history = load_history()
+    store = get_history_store()
     
     # Find the last completed, non-dry-run session
-    for session in reversed(history["sessions"]):
+    for session in reversed(store.sessions()):
         if session.get("completed") and not session.get("dry_run"):
             if not session.get("undone"):
+                if include_movements:
+                    session["movements"] = MovementList(store.iter_movements(session["id"]))
                 return session
     
     return None
 
 
-def undo_last_session() -> dict:
+def _restore(movement: dict) -> bool:
     """
-    Undo the last organization session.
+    Move one file back to where it came from (runs on an undo worker).
+    
+    Linked movements (files turned into hard links after the move) are
+    copied back and the link removed, so the restored file is independent.
     
     Returns:
-        Statistics about the undo operation.
+        False if the file is already back in place (e.g. an earlier partial
+        undo), True if it was moved.
     """
-    import shutil
+    current_path = movement["to"]
+    if not os.path.lexists(current_path):
+        if os.path.lexists(movement["from"]):
+            return False
+        raise FileNotFoundError(current_path)
+    if movement.get("linked"):
+        copy_file(current_path, movement["from"])
+        os.unlink(current_path)
+    else:
+        move_file(current_path, movement["from"])
+    return True
+
+
+def _undo_movements(movements: list, workers: int = 1) -> dict:
+    """
+    Reverse a list of movements, newest first.
     
-    session = get_last_session()
+    Reversals are grouped by the directory they restore into, so each
+    original directory is created once and a worker's moves stay local to
+    one folder; the moves themselves run on a bounded MoveExecutor pool.
     
-    if not session:
-        logger.warning("No session to undo")
-        return {"success": False, "message": "No session to undo", "restored": 0, "errors": 0}
+    Args:
+        movements: Movements to reverse, in the order they were recorded.
+        workers: Number of concurrent moves.
     
-    stats = {"success": True, "restored": 0, "errors": 0, "movements": []}
+    Returns:
+        Statistics with restored/skipped/errors counts and the reversed
+        movements.
+    """
+    stats = {"restored": 0, "skipped": 0, "errors": 0, "movements": MovementList()}
     
-    logger.info(f"Undoing session from {session['timestamp']}")
-    print(f"\nUndoing organization from {session['timestamp']}")
-    print(f"Restoring {len(session['movements'])} files...")
+    groups = {}
+    for movement in reversed(movements):
+        groups.setdefault(os.path.dirname(movement["from"]), []).append(movement)
     
-    # Reverse the movements
-    for movement in reversed(session["movements"]):
-        original_path = Path(movement["from"])
-        current_path = Path(movement["to"])
-        
+    ready = []
+    for directory, group in groups.items():
         try:
-            if current_path.exists():
-                # Ensure original directory exists
-                original_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Move file back
-                shutil.move(str(current_path), str(original_path))
-                logger.info(f"Restored: {current_path.name} -> {original_path.parent}")
-                print(f"  Restored: {current_path.name}")
-                stats["restored"] += 1
-                stats["movements"].append({
-                    "from": str(current_path),
-                    "to": str(original_path)
-                })
-            else:
-                logger.warning(f"File not found (may have been moved/deleted): {current_path}")
-                stats["errors"] += 1
-                
-        except Exception as e:
-            logger.error(f"Error restoring {current_path}: {e}")
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Cannot recreate {directory}: {e}")
+            stats["errors"] += len(group)
+            continue
+        ready.extend(group)
+    
+    for movement, moved, error in MoveExecutor(workers).run(ready, _restore):
+        if error is None and not moved:
+            logger.debug(f"Already restored: {movement['from']}")
+            stats["skipped"] += 1
+        elif error is None:
+            logger.debug(f"Restored: {movement['to']} -> {movement['from']}")
+            stats["restored"] += 1
+            stats["movements"].add(movement["to"], movement["from"])
+        elif isinstance(error, FileNotFoundError):
+            logger.warning(f"File not found (may have been moved/deleted): {movement['to']}")
+            stats["errors"] += 1
+        else:
+            logger.error(f"Error restoring {movement['to']}: {error}")
             stats["errors"] += 1
     
-    # Mark session as undone
-    history = load_history()
-    for s in history["sessions"]:
-        if s["timestamp"] == session["timestamp"]:
-            s["undone"] = True
-            s["undo_timestamp"] = datetime.now().isoformat()
-            break
-    save_history(history)
-    
-    # Clean up empty category directories (including nested ones and marker files)
-    dest_dir = Path(session["dest_dir"])
-    if dest_dir.exists():
-        # First pass: remove marker files from empty directories
-        for marker_file in dest_dir.rglob(".sfo_organized"):
-            try:
-                parent = marker_file.parent
-                # Check if directory only contains the marker file
-                contents = list(parent.iterdir())
-                if len(contents) == 1 and contents[0].name == ".sfo_organized":
-                    marker_file.unlink()
-                    logger.debug(f"Removed marker file: {marker_file}")
-            except Exception:
-                pass
-        
-        # Second pass: remove empty directories (bottom-up)
-        dirs_to_check = sorted(dest_dir.rglob("*"), key=lambda p: len(p.parts), reverse=True)
-        removed_count = 0
-        for dir_path in dirs_to_check:
-            if dir_path.is_dir():
-                try:
-                    if not any(dir_path.iterdir()):
-                        dir_path.rmdir()
-                        removed_count += 1
-                        logger.debug(f"Removed empty directory: {dir_path}")
-                except Exception:
-                    pass
-        
-        if removed_count > 0:
-            logger.info(f"Cleaned up {removed_count} empty directories")
+    return stats
+
+
+def _cleanup_touched_dirs(dest_dir: str, movements: list) -> int:
+    """
+    Remove category folders emptied by an undo.
+    
+    Only the folders the movements landed in, and their parents below
+    dest_dir, are checked (deepest first). A folder holding nothing but the
+    .sfo_organized marker counts as empty.
+    
+    Returns:
+        Number of directories removed.
+    """
+    root = os.path.normcase(os.path.abspath(dest_dir))
+    candidates = set()
+    for movement in movements:
+        directory = os.path.abspath(os.path.dirname(movement["to"]))
+        while os.path.normcase(directory).startswith(root + os.sep) and directory not in candidates:
+            candidates.add(directory)
+            directory = os.path.dirname(directory)
+    
+    removed = 0
+    for directory in sorted(candidates, key=lambda d: d.count(os.sep), reverse=True):
+        try:
+            with os.scandir(directory) as it:
+                names = [entry.name for entry in it]
+            if names == [".sfo_organized"]:
+                os.unlink(os.path.join(directory, ".sfo_organized"))
+                logger.debug(f"Removed marker file in: {directory}")
+            elif names:
+                continue
+            os.rmdir(directory)
+            removed += 1
+            logger.debug(f"Removed empty directory: {directory}")
+        except OSError:
+            pass
+    return removed
+
+
+def _path_matcher(path_filter: str):
+    """
+    Build a predicate for undo path filters.
+    
+    A filter containing glob characters (``*?[``) is matched against the
+    whole path with fnmatch; anything else selects that path and everything
+    below it.
+    """
+    if any(char in path_filter for char in "*?["):
+        pattern = os.path.normcase(path_filter)
+        return lambda path: fnmatch.fnmatchcase(os.path.normcase(path), pattern)
+    
+    root = os.path.normcase(os.path.abspath(path_filter)).rstrip(os.sep)
+    prefix = root + os.sep
+    
+    def matches(path: str) -> bool:
+        path = os.path.normcase(os.path.abspath(path))
+        return path == root or path.startswith(prefix)
+    return matches
+
+
+def select_movements(session_id: str, path_filter: Optional[str] = None) -> list:
+    """
+    Read the movements of one session, optionally filtered by path.
+    
+    Only that session's movements are read (its journal file, or its rows
+    of the SQLite movements table), never the whole history.
+    
+    Args:
+        session_id: Session to read.
+        path_filter: Subtree path or glob; a movement is selected when its
+            original or current path matches.
+    
+    Returns:
+        Selected movements in recorded order.
+    """
+    movements = get_history_store().iter_movements(session_id)
+    if path_filter is None:
+        return MovementList(movements)
+    matches = _path_matcher(path_filter)
+    return MovementList(m for m in movements if matches(m["from"]) or matches(m["to"]))
+
+
+def undo_session(session_id: str, path_filter: Optional[str] = None, workers: int = 1) -> dict:
+    """
+    Undo one session, or only the part of it matching path_filter.
+    
+    The session is marked undone once everything in it has been reverted;
+    a filtered undo that leaves files behind marks it ``partial_undo``
+    instead, and a later undo skips files that are already back in place.
+    
+    Args:
+        session_id: Id of the session to revert (see get_history_summary()).
+        path_filter: Subtree path or glob limiting which files are restored.
+        workers: Number of files restored concurrently.
+    
+    Returns:
+        Statistics about the undo operation.
+    """
+    store = get_history_store()
+    session = store.get(session_id)
+    
+    if not session or not session.get("completed") or session.get("dry_run"):
+        logger.warning(f"No session to undo: {session_id}")
+        return {"success": False, "message": f"Session not found: {session_id}", "restored": 0, "errors": 0}
+    if session.get("undone"):
+        return {"success": False, "message": "Session was already undone", "restored": 0, "errors": 0}
+    
+    movements = select_movements(session_id, path_filter)
+    if not movements:
+        return {"success": False, "message": "No files in the session match the filter", "restored": 0, "errors": 0}
+    
+    scope = f" matching {path_filter}" if path_filter else ""
+    logger.info(f"Undoing session from {session['timestamp']}{scope}")
+    print(f"\nUndoing organization from {session['timestamp']}{scope}")
+    print(f"Restoring {len(movements)} files...")
+    
+    stats = {"success": True, "session_id": session_id, **_undo_movements(movements, workers)}
+    logger.info(f"Restored {stats['restored']} files ({stats['errors']} errors)")
+    
+    # Mark the session undone, or record how much of it has been reverted
+    now = datetime.now().isoformat()
+    try:
+        if path_filter is None or len(movements) >= session.get("files_moved", 0):
+            store.update(session_id, undone=True, undo_timestamp=now)
+        else:
+            store.update(
+                session_id,
+                partial_undo=True,
+                undone_files=session.get("undone_files", 0) + stats["restored"],
+                undo_timestamp=now,
+            )
+    except Exception as e:
+        logger.warning(f"Could not save history: {e}")
+    
+    # Clean up the category directories this undo emptied
+    removed_count = _cleanup_touched_dirs(session["dest_dir"], movements)
+    if removed_count > 0:
+        logger.info(f"Cleaned up {removed_count} empty directories")
     
     return stats
 
 
+def undo_last_session(workers: int = 1) -> dict:
+    """
+    Undo the last organization session.
+    
+    Args:
+        workers: Number of files restored concurrently.
+    
+    Returns:
+        Statistics about the undo operation.
+    """
+    session = get_last_session(include_movements=False)
+    
+    if not session:
+        logger.warning("No session to undo")
+        return {"success": False, "message": "No session to undo", "restored": 0, "errors": 0}
+    
+    return undo_session(session["id"], workers=workers)
+
+
 def get_history_summary() -> list:
     """
     Get a summary of all sessions in history.
@@ -220,23 +1303,38 @@ def get_history_summary() -> list:
     Returns:
         List of session summaries.
     """
-    history = load_history()
     summaries = []
     
-    for session in history["sessions"]:
+    # Only the session index is read; movement journals are not touched
+    for session in get_history_store().sessions():
         summaries.append({
+            "id": session["id"],
             "timestamp": session["timestamp"],
             "source": session["source_dir"],
             "dest": session["dest_dir"],
-            "files_moved": len(session["movements"]),
+            "files_moved": session.get("files_moved", 0),
             "undone": session.get("undone", False),
+            "partial_undo": session.get("partial_undo", False),
             "dry_run": session.get("dry_run", False)
         })
     
     return summaries
 
 
+def find_movements(path: str) -> list:
+    """
+    Answer "where did this file go?" / "which session moved this path?".
+    
+    Args:
+        path: A source or destination path as recorded in history.
+    
+    Returns:
+        Matching movements with their session id and timestamp, oldest first.
+    """
+    return get_history_store().find(str(path))
+
+
 def clear_history() -> None:
     """Clear all history."""
-    save_history({"sessions": []})
+    get_history_store().clear()
     logger.info("History cleared")
@@ -0,0 +1,169 @@
+"""
+Multi-pattern keyword matchers for SFO File Organizer.
+
+A matcher is compiled from a priority-ordered list of lowercase keywords and
+answers one question per filename: which is the highest-priority keyword
+(lowest index) that occurs anywhere in the name?
+
+Backends are pluggable through MATCHER_BACKENDS / register_matcher():
+- "linear": substring scan per keyword, fastest for small rule sets.
+- "aho-corasick": single pass over the name, cost independent of rule count.
+- "auto": picks one of the above based on the number of keywords.
+"""
+
+from collections import deque
+from typing import Optional, Sequence
+
+# Rule sets larger than this use Aho-Corasick under the "auto" backend
+AUTO_THRESHOLD = 256
+
+
+class KeywordMatcher:
+    """
+    Base class for keyword matchers.
+
+    Args:
+        keywords: Lowercase keywords in priority order (index 0 wins).
+    """
+
+    name = "base"
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = tuple(keywords)
+
+    def first_match(self, text: str) -> Optional[int]:
+        """
+        Find the highest-priority keyword contained in text.
+
+        Args:
+            text: Already lowercased text to search.
+
+        Returns:
+            Index of the matching keyword, or None if nothing matches.
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+class LinearMatcher(KeywordMatcher):
+    """Check each keyword in priority order with a substring test."""
+
+    name = "linear"
+
+    def first_match(self, text: str) -> Optional[int]:
+        for index, keyword in enumerate(self.keywords):
+            if keyword in text:
+                return index
+        return None
+
+
+class AhoCorasickMatcher(KeywordMatcher):
+    """
+    Aho-Corasick automaton that finds all keyword hits in one pass.
+
+    Each state stores the best (lowest) keyword index among all keywords
+    ending there or along its failure chain, so a scan only tracks a running
+    minimum and can stop as soon as keyword 0 is seen.
+    """
+
+    name = "aho-corasick"
+
+    def __init__(self, keywords: Sequence[str]):
+        super().__init__(keywords)
+        self._goto: list = [{}]
+        self._fail: list = [0]
+        self._best: list = [None]
+        self._build()
+
+    def _build(self) -> None:
+        goto, best = self._goto, self._best
+
+        # Trie of all keywords, remembering the best index per terminal state
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    best.append(None)
+                state = nxt
+            if best[state] is None or index < best[state]:
+                best[state] = index
+
+        # Breadth-first failure links, folding outputs down the chain
+        fail = self._fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            inherited = best[fail[state]]
+            if inherited is not None and (best[state] is None or inherited < best[state]):
+                best[state] = inherited
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+
+    def first_match(self, text: str) -> Optional[int]:
+        goto, fail, best = self._goto, self._fail, self._best
+        state = 0
+        result = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = best[state]
+            if hit is not None and (result is None or hit < result):
+                result = hit
+                if result == 0:
+                    break
+        return result
+
+
+def _auto_matcher(keywords: Sequence[str]) -> KeywordMatcher:
+    """Choose a backend based on rule set size."""
+    if len(keywords) > AUTO_THRESHOLD:
+        return AhoCorasickMatcher(keywords)
+    return LinearMatcher(keywords)
+
+
+MATCHER_BACKENDS: dict = {
+    "auto": _auto_matcher,
+    LinearMatcher.name: LinearMatcher,
+    AhoCorasickMatcher.name: AhoCorasickMatcher,
+}
+
+
+def register_matcher(name: str, factory) -> None:
+    """
+    Register a matcher backend.
+
+    Args:
+        name: Backend name used with create_matcher() / RuleStore(matcher=...).
+        factory: Callable taking a keyword sequence and returning a KeywordMatcher.
+    """
+    MATCHER_BACKENDS[name] = factory
+
+
+def create_matcher(keywords: Sequence[str], backend: str = "auto") -> KeywordMatcher:
+    """
+    Compile keywords with the named backend.
+
+    Raises:
+        ValueError: If the backend is not registered.
+    """
+    try:
+        factory = MATCHER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown matcher backend: {backend}. Must be one of {sorted(MATCHER_BACKENDS)}"
+        ) from None
+    return factory(keywords)
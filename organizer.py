@@ -12,28 +12,52 @@ Features:
 
 import os
 import sys
-import shutil
+import errno
 import argparse
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, List, Optional
 import time
 from datetime import datetime
 
 try:
-    from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler
+    import watchdog  # noqa: F401 - Watch Mode itself lives in watcher.py
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
 
-from app_config import FILE_CATEGORIES, DEFAULT_SOURCE_DIR, DEFAULT_DEST_DIR, DETAILED_CATEGORIES
+from app_config import DEFAULT_SOURCE_DIR, DEFAULT_DEST_DIR
 from logging_config import setup_logging, get_logger
-from rules import classify_file, classify_by_rules
-from history import start_session, record_movement, save_session, undo_last_session, get_history_summary
+from rules import classify_by_extension, classify_many, get_rule_store, RuleStore, REASON_RULE
+from scanner import scan_directory, scan_paths, TreeWalker
+from executor import MoveExecutor, NameIndex, move_file
+from transfer import transfer_file, TransferStats, VERIFY_MODES, VERIFY_SIZE
+from dedup import dedup_plan, link_to_original, DEDUP_ACTIONS, DUPLICATES_CATEGORY
+from plan import (
+    MovePlan, PlannedMove, batched,
+    MOVE_REASON_CONTEXT, MOVE_REASON_EXTENSION, MOVE_REASON_HARDLINK, MOVE_REASON_RULE
+)
+from history import (
+    start_session, record_movement, save_session, undo_session, get_history_summary,
+    get_last_session, find_movements, set_history_backend, recover_incomplete_sessions, HISTORY_BACKENDS
+)
 
 # Hidden marker file to identify folders created by the organizer
 ORGANIZER_MARKER = ".sfo_organized"
 
+# Files classified per batch when planning a recursive walk
+PLAN_CHUNK_SIZE = 1000
+
+# Destination names held in memory while planning or applying one plan;
+# beyond this, directories are re-listed or probed on disk (see NameIndex)
+NAME_INDEX_LIMIT = 200_000
+
+# Fresh names tried when a destination turns out to exist at move time
+MAX_NAME_RETRIES = 100
+
+# Flattened files recorded to history per lock acquisition
+FLATTEN_RECORD_BATCH = 256
+
 
 def get_category(file_extension: str) -> str:
     """
@@ -49,17 +73,14 @@ def get_category(file_extension: str) -> str:
         This function is preserved for backward compatibility.
         For new code, use classify_file() from rules.py instead.
     """
-    ext = file_extension.lower()
-    for category, extensions in FILE_CATEGORIES.items():
-        if ext in extensions:
-            return category
-    return "Other"
+    return classify_by_extension(file_extension)
 
 
-def detect_folder_context(source_path: Path) -> str:
+def detect_folder_context(source_path: Path, file_names: Optional[list] = None) -> str:
     """
     Analyze folder to determine its primary context.
     First checks the folder name, then falls back to file content analysis.
+    Pass file_names to reuse a listing the caller already has.
     Returns: 'Images', 'Documents', or 'Mixed'
     """
     # First, check the folder name for context hints
@@ -89,16 +110,15 @@ def detect_folder_context(source_path: Path) -> str:
             return "Documents"
     
     # Fall back to analyzing file contents
-    counts = {"Images": 0, "Documents": 0, "Total": 0}
+    if file_names is None:
+        file_names = [entry.name for entry in scan_directory(source_path) if entry.is_file]
     
-    for item in source_path.iterdir():
-        if item.is_file():
-            counts["Total"] += 1
-            ext = item.suffix.lower()
-            if ext in FILE_CATEGORIES["Images"]:
-                counts["Images"] += 1
-            elif ext in FILE_CATEGORIES["Documents"]:
-                counts["Documents"] += 1
+    category_counts = classify_many(file_names, use_keywords=False).counts()
+    counts = {
+        "Images": category_counts.get("Images", 0),
+        "Documents": category_counts.get("Documents", 0),
+        "Total": len(file_names),
+    }
     
     if counts["Total"] == 0:
         return "Mixed"
@@ -112,21 +132,26 @@ def detect_folder_context(source_path: Path) -> str:
         return "Documents"
     return "Mixed"
 
-def get_detailed_category(file_path: Path, context: str) -> str:
-    """Get specialized category based on context."""
+def get_detailed_category(file_path, context: str, rule_store: Optional[RuleStore] = None) -> str:
+    """
+    Get specialized category based on context.
+    
+    file_path may be a Path or a scanner.FileEntry; a FileEntry reuses the
+    stat result cached during the scan.
+    """
+    extension_index = (rule_store or get_rule_store()).extension_index
     if context == "Documents":
         # Check detailed mapping first
-        ext = file_path.suffix.lower()
-        if ext in DETAILED_CATEGORIES:
-            return DETAILED_CATEGORIES[ext]
+        detailed = extension_index.detailed_category(file_path.suffix)
+        if detailed:
+            return detailed
             
     elif context == "Images":
         # Only sort actual images by year
-        ext = file_path.suffix.lower()
-        if ext in FILE_CATEGORIES["Images"]:
+        if extension_index.category(file_path.suffix) == "Images":
             # Sort by Year (creation date)
             try:
-                mtime = os.path.getmtime(file_path)
+                mtime = file_path.stat().st_mtime
                 dt = datetime.fromtimestamp(mtime)
                 return str(dt.year)
             except Exception:
@@ -134,139 +159,412 @@ def get_detailed_category(file_path: Path, context: str) -> str:
             
     return None
 
-def organize_files(
+def _validate_source(source: Path) -> None:
+    """Raise if source is missing, not a directory, or unreadable."""
+    logger = get_logger()
+    
+    if not source.exists():
+        logger.error(f"Source directory not found: {source}")
+        raise FileNotFoundError(f"Source directory not found: {source}")
+    
+    if not source.is_dir():
+        logger.error(f"Source path is not a directory: {source}")
+        raise NotADirectoryError(f"Source path is not a directory: {source}")
+    
+    # Check read permissions
+    if not os.access(source, os.R_OK):
+        logger.error(f"Permission denied: Cannot read from {source}")
+        raise PermissionError(f"Permission denied: Cannot read from {source}")
+
+
+def _hide_file(path: Path) -> None:
+    """Set the hidden attribute on Windows; no-op elsewhere."""
+    if os.name == 'nt':
+        try:
+            import ctypes
+            ctypes.windll.kernel32.SetFileAttributesW(str(path), 2)
+        except Exception:
+            pass  # Silently ignore if we can't set attributes
+
+
+class CategoryDirCache:
+    """
+    Per-run cache of prepared category folders.
+    
+    Each folder is created and checked for its ORGANIZER_MARKER exactly once
+    per run, however many files are moved into it. A failure is remembered
+    and re-raised for every later file headed to the same folder.
+    """
+    
+    def __init__(self):
+        self._ready = set()
+        self._failed = {}
+    
+    def prepare(self, category_dir: Path) -> None:
+        """
+        Create category_dir and its marker if this run hasn't already.
+        
+        Raises:
+            OSError: If the folder could not be created.
+        """
+        key = str(category_dir)
+        if key in self._ready:
+            return
+        if key in self._failed:
+            raise self._failed[key]
+        
+        try:
+            category_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self._failed[key] = e
+            raise
+        
+        # Mark this folder as created by the organizer
+        marker_path = category_dir / ORGANIZER_MARKER
+        try:
+            if not marker_path.exists():
+                marker_path.touch()
+                # Make the marker hidden on Windows
+                _hide_file(marker_path)
+        except OSError as e:
+            get_logger().warning(f"Could not create marker in {category_dir}: {e}")
+        self._ready.add(key)
+    
+    def prepare_all(self, category_dirs) -> int:
+        """
+        Prepare several folders up front, logging failures.
+        
+        Returns:
+            Number of folders that could not be prepared.
+        """
+        failures = 0
+        for category_dir in category_dirs:
+            try:
+                self.prepare(Path(category_dir))
+            except OSError as e:
+                get_logger().error(f"Could not create folder {category_dir}: {e}")
+                failures += 1
+        return failures
+
+
+def plan_organize(
     source_dir: Optional[str] = None,
     dest_dir: Optional[str] = None,
-    dry_run: bool = False,
-    use_ai: bool = False,
-    smart_context: bool = False
-) -> dict:
+    smart_context: bool = False,
+    paths: Optional[Iterable[str]] = None,
+    context: Optional[str] = None,
+    rule_store: Optional[RuleStore] = None,
+    recursive: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    max_depth: Optional[int] = None
+) -> MovePlan:
     """
-    Organize files from source directory into categorized folders.
+    Scan and classify a directory and return the moves that would organize it.
+    
+    Nothing is moved or created. Destination names are already made unique
+    against the destination folders and against each other.
     
     Args:
         source_dir: Directory containing files to organize.
         dest_dir: Directory where organized folders will be created.
-        dry_run: If True, only log actions without moving files.
-        use_ai: If True, attempt AI classification (requires API setup).
         smart_context: If True, adapt organization strategy based on folder content.
+        paths: Plan only these files instead of listing source_dir. Paths
+            that are gone, are not files, or are not directly inside
+            source_dir are ignored.
+        context: Smart Context to use instead of detecting it (lets
+            incremental callers avoid re-listing the folder).
+        rule_store: Rules to classify with (default: the shared store).
+        recursive: Also organize files in subfolders. Folders created by
+            the organizer are not descended into. The plan's moves are
+            then a generator that walks the tree as it is consumed, so it
+            can be iterated only once and has no len().
+        include: With recursive, only files matching one of these globs.
+        exclude: With recursive, globs for files and folders to leave out.
+        max_depth: With recursive, folder levels to descend (None = all).
     
     Returns:
-        Dictionary with statistics about organized files:
-        - moved: Number of files successfully moved
-        - skipped: Number of directories skipped
-        - errors: Number of errors encountered
+        MovePlan with one PlannedMove per file.
     
     Raises:
         FileNotFoundError: If source directory does not exist.
-        PermissionError: If lacking permissions to read source or write dest.
+        PermissionError: If lacking permissions to read source.
     """
     logger = get_logger()
     
-    source = Path(source_dir or DEFAULT_SOURCE_DIR)
-    destination = Path(dest_dir or DEFAULT_DEST_DIR)
-    
-    # Validate source directory
-    if not source.exists():
-        logger.error(f"Source directory not found: {source}")
-        raise FileNotFoundError(f"Source directory not found: {source}")
-    
-    if not source.is_dir():
-        logger.error(f"Source path is not a directory: {source}")
-        raise NotADirectoryError(f"Source path is not a directory: {source}")
-    
-    # Check read permissions
-    if not os.access(source, os.R_OK):
-        logger.error(f"Permission denied: Cannot read from {source}")
-        raise PermissionError(f"Permission denied: Cannot read from {source}")
-    
-    stats = {"moved": 0, "skipped": 0, "errors": 0}
+    # Absolute paths, so plans and history mean the same thing from any
+    # working directory (and --find can match them)
+    source = Path(os.path.abspath(source_dir or DEFAULT_SOURCE_DIR))
+    destination = Path(os.path.abspath(dest_dir or DEFAULT_DEST_DIR))
+    _validate_source(source)
+    
+    plan = MovePlan(str(source), str(destination))
+    
+    # Pick up any edits to custom rules once per run rather than per file
+    rule_store = rule_store or get_rule_store()
+    rule_store.refresh()
+    
+    if recursive:
+        # Stream the tree: moves are planned lazily, chunk by chunk, while
+        # the plan is applied, so nothing proportional to the tree size is
+        # held up front. Skipped/error counts fill in as the walk proceeds.
+        # Category folders already in the destination (even ones made by
+        # hand, without a marker) hold organized files: don't re-plan them
+        walker = TreeWalker(
+            source, include=include, exclude=exclude,
+            max_depth=max_depth, skip_marker=ORGANIZER_MARKER,
+            skip_dirs=[destination / category for category in _category_names(rule_store)]
+        )
+        context = _resolve_context(source, smart_context, context)
+        plan.moves = _plan_moves(plan, walker, destination, smart_context, context, rule_store, walker)
+        return plan
     
-    # Context detection
-    context = "Mixed"
-    if smart_context:
-        context = detect_folder_context(source)
-        logger.info(f"Smart Context detected: {context}")
+    # List the directory once (scandir entries cache type and stat info)
+    # and classify every file in a single batch
+    files = []
+    if paths is None:
+        for entry in scan_directory(source):
+            if entry.is_file:
+                files.append(entry)
+            else:
+                logger.debug(f"Skipped directory: {entry.name}")
+                plan.skipped += 1
+    else:
+        root = os.path.normcase(os.path.abspath(source))
+        for entry in scan_paths(paths):
+            if entry.is_file and os.path.normcase(os.path.dirname(os.path.abspath(entry.path))) == root:
+                files.append(entry)
+    
+    context = _resolve_context(
+        source, smart_context, context,
+        [file_path.name for file_path in files] if paths is None else None
+    )
+    plan.moves = list(_plan_moves(plan, files, destination, smart_context, context, rule_store, chunk_size=max(len(files), 1)))
+    return plan
+
+
+def _category_names(rule_store: RuleStore) -> set:
+    """Every category folder name a file can be organized into (besides years)."""
+    extension_index = rule_store.extension_index
+    names = {"Other", DUPLICATES_CATEGORY}
+    names.update(extension_index.categories.values())
+    names.update(extension_index.detailed.values())
+    names.update(category for _, category in rule_store.keyword_rules)
+    return names
+
+
+def _resolve_context(
+    source: Path,
+    smart_context: bool,
+    context: Optional[str],
+    file_names: Optional[list] = None
+) -> str:
+    """Return the Smart Context to plan with, detecting it if needed."""
+    if not smart_context:
+        return "Mixed"
+    if context is None:
+        context = detect_folder_context(source, file_names)
+        get_logger().info(f"Smart Context detected: {context}")
+    return context
+
+
+def _plan_moves(
+    plan: MovePlan,
+    files: Iterable,
+    destination: Path,
+    smart_context: bool,
+    context: str,
+    rule_store: RuleStore,
+    walker: Optional[TreeWalker] = None,
+    chunk_size: int = PLAN_CHUNK_SIZE
+) -> Iterator[PlannedMove]:
+    """
+    Classify files and yield a PlannedMove for each, chunk by chunk.
     
-    # Start a session for undo support
-    session = start_session(str(source), str(destination), dry_run)
+    Errors and the destination folders used are recorded on plan as they
+    happen; if a walker is given, its skipped directories are added to
+    plan.skipped once the walk is done.
+    """
+    logger = get_logger()
     
-    logger.info(f"{'[DRY RUN] ' if dry_run else ''}Organizing files from: {source}")
-    logger.info(f"{'[DRY RUN] ' if dry_run else ''}Destination: {destination}")
+    # Destination names are resolved here, on one thread, so concurrent
+    # moves never race for the same name. The index lists each category
+    # folder once and tracks names handed out in this plan, up to
+    # NAME_INDEX_LIMIT names.
+    name_index = NameIndex(max_names=NAME_INDEX_LIMIT)
+    dest_dirs = {}  # Category folder -> its normalized absolute path
     
-    for file_path in source.iterdir():
-        if file_path.is_file():
+    for chunk in batched(files, chunk_size):
+        classification = classify_many([file_path.name for file_path in chunk], store=rule_store)
+        
+        for i, file_path in enumerate(chunk):
             try:
                 # Determine category using the classification chain
                 category = None
+                reason = MOVE_REASON_CONTEXT
                 
                 # 0. Smart Context Strategy
                 if smart_context and context != "Mixed":
-                    category = get_detailed_category(file_path, context)
+                    category = get_detailed_category(file_path, context, rule_store)
                     if category:
                         logger.debug(f"Smart Context ({context}) matched {file_path.name} -> {category}")
 
                 # 1. Fall back to rule-based + extension classification
                 if not category:
-                    category = classify_file(file_path.name, file_path.suffix)
+                    category = classification[i]
+                    if classification.reasons[i] == REASON_RULE:
+                        reason = MOVE_REASON_RULE
+                    else:
+                        reason = MOVE_REASON_EXTENSION
                     if context == "Mixed": # Only log rule matches in mixed mode to reduce noise
-                        rule_match = classify_by_rules(file_path.name)
-                        if rule_match:
+                        if reason == MOVE_REASON_RULE:
                             logger.debug(f"Rule matched {file_path.name} -> {category}")
                         else:
                             logger.debug(f"Extension matched {file_path.name} -> {category}")
                 
                 category_dir = destination / category
+                category_key = dest_dirs.get(category_dir)
+                if category_key is None:
+                    category_key = dest_dirs[category_dir] = os.path.normcase(os.path.abspath(category_dir))
+                    plan.dest_dirs.append(str(category_dir))
+                if os.path.normcase(os.path.dirname(os.path.abspath(file_path.path))) == category_key:
+                    logger.debug(f"Already organized: {file_path.name}")
+                    plan.skipped += 1
+                    continue
+                dest_name = name_index.reserve(category_dir, file_path.name)
+                if dest_name != file_path.name:
+                    logger.warning(f"Duplicate found, renaming to: {dest_name}")
+                dest_path = category_dir / dest_name
                 
-                if not dry_run:
-                    category_dir.mkdir(parents=True, exist_ok=True)
-                    # Mark this folder as created by the organizer
-                    marker_path = category_dir / ORGANIZER_MARKER
-                    if not marker_path.exists():
-                        marker_path.touch()
-                        # Make the marker hidden on Windows
-                        if os.name == 'nt':
-                            try:
-                                import ctypes
-                                ctypes.windll.kernel32.SetFileAttributesW(str(marker_path), 2)
-                            except Exception:
-                                pass  # Silently ignore if we can't set attributes
-                
-                dest_path = category_dir / file_path.name
-                
-                # Handle duplicate filenames
-                if dest_path.exists() or (not dry_run and dest_path.exists()):
-                    base = file_path.stem
-                    ext = file_path.suffix
-                    counter = 1
-                    while dest_path.exists():
-                        dest_path = category_dir / f"{base}_{counter}{ext}"
-                        counter += 1
-                    logger.warning(f"Duplicate found, renaming to: {dest_path.name}")
-                
-                if dry_run:
-                    logger.info(f"[DRY RUN] Would move: {file_path.name} -> {category}/")
-                else:
-                    # Record the movement before moving
-                    original_path = str(file_path)
-                    shutil.move(str(file_path), str(dest_path))
-                    record_movement(session, original_path, str(dest_path))
-                    logger.info(f"Moved: {file_path.name} -> {category}/")
-                
-                stats["moved"] += 1
+                move = PlannedMove(file_path.path, str(dest_path), category, reason)
                 
             except PermissionError as e:
                 logger.error(f"Permission denied for {file_path.name}: {e}")
-                stats["errors"] += 1
+                plan.errors += 1
+                continue
             except OSError as e:
                 logger.error(f"OS error moving {file_path.name}: {e}")
-                stats["errors"] += 1
+                plan.errors += 1
+                continue
             except Exception as e:
                 logger.error(f"Unexpected error moving {file_path.name}: {e}")
+                plan.errors += 1
+                continue
+            
+            yield move
+    
+    if walker is not None:
+        plan.skipped += walker.skipped
+
+
+def apply_plan(
+    plan: MovePlan,
+    workers: int = 1,
+    batch_size: int = 1000,
+    revalidate: bool = True,
+    verify: str = VERIFY_SIZE
+) -> dict:
+    """
+    Execute a MovePlan and record it as one undoable session.
+    
+    Args:
+        plan: Plan from plan_organize() or MovePlan.read_jsonl().
+        workers: Number of concurrent move workers (1 = sequential).
+        batch_size: Number of moves prepared and submitted at a time.
+        revalidate: Re-check destinations for files created since the plan
+            was built (needed for plans loaded from disk).
+        verify: How cross-device copies are checked before the source is
+            deleted (see transfer.VERIFY_MODES).
+    
+    Returns:
+        Dictionary with statistics: moved, skipped, errors.
+    """
+    logger = get_logger()
+    stats = {"moved": 0, "skipped": 0, "errors": 0}
+    
+    session = start_session(plan.source_dir, plan.dest_dir, dry_run=False)
+    executor = MoveExecutor(workers)
+    transfers = TransferStats()
+    name_index = NameIndex(max_names=NAME_INDEX_LIMIT) if revalidate else None
+    # Transfers never overwrite: a name taken on disk since planning is
+    # re-reserved here (NameIndex is thread-safe) and the move retried
+    retry_index = name_index or NameIndex(max_names=NAME_INDEX_LIMIT)
+    links = []
+    renamed = {}  # Planned dest -> final dest, for moves that had to be renamed
+    
+    def transfer(move: PlannedMove) -> str:
+        folder, name = os.path.split(move.dest)
+        dest = move.dest
+        for _ in range(MAX_NAME_RETRIES):
+            try:
+                transfer_file(move.source, dest, verify=verify, stats=transfers)
+                return dest
+            except FileExistsError:
+                retry_index.add(folder, os.path.basename(dest))
+                dest = os.path.join(folder, retry_index.reserve(folder, name))
+                logger.warning(f"Destination appeared since planning, renaming to: {os.path.basename(dest)}")
+        raise FileExistsError(errno.EEXIST, "No free destination name", move.dest)
+    
+    # Create every category folder the plan needs in one pass before any
+    # file moves; the cache makes later per-file checks free
+    dir_cache = CategoryDirCache()
+    dir_cache.prepare_all(plan.dest_dirs)
+    
+    for batch in batched(plan, batch_size):
+        ready = []
+        for move in batch:
+            try:
+                dest_path = Path(move.dest)
+                dir_cache.prepare(dest_path.parent)
+                if name_index is not None:
+                    dest_name = name_index.reserve(dest_path.parent, dest_path.name)
+                    if dest_name != dest_path.name:
+                        logger.warning(f"Destination taken since planning, renaming to: {dest_name}")
+                        renamed[move.dest] = str(dest_path.parent / dest_name)
+                        move = move._replace(dest=renamed[move.dest])
+                ready.append(move)
+            except Exception as e:
+                logger.error(f"Could not prepare {move.dest}: {e}")
                 stats["errors"] += 1
-        else:
-            logger.debug(f"Skipped directory: {file_path.name}")
-            stats["skipped"] += 1
+        
+        # Results come back in plan order so history is deterministic
+        for move, final_dest, error in executor.run(ready, transfer):
+            name = os.path.basename(move.source)
+            if error is None:
+                if final_dest != move.dest:
+                    renamed[move.dest] = final_dest
+                    move = move._replace(dest=final_dest)
+                record_movement(session, move.source, move.dest, linked=move.reason == MOVE_REASON_HARDLINK)
+                logger.info(f"Moved: {name} -> {move.category}/")
+                stats["moved"] += 1
+                if move.reason == MOVE_REASON_HARDLINK:
+                    links.append(move)
+            elif isinstance(error, PermissionError):
+                logger.error(f"Permission denied for {name}: {error}")
+                stats["errors"] += 1
+            elif isinstance(error, OSError):
+                logger.error(f"OS error moving {name}: {error}")
+                stats["errors"] += 1
+            else:
+                logger.error(f"Unexpected error moving {name}: {error}")
+                stats["errors"] += 1
+    
+    if transfers.copied:
+        logger.info(transfers.summary())
+    
+    # Duplicates become hard links once every original is in place, at
+    # the name it actually got
+    for move in links:
+        original = renamed.get(move.original, move.original)
+        try:
+            link_to_original(move.dest, original)
+            logger.info(f"Linked duplicate: {os.path.basename(move.dest)} -> {original}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not link duplicate {move.dest}, keeping a copy: {e}")
+    
+    # Streamed plans count skips and planning errors while they are consumed
+    stats["skipped"] += plan.skipped
+    stats["errors"] += plan.errors
     
     # Save session for undo support
     save_session(session)
@@ -274,178 +572,395 @@ def organize_files(
     return stats
 
 
-def flatten_directory(source_dir: str, flatten_all: bool = False) -> dict:
+def preview_plan(plan: MovePlan) -> dict:
+    """
+    Log the moves a plan would make without touching any file.
+    
+    Args:
+        plan: Plan from plan_organize() or MovePlan.read_jsonl().
+    
+    Returns:
+        Dictionary with statistics: moved (moves that would be made),
+        skipped, errors.
+    """
+    logger = get_logger()
+    count = 0
+    for move in plan:
+        logger.info(f"[DRY RUN] Would move: {os.path.basename(move.source)} -> {move.category}/")
+        count += 1
+    return {"moved": count, "skipped": plan.skipped, "errors": plan.errors}
+
+
+def organize_files(
+    source_dir: Optional[str] = None,
+    dest_dir: Optional[str] = None,
+    dry_run: bool = False,
+    use_ai: bool = False,
+    smart_context: bool = False,
+    workers: int = 1,
+    plan_out: Optional[str] = None,
+    recursive: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    max_depth: Optional[int] = None,
+    verify: str = VERIFY_SIZE,
+    dedup: Optional[str] = None
+) -> dict:
+    """
+    Organize files from source directory into categorized folders.
+    
+    Args:
+        source_dir: Directory containing files to organize.
+        dest_dir: Directory where organized folders will be created.
+        dry_run: If True, only log actions without moving files.
+        use_ai: If True, attempt AI classification (requires API setup).
+        smart_context: If True, adapt organization strategy based on folder content.
+        workers: Number of concurrent move workers (1 = sequential).
+        plan_out: If given, write the move plan to this JSONL file.
+        recursive: Also organize files in subfolders (streamed, so memory
+            use does not grow with the size of the tree).
+        include: With recursive, only organize files matching these globs.
+        exclude: With recursive, skip files and folders matching these globs.
+        max_depth: With recursive, folder levels to descend (None = all).
+        verify: Check for cross-device copies: "none", "size" or "hash".
+        dedup: What to do with files whose content matches another file
+            being organized or one already in its category folder: "skip",
+            "hardlink" or "move" (to Duplicates). None disables the check.
+    
+    Returns:
+        Dictionary with statistics about organized files:
+        - moved: Number of files successfully moved
+        - skipped: Number of directories skipped
+        - errors: Number of errors encountered
+        - duplicates: Number of duplicates found (only with dedup)
+    
+    Raises:
+        FileNotFoundError: If source directory does not exist.
+        PermissionError: If lacking permissions to read source or write dest.
+    """
+    logger = get_logger()
+    
+    source = Path(source_dir or DEFAULT_SOURCE_DIR)
+    destination = Path(dest_dir or DEFAULT_DEST_DIR)
+    
+    logger.info(f"{'[DRY RUN] ' if dry_run else ''}Organizing files from: {source}")
+    logger.info(f"{'[DRY RUN] ' if dry_run else ''}Destination: {destination}")
+    
+    plan = plan_organize(
+        str(source), str(destination), smart_context=smart_context,
+        recursive=recursive, include=include, exclude=exclude, max_depth=max_depth
+    )
+    
+    duplicates = None
+    if dedup:
+        plan, duplicates = dedup_plan(plan, dedup, workers=workers)
+        logger.info(f"{'[DRY RUN] ' if dry_run else ''}Found {duplicates} duplicate file(s)")
+    
+    if plan_out:
+        count = plan.write_jsonl(plan_out)
+        logger.info(f"Wrote plan with {count} moves to: {plan_out}")
+        if recursive and not dedup:
+            # The walk has been consumed; apply from the file instead
+            plan = MovePlan.read_jsonl(plan_out, stream=True)
+    
+    if dry_run:
+        stats = preview_plan(plan)
+    else:
+        stats = apply_plan(plan, workers=workers, revalidate=False, verify=verify)
+    
+    if duplicates is not None:
+        stats["duplicates"] = duplicates
+    return stats
+
+
+def organize_paths(
+    paths: Iterable[str],
+    source_dir: str,
+    dest_dir: Optional[str] = None,
+    smart_context: bool = False,
+    context: Optional[str] = None,
+    workers: int = 1,
+    rule_store: Optional[RuleStore] = None
+) -> dict:
+    """
+    Organize only the given files of source_dir (used by Watch Mode).
+    
+    Args:
+        paths: Files that changed; missing or nested paths are ignored.
+        source_dir: Folder the files live in.
+        dest_dir: Destination directory (defaults to source_dir).
+        smart_context: If True, adapt organization strategy based on folder content.
+        context: Previously detected Smart Context, to skip re-detection.
+        workers: Number of concurrent move workers (1 = sequential).
+        rule_store: Rules to classify with (default: the shared store).
+    
+    Returns:
+        Dictionary with statistics: moved, skipped, errors.
+    """
+    plan = plan_organize(
+        source_dir, dest_dir or source_dir, smart_context=smart_context,
+        paths=paths, context=context, rule_store=rule_store
+    )
+    if not plan.moves:
+        return {"moved": 0, "skipped": plan.skipped, "errors": plan.errors}
+    return apply_plan(plan, workers=workers, revalidate=False)
+
+
+def flatten_directory(source_dir: str, flatten_all: bool = False, workers: int = 1) -> dict:
     """
     Move all files from subdirectories back to the source root.
     
+    Each target folder is one unit of work. With workers > 1 the folders
+    are walked concurrently; destination names come from one shared,
+    lock-protected index of the root and undo movements are recorded in
+    batches, so workers rarely contend.
+    
     Args:
         source_dir: The directory to flatten.
         flatten_all: If True, flattens ALL subdirectories. 
                      If False, only flattens folders created by the organizer (marked).
+        workers: Number of folders flattened concurrently (1 = sequential).
     
     Returns:
         Statistics dictionary.
     """
     logger = get_logger()
-    source = Path(source_dir)
+    source = Path(os.path.abspath(source_dir))
     stats = {"moved": 0, "errors": 0, "removed_dirs": 0, "skipped_dirs": 0}
     
     if not source.exists() or not source.is_dir():
         logger.error(f"Invalid source directory: {source}")
         return stats
 
-    # select target directories
+    # One listing of the root picks the target folders and counts the rest
+    target_dirs = []
+    untagged_count = 0
+    with os.scandir(source) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if flatten_all or os.path.lexists(os.path.join(entry.path, ORGANIZER_MARKER)):
+                target_dirs.append(entry.path)
+            else:
+                untagged_count += 1
+    
     if flatten_all:
-        # Get ALL subdirectories (first level)
-        target_dirs = [d for d in source.iterdir() if d.is_dir()]
         logger.info(f"Flattening ALL {len(target_dirs)} subdirectories.")
-    else:
-        # Get only tagged directories
-        target_dirs = [d for d in source.iterdir() 
-                       if d.is_dir() and (d / ORGANIZER_MARKER).exists()]
     
     if not target_dirs:
         logger.info("No folders found to flatten.")
         return stats
     
     # Count preserved directories (only relevant if not flattening all)
-    if not flatten_all:
-        all_subdirs = [d for d in source.iterdir() if d.is_dir()]
-        untagged_count = len(all_subdirs) - len(target_dirs)
-        if untagged_count > 0:
-            logger.info(f"Preserving {untagged_count} pre-existing folder(s).")
-            stats["skipped_dirs"] = untagged_count
+    if untagged_count > 0:
+        logger.info(f"Preserving {untagged_count} pre-existing folder(s).")
+        stats["skipped_dirs"] = untagged_count
 
     # Start session for Undo
     session = start_session(str(source), str(source), dry_run=False)
     
-    # Get files only from target directories (recursive within those dirs)
-    files = []
-    for target_dir in target_dirs:
-        files.extend([p for p in target_dir.rglob("*") 
-                      if p.is_file() and p.name != ORGANIZER_MARKER])
+    # Resolve duplicate names against one listing of the source root,
+    # shared by every worker (NameIndex is thread-safe)
+    name_index = NameIndex()
+    session_lock = threading.Lock()
     
-    for file_path in files:
-        try:
-            dest_path = source / file_path.name
-            
-            # Handle duplicates
-            if dest_path.exists():
-                base = file_path.stem
-                ext = file_path.suffix
-                counter = 1
-                while dest_path.exists():
-                    dest_path = source / f"{base}_{counter}{ext}"
-                    counter += 1
-            
-            original_path = str(file_path)
-            shutil.move(str(file_path), str(dest_path))
-            
-            # Record for undo
-            record_movement(session, original_path, str(dest_path))
-            
-            stats["moved"] += 1
-            logger.info(f"Flattened: {file_path.name}")
-            
-        except Exception as e:
-            logger.error(f"Error moving {file_path}: {e}")
-            stats["errors"] += 1
+    def reserve(name: str) -> Path:
+        return source / name_index.reserve(source, name)
     
-    # Remove target directories (including marker files) - bottom-up
-    for target_dir in target_dirs:
-        # First remove the marker file
-        marker_path = target_dir / ORGANIZER_MARKER
-        try:
-            if marker_path.exists():
-                marker_path.unlink()
-        except Exception:
-            pass
+    def flatten_one(target_dir: str) -> dict:
+        local = {"moved": 0, "errors": 0, "removed_dirs": 0}
+        batch = []
         
-        # Remove any empty subdirectories within the target dir (bottom-up)
-        for dir_path in sorted(target_dir.rglob("*"), key=lambda p: len(p.parts), reverse=True):
-            if dir_path.is_dir():
-                try:
-                    if not any(dir_path.iterdir()):
-                        dir_path.rmdir()
-                        stats["removed_dirs"] += 1
-                        logger.info(f"Removed empty dir: {dir_path}")
-                except Exception:
-                    pass
+        def flush() -> None:
+            with session_lock:
+                for original_path, dest_path in batch:
+                    record_movement(session, original_path, dest_path)
+            batch.clear()
+        
+        def record(original_path: str, dest_path: str) -> None:
+            batch.append((original_path, dest_path))
+            if len(batch) >= FLATTEN_RECORD_BATCH:
+                flush()
         
-        # Finally remove the target directory itself if empty
         try:
-            if not any(target_dir.iterdir()):
-                target_dir.rmdir()
-                stats["removed_dirs"] += 1
-                logger.info(f"Removed dir: {target_dir.name}")
-        except Exception as e:
-            logger.warning(f"Could not remove {target_dir.name}: {e}")
+            _flatten_tree(target_dir, reserve, record, local)
+        finally:
+            flush()
+        return local
+    
+    for target_dir, local, error in MoveExecutor(workers).run(target_dirs, flatten_one):
+        if error is not None:
+            logger.error(f"Could not flatten {target_dir}: {error}")
+            stats["errors"] += 1
+            continue
+        for key, value in local.items():
+            stats[key] += value
     
     # Save the session
     save_session(session)
     return stats
 
 
-class OrganizerHandler(FileSystemEventHandler):
-    """Handles file system events by triggering organization."""
+def _flatten_tree(
+    target_dir: str,
+    reserve: Callable[[str], Path],
+    record: Callable[[str, str], None],
+    stats: dict
+) -> None:
+    """
+    Move every file under target_dir to the root and remove emptied folders.
     
-    def __init__(self, source_dir: str, dest_dir: str, use_ai: bool, smart_context: bool = False):
-        self.source_dir = source_dir
-        self.dest_dir = dest_dir
-        self.use_ai = use_ai
-        self.smart_context = smart_context
-        self.logger = get_logger()
-        # Coalescing: don't organize too frequently
-        self.last_run = 0
-        self.cooldown = 2 # seconds
-        
-    def on_created(self, event):
-        if not event.is_directory:
-            self._trigger_organize()
+    A single bottom-up pass: each folder is listed once with scandir, its
+    files are moved (organizer markers deleted) as they are read, and a
+    count of entries left behind decides whether the folder can be
+    removed once its listing is exhausted. No folder is listed twice and
+    emptiness is never re-checked with another directory read.
+    
+    Args:
+        target_dir: Folder to flatten.
+        reserve: Returns a free destination path for a file name.
+        record: Called with (original, new) for each moved file.
+        stats: Counters for moved, errors and removed_dirs, updated in place.
+    """
+    logger = get_logger()
+    
+    # Each frame: [path, open scandir iterator, entries left behind]
+    stack = [[target_dir, os.scandir(target_dir), 0]]
+    try:
+        while stack:
+            frame = stack[-1]
+            entry = next(frame[1], None)
+            
+            if entry is None:
+                frame[1].close()
+                stack.pop()
+                removed = False
+                if frame[2] == 0:
+                    try:
+                        os.rmdir(frame[0])
+                        removed = True
+                        stats["removed_dirs"] += 1
+                        logger.info(f"Removed dir: {frame[0]}")
+                    except OSError as e:
+                        logger.warning(f"Could not remove {frame[0]}: {e}")
+                if not removed and stack:
+                    stack[-1][2] += 1
+                continue
             
-    def on_moved(self, event):
-        if not event.is_directory and Path(event.dest_path).parent == Path(self.source_dir):
-            self._trigger_organize()
-
-    def _trigger_organize(self):
-        current_time = time.time()
-        if current_time - self.last_run > self.cooldown:
-            self.last_run = current_time
-            # Wait a tiny bit for the file to be fully written/unlocked
-            time.sleep(0.5)
             try:
-                self.logger.info("Watch Mode: Change detected, organizing...")
-                organize_files(self.source_dir, self.dest_dir, use_ai=self.use_ai, smart_context=self.smart_context)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                is_dir = is_file = False
+            
+            if is_dir:
+                try:
+                    stack.append([entry.path, os.scandir(entry.path), 0])
+                except OSError as e:
+                    logger.error(f"Could not read {entry.path}: {e}")
+                    frame[2] += 1
+                continue
+            
+            if not is_file:
+                frame[2] += 1
+                continue
+            
+            if entry.name == ORGANIZER_MARKER:
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    frame[2] += 1
+                continue
+            
+            try:
+                dest_path = reserve(entry.name)
+                move_file(entry.path, str(dest_path))
+                
+                # Record for undo
+                record(entry.path, str(dest_path))
+                
+                stats["moved"] += 1
+                logger.info(f"Flattened: {entry.name}")
+                
             except Exception as e:
-                self.logger.error(f"Watch Mode Error: {e}")
+                logger.error(f"Error moving {entry.path}: {e}")
+                stats["errors"] += 1
+                frame[2] += 1
+    finally:
+        for frame in stack:
+            frame[1].close()
 
 
-def start_watch_mode(source_dir: str, dest_dir: str, use_ai: bool):
-    """Start monitoring a directory for changes."""
+def start_watch_mode(
+    source_dir: Optional[str],
+    dest_dir: Optional[str],
+    use_ai: bool,
+    smart_context: bool = False,
+    quiet_period: Optional[float] = None,
+    watch_config: Optional[str] = None,
+    workers: int = 1,
+    watch_backend: str = "native"
+):
+    """
+    Start monitoring one or more directories and organize files as they arrive.
+    
+    Only changed files are organized (see watcher.WatchService); a periodic
+    reconcile scan picks up anything an event missed. Files are moved once
+    they have been unchanged for quiet_period seconds.
+    
+    Args:
+        source_dir: Folder to watch (ignored when watch_config is given).
+        dest_dir: Destination for source_dir (defaults to source_dir).
+        use_ai: Unused; kept for compatibility.
+        smart_context: Adapt organization to the folder's content.
+        quiet_period: Seconds a file must be unchanged before it is moved.
+        watch_config: JSON file listing roots (see watcher.load_watch_roots).
+        workers: Shared worker pool size across all roots.
+        watch_backend: "native" (watchdog events) or "poll" (snapshot
+            polling, for network shares without reliable events).
+    """
     logger = get_logger()
-    if not WATCHDOG_AVAILABLE:
+    if watch_backend == "native" and not WATCHDOG_AVAILABLE:
         logger.error("watchdog library not installed. Install with: pip install watchdog")
         return False
-        
-    source = Path(source_dir)
-    dest = Path(dest_dir) or source
     
-    event_handler = OrganizerHandler(str(source), str(dest), use_ai)
-    observer = Observer()
-    observer.schedule(event_handler, str(source), recursive=False)
+    from watcher import WatchRoot, WatchService, load_watch_roots, QUIET_PERIOD
+    
+    if watch_config:
+        roots = load_watch_roots(watch_config)
+    else:
+        source = Path(source_dir)
+        dest = Path(dest_dir) if dest_dir else source
+        roots = [WatchRoot(str(source), str(dest), smart_context=smart_context)]
+    
+    service = WatchService(
+        roots,
+        workers=workers,
+        quiet_period=QUIET_PERIOD if quiet_period is None else quiet_period,
+        backend=watch_backend
+    )
     
-    logger.info(f"WATCH MODE ACTIVE: Monitoring {source}")
+    for root in roots:
+        logger.info(f"WATCH MODE ACTIVE: Monitoring {root.source_dir}")
     logger.info("Press Ctrl+C to stop.")
     
-    observer.start()
+    service.start()
     try:
+        last_report = time.monotonic()
         while True:
             time.sleep(1)
+            if time.monotonic() - last_report >= 30:
+                last_report = time.monotonic()
+                for source, metrics in service.metrics()["roots"].items():
+                    logger.debug(
+                        f"Watch queue {source}: depth={metrics['depth']} lag={metrics['lag']:.1f}s "
+                        f"processed={metrics['processed']} dropped={metrics['dropped']}"
+                    )
     except KeyboardInterrupt:
-        observer.stop()
         logger.info("Watch Mode stopped.")
+    finally:
+        service.stop()
     
-    observer.join()
     return True
 
 
@@ -465,6 +980,11 @@ Examples:
   python organizer.py --source ~/Downloads      # Specify source
   python organizer.py --dry-run                 # Preview without moving
   python organizer.py --log-level DEBUG         # Verbose logging
+  python organizer.py --workers 8               # Concurrent moves (network shares)
+  python organizer.py -n --plan-out plan.jsonl  # Save a plan to review
+  python organizer.py --apply-plan plan.jsonl   # Apply a reviewed plan
+  python organizer.py -r --exclude node_modules # Include subfolders
+  python organizer.py --flatten-all --workers 8 # Flatten every subfolder
         """
     )
     
@@ -496,6 +1016,38 @@ Examples:
     
 
     
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Also organize files in subfolders (folders created by the organizer are skipped)"
+    )
+    
+    parser.add_argument(
+        "--include",
+        type=str,
+        action="append",
+        default=None,
+        metavar="GLOB",
+        help="With --recursive, only organize files matching GLOB (repeatable)"
+    )
+    
+    parser.add_argument(
+        "--exclude",
+        type=str,
+        action="append",
+        default=None,
+        metavar="GLOB",
+        help="With --recursive, skip files and folders matching GLOB (repeatable)"
+    )
+    
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        metavar="N",
+        help="With --recursive, descend at most N folder levels (default: unlimited)"
+    )
+    
     parser.add_argument(
         "--log-level", "-l",
         type=str,
@@ -516,19 +1068,132 @@ Examples:
         help="Undo the last organization operation"
     )
     
+    parser.add_argument(
+        "--undo-session",
+        type=str,
+        default=None,
+        metavar="ID",
+        help="Undo the session with this id (see --history)"
+    )
+    
+    parser.add_argument(
+        "--only",
+        type=str,
+        default=None,
+        metavar="PATH_OR_GLOB",
+        help="With --undo/--undo-session, restore only files under this path or matching this glob"
+    )
+    
     parser.add_argument(
         "--history",
         action="store_true",
         help="Show organization history and exit"
     )
     
+    parser.add_argument(
+        "--find",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Show which sessions moved a file to or from PATH and exit"
+    )
+    
+    parser.add_argument(
+        "--history-backend",
+        type=str,
+        choices=sorted(HISTORY_BACKENDS),
+        default=None,
+        help="History storage backend (default: journal, or $SFO_HISTORY_BACKEND)"
+    )
+    
     parser.add_argument(
         "--watch", "-w",
         action="store_true",
         help="Run in Watch Mode: monitor source folder and organize new files in real-time"
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        "--watch-config",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Watch Mode: JSON list of roots (source, dest, smart_context, rules_file) to watch together"
+    )
+    
+    parser.add_argument(
+        "--watch-backend",
+        type=str,
+        choices=["native", "poll"],
+        default="native",
+        help="Watch Mode event source: native OS events, or polling for SMB/NFS mounts (default: native)"
+    )
+    
+    parser.add_argument(
+        "--quiet-period",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Watch Mode: move a file once it has been unchanged this long (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--flatten",
+        action="store_true",
+        help="Move files out of organizer-created folders back to the source root and exit"
+    )
+    
+    parser.add_argument(
+        "--flatten-all",
+        action="store_true",
+        help="Like --flatten, but flatten every subfolder of the source"
+    )
+    
+    parser.add_argument(
+        "--plan-out",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Write the move plan to a JSONL file (combine with --dry-run to review first)"
+    )
+    
+    parser.add_argument(
+        "--apply-plan",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Apply a plan written by --plan-out without re-scanning the source"
+    )
+    
+    parser.add_argument(
+        "--dedup",
+        type=str,
+        choices=list(DEDUP_ACTIONS),
+        default=None,
+        help="Detect identical files by content and skip them, hard-link them, or move them to Duplicates"
+    )
+    
+    parser.add_argument(
+        "--verify",
+        type=str,
+        choices=list(VERIFY_MODES),
+        default=VERIFY_SIZE,
+        help="How copies to another drive are checked before the original is deleted (default: size)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of concurrent move workers, also folders flattened at once (default: 1). Helps on network shares."
+    )
+    
+    args = parser.parse_args()
+    if not args.recursive and (args.include or args.exclude or args.max_depth is not None):
+        parser.error("--include, --exclude and --max-depth require --recursive")
+    if args.max_depth is not None and args.max_depth < 0:
+        parser.error("--max-depth must be 0 or more")
+    return args
 
 
 def main() -> int:
@@ -552,10 +1217,27 @@ def main() -> int:
     print("SFO File Organizer")
     print("=" * 50)
     
-    # Handle --undo flag
-    if args.undo:
-        print("\nUndoing last organization...")
-        result = undo_last_session()
+    if args.history_backend:
+        set_history_backend(args.history_backend)
+    
+    # Close out sessions left open by a crashed run so they can be undone
+    try:
+        if recover_incomplete_sessions():
+            print("Recovered history from an interrupted run")
+    except Exception as e:
+        get_logger().warning(f"Could not recover history: {e}")
+    
+    # Handle --undo / --undo-session flags
+    if args.undo or args.undo_session:
+        session_id = args.undo_session
+        if session_id is None:
+            last = get_last_session(include_movements=False)
+            session_id = last["id"] if last else None
+        if session_id is None:
+            result = {"success": False, "message": "No session to undo"}
+        else:
+            print(f"\nUndoing session {session_id}...")
+            result = undo_session(session_id, path_filter=args.only, workers=args.workers)
         if result["success"]:
             print(f"\n✅ Restored {result['restored']} files")
             if result["errors"] > 0:
@@ -574,13 +1256,68 @@ def main() -> int:
             print("\nOrganization History:")
             print("-" * 50)
             for i, session in enumerate(reversed(history), 1):
-                status = "✓" if not session["undone"] else "↩ (undone)"
+                if session["undone"]:
+                    status = "↩ (undone)"
+                elif session["partial_undo"]:
+                    status = "↩ (partially undone)"
+                else:
+                    status = "✓"
                 dry = " [dry-run]" if session["dry_run"] else ""
-                print(f"{i}. {session['timestamp'][:16]} - {session['files_moved']} files {status}{dry}")
+                print(f"{i}. {session['timestamp'][:16]} - {session['files_moved']} files {status}{dry} [{session['id']}]")
             print("-" * 50)
         print("=" * 50)
         return 0
     
+    # Handle --find flag
+    if args.find:
+        matches = find_movements(os.path.abspath(args.find))
+        if not matches:
+            print(f"\nNo history found for: {args.find}")
+        else:
+            print(f"\nHistory for {args.find}:")
+            print("-" * 50)
+            for match in matches:
+                print(f"{match['timestamp'][:16]} [{match['session_id']}]")
+                print(f"    {match['from']} -> {match['to']}")
+            print("-" * 50)
+        print("=" * 50)
+        return 0
+    
+    # Handle --apply-plan flag (no scanning or classification)
+    if args.apply_plan:
+        print(f"\n{'[DRY RUN] Previewing' if args.dry_run else 'Applying'} plan: {args.apply_plan}")
+        try:
+            plan = MovePlan.read_jsonl(args.apply_plan, stream=True)
+            if args.dry_run:
+                stats = preview_plan(plan)
+            else:
+                stats = apply_plan(plan, workers=args.workers, verify=args.verify)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ Error: {e}")
+            return 1
+        
+        print("\n" + "=" * 50)
+        print("Summary:")
+        print(f"  Files {'to move' if args.dry_run else 'moved'}: {stats['moved']}")
+        print(f"  Errors: {stats['errors']}")
+        print("=" * 50)
+        return 0 if stats["errors"] == 0 else 1
+    
+    # Handle --flatten / --flatten-all flags
+    if args.flatten or args.flatten_all:
+        source = args.source or DEFAULT_SOURCE_DIR
+        print(f"\nFlattening{' ALL folders in' if args.flatten_all else ''}: {source}")
+        stats = flatten_directory(source, flatten_all=args.flatten_all, workers=args.workers)
+        
+        print("\n" + "=" * 50)
+        print("Summary:")
+        print(f"  Files moved to root: {stats['moved']}")
+        print(f"  Folders removed: {stats['removed_dirs']}")
+        print(f"  Folders preserved: {stats['skipped_dirs']}")
+        print(f"  Errors: {stats['errors']}")
+        print("=" * 50)
+        return 0 if stats["errors"] == 0 else 1
+    
     # Use CLI args or fall back to interactive prompts (backward compatibility)
     source = args.source
     dest = args.dest
@@ -592,7 +1329,7 @@ def main() -> int:
         dest = source  # Set destination to same as source
         print(f"[IN-PLACE MODE] Organizing within: {source}")
     
-    if source is None and dest is None and not args.dry_run and not args.in_place:
+    if source is None and dest is None and not args.dry_run and not args.in_place and not args.watch_config:
         # Check if running in a non-interactive environment
         if sys.stdin is None:
             print("Error: Running in non-interactive mode without arguments.")
@@ -606,14 +1343,20 @@ def main() -> int:
     if args.dry_run:
         print("\n[DRY RUN MODE] No files will be moved.\n")
     
-    if args.watch:
-        if not WATCHDOG_AVAILABLE:
+    if args.watch or args.watch_config:
+        if args.watch_backend == "native" and not WATCHDOG_AVAILABLE:
             print("\n❌ Error: 'watchdog' library is required for Watch Mode.")
             print("Install it with: pip install watchdog")
             return 1
         
         try:
-            start_watch_mode(source, dest or source, False)
+            start_watch_mode(
+                source, dest or source, False,
+                quiet_period=args.quiet_period,
+                watch_config=args.watch_config,
+                workers=args.workers,
+                watch_backend=args.watch_backend
+            )
             return 0
         except Exception as e:
             print(f"\n❌ Error starting Watch Mode: {e}")
@@ -626,13 +1369,23 @@ def main() -> int:
             source_dir=source,
             dest_dir=dest,
             dry_run=args.dry_run,
-            use_ai=False
+            use_ai=False,
+            workers=args.workers,
+            plan_out=args.plan_out,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            max_depth=args.max_depth,
+            verify=args.verify,
+            dedup=args.dedup
         )
         
         print("\n" + "=" * 50)
         print("Summary:")
         print(f"  Files {'to move' if args.dry_run else 'moved'}: {stats['moved']}")
         print(f"  Skipped (directories): {stats['skipped']}")
+        if "duplicates" in stats:
+            print(f"  Duplicates: {stats['duplicates']}")
         print(f"  Errors: {stats['errors']}")
         print("=" * 50)
         
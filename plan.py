@@ -0,0 +1,207 @@
+"""
+Move plans for SFO File Organizer.
+
+A MovePlan is the output of the planning stage of organize_files: every
+file has already been classified and given a collision-free destination.
+Plans can be written to JSON Lines (one header line, one line per move,
+then a trailer line) and applied later without re-scanning or
+re-classifying the source. Streamed plans only know their skipped and
+error counts and destination folders once every move has been produced,
+so those are repeated in the trailer, which takes precedence on reading.
+"""
+
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+PLAN_VERSION = 2
+
+# Version 1 plans have no trailer line
+READABLE_VERSIONS = (1, PLAN_VERSION)
+
+# Bytes read at a time when looking for the trailer from the end of a file
+TRAILER_BLOCK = 64 * 1024
+
+# Why a file was assigned its category
+MOVE_REASON_EXTENSION = "extension"
+MOVE_REASON_RULE = "rule"
+MOVE_REASON_CONTEXT = "context"
+MOVE_REASON_DUPLICATE = "duplicate"
+# Moved as usual, then replaced by a hard link to `original`
+MOVE_REASON_HARDLINK = "hardlink"
+
+
+class PlannedMove(NamedTuple):
+    """A single planned file move."""
+    source: str
+    dest: str
+    category: str
+    reason: str
+    # For duplicates: the file with the same content
+    original: str = ""
+
+
+class MovePlan:
+    """
+    An ordered list of planned moves plus the run it was built for.
+
+    Args:
+        source_dir: Directory that was scanned.
+        dest_dir: Directory the category folders live in.
+        moves: Planned moves; any iterable, so loaded plans can stream.
+        skipped: Number of non-file entries skipped while planning.
+        errors: Number of files that could not be planned.
+        created: ISO timestamp of when the plan was built.
+        dest_dirs: Distinct destination folders the moves need, in first-use
+            order, so they can be created in one batch before moving.
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        dest_dir: str,
+        moves: Optional[Iterable[PlannedMove]] = None,
+        skipped: int = 0,
+        errors: int = 0,
+        created: Optional[str] = None,
+        dest_dirs: Optional[List[str]] = None
+    ):
+        self.source_dir = source_dir
+        self.dest_dir = dest_dir
+        self.moves = moves if moves is not None else []
+        self.skipped = skipped
+        self.errors = errors
+        self.created = created or datetime.now().isoformat()
+        self.dest_dirs = dest_dirs if dest_dirs is not None else []
+
+    def __iter__(self) -> Iterator[PlannedMove]:
+        return iter(self.moves)
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def header(self) -> dict:
+        """Return the metadata written as the first JSONL line."""
+        return {
+            "version": PLAN_VERSION,
+            "created": self.created,
+            "source_dir": self.source_dir,
+            "dest_dir": self.dest_dir,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "dest_dirs": self.dest_dirs,
+        }
+
+    def trailer(self) -> dict:
+        """Return the totals written as the last JSONL line, once moves are done."""
+        return {
+            "trailer": True,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "dest_dirs": self.dest_dirs,
+        }
+
+    def write_jsonl(self, path: str) -> int:
+        """
+        Stream the plan to a JSON Lines file.
+
+        Args:
+            path: Output file path.
+
+        Returns:
+            Number of moves written.
+        """
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.header()) + "\n")
+            for move in self.moves:
+                record = move._asdict()
+                if not move.original:
+                    del record["original"]
+                f.write(json.dumps(record) + "\n")
+                count += 1
+            f.write(json.dumps(self.trailer()) + "\n")
+        return count
+
+    @classmethod
+    def read_jsonl(cls, path: str, stream: bool = False) -> "MovePlan":
+        """
+        Load a plan written by write_jsonl().
+
+        Args:
+            path: Plan file path.
+            stream: If True, moves are read lazily while the plan is applied
+                instead of being loaded into memory up front.
+
+        Raises:
+            ValueError: If the file is not a plan or has an unknown version.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            first = f.readline()
+        try:
+            header = json.loads(first)
+        except json.JSONDecodeError:
+            header = None
+        if not isinstance(header, dict) or "source_dir" not in header:
+            raise ValueError(f"Not a move plan: {path}")
+        if header.get("version") not in READABLE_VERSIONS:
+            raise ValueError(f"Unsupported plan version: {header.get('version')}")
+        header.update(_read_trailer(path) or {})
+
+        moves = _iter_moves(path)
+        return cls(
+            header["source_dir"],
+            header["dest_dir"],
+            moves if stream else list(moves),
+            skipped=header.get("skipped", 0),
+            errors=header.get("errors", 0),
+            created=header.get("created"),
+            dest_dirs=header.get("dest_dirs", []),
+        )
+
+
+def _read_trailer(path: str) -> Optional[dict]:
+    """Return the trailer record of a plan file, or None if it has none."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0:
+            step = min(TRAILER_BLOCK, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            if b"\n" in tail.rstrip():
+                break
+    try:
+        record = json.loads(tail.rstrip().rsplit(b"\n", 1)[-1])
+    except ValueError:
+        return None  # Interrupted write: the header's totals stand
+    return record if isinstance(record, dict) and record.get("trailer") else None
+
+
+def _iter_moves(path: str) -> Iterator[PlannedMove]:
+    """Yield the moves of a plan file, skipping its header and trailer lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if record.get("trailer"):
+                    continue
+                yield PlannedMove(
+                    record["source"], record["dest"], record["category"], record["reason"],
+                    record.get("original", "")
+                )
+
+
+def batched(moves: Iterable[PlannedMove], size: int) -> Iterator[List[PlannedMove]]:
+    """Split moves into lists of at most size items."""
+    iterator = iter(moves)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -5,26 +5,51 @@ Provides keyword-based classification that takes priority over extension-based l
 Supports both built-in rules and user-defined custom rules from the UI.
 """
 
+import os
 import json
+import time
+import threading
+from array import array
+from types import MappingProxyType
 from pathlib import Path
-from typing import Optional
-from app_config import FILE_CATEGORIES, DATA_DIR
+from typing import Iterable, Mapping, Optional
+from app_config import FILE_CATEGORIES, DETAILED_CATEGORIES, DATA_DIR
+from matcher import create_matcher
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # Path to custom rules file (managed by rules_ui.py)
 CUSTOM_RULES_FILE = DATA_DIR / "custom_rules.json"
 
+# Text-like extensions where keywords may refine the extension category
+AMBIGUOUS_EXTENSIONS = frozenset({".log", ".md", ".csv", ".dat"})
 
-def load_custom_rules() -> dict:
-    """Load user-defined custom rules from JSON file."""
-    if CUSTOM_RULES_FILE.exists():
+# Reason codes reported by classify_many()
+REASON_EXTENSION = 0
+REASON_RULE = 1
+
+
+def _read_rules_file(rules_file: Path) -> dict:
+    """Read the whole custom rules JSON document, or {} if unavailable."""
+    if rules_file.exists():
         try:
-            with open(CUSTOM_RULES_FILE, "r", encoding="utf-8") as f:
+            with open(rules_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                return data.get("keyword_rules", {})
+                if isinstance(data, dict):
+                    return data
         except Exception:
             pass
     return {}
 
+
+def load_custom_rules() -> dict:
+    """Load user-defined custom rules from JSON file."""
+    return _read_rules_file(CUSTOM_RULES_FILE).get("keyword_rules", {})
+
 # Keyword rules: maps keywords (in filename) to categories
 # These take priority over extension-based classification
 KEYWORD_RULES: dict[str, str] = {
@@ -135,6 +160,234 @@ KEYWORD_RULES: dict[str, str] = {
 }
 
 
+def _normalize_extension(ext: str) -> str:
+    """Lowercase an extension and make sure it has a leading dot."""
+    ext = str(ext).strip().lower()
+    if ext and not ext.startswith("."):
+        ext = "." + ext
+    return ext
+
+
+class ExtensionIndex:
+    """
+    Frozen extension -> category lookup tables.
+    
+    Built once from FILE_CATEGORIES (first category listing an extension
+    wins, matching the old linear scan), DETAILED_CATEGORIES and the
+    ``extension_overrides`` section of the custom rules file, which takes
+    precedence over FILE_CATEGORIES.
+    
+    Args:
+        file_categories: Category -> list of extensions.
+        detailed_categories: Extension -> Smart Context sub-category.
+        overrides: Extension -> category overrides from custom rules.
+    """
+    
+    def __init__(
+        self,
+        file_categories: Mapping,
+        detailed_categories: Mapping,
+        overrides: Optional[Mapping] = None
+    ):
+        categories = {}
+        for category, extensions in file_categories.items():
+            for ext in extensions:
+                categories.setdefault(_normalize_extension(ext), category)
+        
+        for ext, category in (overrides or {}).items():
+            ext = _normalize_extension(ext)
+            if ext and isinstance(category, str) and category:
+                categories[ext] = category
+        
+        detailed = {_normalize_extension(ext): sub for ext, sub in detailed_categories.items()}
+        
+        self.categories: Mapping[str, str] = MappingProxyType(categories)
+        self.detailed: Mapping[str, str] = MappingProxyType(detailed)
+    
+    def category(self, file_extension: str) -> str:
+        """Return the category for an extension, or 'Other'."""
+        return self.categories.get(file_extension.lower(), "Other")
+    
+    def detailed_category(self, file_extension: str) -> Optional[str]:
+        """Return the Smart Context sub-category for an extension, if any."""
+        return self.detailed.get(file_extension.lower())
+
+
+def _categories_signature() -> tuple:
+    """Cheap fingerprint of the in-memory category tables."""
+    return (
+        tuple((category, tuple(extensions)) for category, extensions in FILE_CATEGORIES.items()),
+        tuple(DETAILED_CATEGORIES.items()),
+    )
+
+
+class RuleStore:
+    """
+    Compiled, cached view of the custom and built-in keyword rules.
+    
+    The custom rules file is parsed once and compiled together with
+    KEYWORD_RULES into a single priority-ordered list (custom rules first,
+    then built-in rules in dict order). The file is re-read only when its
+    mtime or size changes; that check is itself throttled to once every
+    ``check_interval`` seconds so classifying a large directory does not
+    stat the rules file once per file.
+    
+    Keywords are compiled into a multi-pattern matcher (see matcher.py);
+    the backend is pluggable and defaults to picking linear scanning or
+    Aho-Corasick by rule set size. The store also owns the ExtensionIndex,
+    which is rebuilt whenever the rules file or the category tables in
+    app_config change.
+    
+    Args:
+        rules_file: Path to the custom rules JSON file.
+        check_interval: Minimum seconds between staleness checks.
+        matcher: Name of the keyword matcher backend.
+    """
+    
+    def __init__(
+        self,
+        rules_file: Optional[Path] = None,
+        check_interval: float = 1.0,
+        matcher: str = "auto"
+    ):
+        self.rules_file = Path(rules_file) if rules_file is not None else CUSTOM_RULES_FILE
+        self.check_interval = check_interval
+        self.matcher_backend = matcher
+        self._lock = threading.Lock()
+        self._signature = None
+        self._last_check = None
+        self._custom_rules: dict = {}
+        # (keyword_rules, matcher) swapped as one object so readers never
+        # see rules and matcher from different loads
+        self._compiled: tuple = ((), create_matcher((), matcher))
+        self._extension_index = ExtensionIndex(FILE_CATEGORIES, DETAILED_CATEGORIES)
+    
+    def _file_signature(self) -> tuple:
+        """Return the rules file (mtime_ns, size) plus the category fingerprint."""
+        try:
+            st = os.stat(self.rules_file)
+            file_signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            file_signature = None
+        return (file_signature, _categories_signature())
+    
+    def _compile(self, data: dict) -> None:
+        """Build the priority-ordered keyword list from a rules document."""
+        custom_rules = data.get("keyword_rules", {})
+        if not isinstance(custom_rules, dict):
+            custom_rules = {}
+        
+        compiled = []
+        seen = set()
+        for rules in (custom_rules, KEYWORD_RULES):
+            for keyword, category in rules.items():
+                keyword = str(keyword).lower()
+                if keyword and keyword not in seen:
+                    seen.add(keyword)
+                    compiled.append((keyword, category))
+        
+        overrides = data.get("extension_overrides", {})
+        if not isinstance(overrides, dict):
+            overrides = {}
+        
+        self._custom_rules = dict(custom_rules)
+        matcher = create_matcher([keyword for keyword, _ in compiled], self.matcher_backend)
+        self._compiled = (tuple(compiled), matcher)
+        self._extension_index = ExtensionIndex(FILE_CATEGORIES, DETAILED_CATEGORIES, overrides)
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the rules if the rules file changed since the last load.
+        
+        Args:
+            force: Reload even if the file signature is unchanged.
+        
+        Returns:
+            True if the rules were (re)compiled, False otherwise.
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+            signature = self._file_signature()
+            if not force and self._signature is not None and signature == self._signature:
+                return False
+            self._compile(_read_rules_file(self.rules_file))
+            self._signature = signature
+            return True
+    
+    def set_matcher(self, backend: str) -> None:
+        """
+        Switch the keyword matcher backend and recompile.
+        
+        Args:
+            backend: A name registered in matcher.MATCHER_BACKENDS.
+        """
+        create_matcher((), backend)  # Validate before touching state
+        self.matcher_backend = backend
+        self.refresh(force=True)
+    
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup."""
+        with self._lock:
+            self._signature = None
+            self._last_check = None
+    
+    def _ensure_fresh(self) -> None:
+        """Refresh the compiled rules if the check interval has elapsed."""
+        last_check = self._last_check
+        if last_check is None or time.monotonic() - last_check >= self.check_interval:
+            self.refresh()
+    
+    @property
+    def custom_rules(self) -> dict:
+        """The user-defined keyword rules as loaded from the rules file."""
+        self._ensure_fresh()
+        return self._custom_rules
+    
+    @property
+    def keyword_rules(self) -> tuple:
+        """All (keyword, category) pairs in priority order."""
+        self._ensure_fresh()
+        return self._compiled[0]
+    
+    @property
+    def extension_index(self) -> ExtensionIndex:
+        """The extension -> category index."""
+        self._ensure_fresh()
+        return self._extension_index
+    
+    @property
+    def matcher(self):
+        """The compiled keyword matcher."""
+        self._ensure_fresh()
+        return self._compiled[1]
+    
+    def match(self, filename: str) -> Optional[str]:
+        """
+        Return the category of the highest-priority keyword in filename.
+        
+        Args:
+            filename: The name of the file (with or without extension).
+        
+        Returns:
+            Category name if a keyword match is found, None otherwise.
+        """
+        self._ensure_fresh()
+        keyword_rules, matcher = self._compiled
+        index = matcher.first_match(filename.lower())
+        if index is None:
+            return None
+        return keyword_rules[index][1]
+
+
+# Shared store used by classify_file, organize_files and watch mode
+_rule_store = RuleStore()
+
+
+def get_rule_store() -> RuleStore:
+    """Return the process-wide rule store."""
+    return _rule_store
+
+
 def classify_by_rules(filename: str) -> Optional[str]:
     """
     Classify a file based on keyword rules in the filename.
@@ -154,20 +407,7 @@ def classify_by_rules(filename: str) -> Optional[str]:
         >>> classify_by_rules("random_file.txt")
         None
     """
-    filename_lower = filename.lower()
-    
-    # Check custom rules first (user-defined rules have highest priority)
-    custom_rules = load_custom_rules()
-    for keyword, category in custom_rules.items():
-        if keyword in filename_lower:
-            return category
-    
-    # Then check built-in rules
-    for keyword, category in KEYWORD_RULES.items():
-        if keyword in filename_lower:
-            return category
-    
-    return None
+    return get_rule_store().match(filename)
 
 
 def classify_by_extension(file_extension: str) -> str:
@@ -180,11 +420,7 @@ def classify_by_extension(file_extension: str) -> str:
     Returns:
         Category name or 'Other' if extension is not recognized.
     """
-    ext = file_extension.lower()
-    for category, extensions in FILE_CATEGORIES.items():
-        if ext in extensions:
-            return category
-    return "Other"
+    return get_rule_store().extension_index.category(file_extension)
 
 
 def classify_file(filename: str, file_extension: str) -> str:
@@ -216,9 +452,7 @@ def classify_file(filename: str, file_extension: str) -> str:
     
     # If extension gives a clear category (not Other), use it
     # Exception: for text-based files, allow keywords to refine
-    ambiguous_extensions = {".log", ".md", ".csv", ".dat"}
-    
-    if ext_category != "Other" and file_extension.lower() not in ambiguous_extensions:
+    if ext_category != "Other" and file_extension.lower() not in AMBIGUOUS_EXTENSIONS:
         return ext_category
     
     # For unknown extensions or ambiguous text files, try keyword rules
@@ -228,3 +462,133 @@ def classify_file(filename: str, file_extension: str) -> str:
     
     # Fall back to extension result (could be "Other")
     return ext_category
+
+
+class BatchClassification:
+    """
+    Compact result of classify_many().
+    
+    Attributes:
+        categories: Category table; ids index into this list.
+        category_ids: One category id per input name (array or NumPy array).
+        reasons: One reason code per input name (REASON_EXTENSION/REASON_RULE).
+    """
+    
+    def __init__(self, categories: list, category_ids, reasons):
+        self.categories = categories
+        self.category_ids = category_ids
+        self.reasons = reasons
+    
+    def __len__(self) -> int:
+        return len(self.category_ids)
+    
+    def __getitem__(self, i: int) -> str:
+        return self.categories[self.category_ids[i]]
+    
+    def __iter__(self):
+        categories = self.categories
+        return (categories[cid] for cid in self.category_ids)
+    
+    def counts(self) -> dict:
+        """Return {category: number of names} for the batch."""
+        totals = [0] * len(self.categories)
+        for cid in self.category_ids:
+            totals[cid] += 1
+        return {category: n for category, n in zip(self.categories, totals) if n}
+
+
+def _suffix(name_lower: str) -> str:
+    """Path(name).suffix without building a Path object."""
+    dot = name_lower.rfind(".")
+    if dot <= 0 or dot == len(name_lower) - 1:
+        return ""
+    return name_lower[dot:]
+
+
+def classify_many(
+    names: Iterable[str],
+    use_keywords: bool = True,
+    use_numpy: bool = False,
+    store: Optional[RuleStore] = None
+) -> BatchClassification:
+    """
+    Classify a whole directory listing in one call.
+    
+    Gives the same answer as classify_file(name, Path(name).suffix) for each
+    name, but lowercases, extracts suffixes and runs the keyword matcher only
+    once per distinct name, and resolves each distinct extension once.
+    
+    Args:
+        names: File names (not paths).
+        use_keywords: If False, classify by extension only.
+        use_numpy: Lowercase and deduplicate with NumPy string arrays and
+            return NumPy id arrays. Off by default: the pure-Python memo is
+            as fast for typical listings and avoids the conversion cost.
+        store: Rule store to use (defaults to the shared store).
+    
+    Returns:
+        BatchClassification with category ids, reasons and the category table.
+    
+    Example:
+        >>> result = classify_many(["a.jpg", "invoice.xyz", "b.bin"])
+        >>> list(result)
+        ['Images', 'Documents', 'Other']
+    """
+    store = store or get_rule_store()
+    extension_index = store.extension_index
+    keyword_rules, matcher = store._compiled
+    
+    if not isinstance(names, (list, tuple)):
+        names = list(names)
+    if use_numpy and not NUMPY_AVAILABLE:
+        raise RuntimeError("NumPy is not installed")
+    
+    categories = []
+    category_ids = {}
+    ext_cache = {}
+    
+    def resolve(name_lower: str) -> tuple:
+        ext = _suffix(name_lower)
+        ext_result = ext_cache.get(ext)
+        if ext_result is None:
+            category = extension_index.category(ext)
+            decisive = category != "Other" and ext not in AMBIGUOUS_EXTENSIONS
+            cid = category_ids.get(category)
+            if cid is None:
+                cid = category_ids[category] = len(categories)
+                categories.append(category)
+            ext_result = ext_cache[ext] = (cid, decisive)
+        
+        cid, decisive = ext_result
+        if decisive or not use_keywords:
+            return cid, REASON_EXTENSION
+        
+        index = matcher.first_match(name_lower)
+        if index is None:
+            return cid, REASON_EXTENSION
+        category = keyword_rules[index][1]
+        rule_cid = category_ids.get(category)
+        if rule_cid is None:
+            rule_cid = category_ids[category] = len(categories)
+            categories.append(category)
+        return rule_cid, REASON_RULE
+    
+    if use_numpy:
+        lowered = np.char.lower(np.asarray(names, dtype=str))
+        unique, inverse = np.unique(lowered, return_inverse=True)
+        resolved = [resolve(str(name)) for name in unique]
+        unique_ids = np.fromiter((r[0] for r in resolved), dtype=np.uint32, count=len(resolved))
+        unique_reasons = np.fromiter((r[1] for r in resolved), dtype=np.uint8, count=len(resolved))
+        inverse = inverse.reshape(-1)
+        return BatchClassification(categories, unique_ids[inverse], unique_reasons[inverse])
+    
+    ids = array("I")
+    reasons = array("B")
+    memo = {}
+    for name in names:
+        result = memo.get(name)
+        if result is None:
+            result = memo[name] = resolve(name.lower())
+        ids.append(result[0])
+        reasons.append(result[1])
+    return BatchClassification(categories, ids, reasons)
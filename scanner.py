@@ -0,0 +1,286 @@
+"""
+Directory scanning for SFO File Organizer.
+
+Wraps os.scandir so each directory entry's type comes from the scandir
+record (no extra syscall on most platforms) and its stat result is fetched
+at most once, then shared by the classifier, Smart Context and the mover.
+"""
+
+import fnmatch
+import os
+import re
+import stat
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+
+class FileEntry:
+    """
+    Lightweight record for one directory entry.
+
+    Behaves enough like a Path for the organizer (name, stem, suffix, str(),
+    os.fspath()) while caching the entry type and stat result.
+
+    Attributes:
+        name: Base name of the entry.
+        path: Full path as a string.
+        is_file: True for regular files (following symlinks, like Path.is_file).
+        is_dir: True for directories (following symlinks).
+    """
+
+    __slots__ = ("name", "path", "is_file", "is_dir", "_entry", "_stat")
+
+    def __init__(self, entry: os.DirEntry):
+        self.name = entry.name
+        self.path = entry.path
+        self._entry = entry
+        self._stat = None
+        try:
+            self.is_file = entry.is_file()
+            self.is_dir = not self.is_file and entry.is_dir()
+        except OSError:
+            self.is_file = self.is_dir = False
+
+    @property
+    def suffix(self) -> str:
+        """File extension, with the same rules as Path.suffix."""
+        dot = self.name.rfind(".")
+        if dot <= 0 or dot == len(self.name) - 1:
+            return ""
+        return self.name[dot:]
+
+    @property
+    def stem(self) -> str:
+        """File name without its suffix, like Path.stem."""
+        suffix = self.suffix
+        return self.name[: -len(suffix)] if suffix else self.name
+
+    def stat(self) -> os.stat_result:
+        """Return the entry's stat result, calling stat() at most once."""
+        if self._stat is None:
+            self._stat = self._entry.stat()
+        return self._stat
+
+    @property
+    def size(self) -> int:
+        return self.stat().st_size
+
+    @property
+    def mtime(self) -> float:
+        return self.stat().st_mtime
+
+    def as_path(self) -> Path:
+        return Path(self.path)
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __str__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"FileEntry({self.path!r})"
+
+
+class _PathEntry:
+    """Minimal os.DirEntry stand-in for a single known path (one stat call)."""
+
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._stat = os.stat(path)
+
+    def is_file(self) -> bool:
+        return stat.S_ISREG(self._stat.st_mode)
+
+    def is_dir(self) -> bool:
+        return stat.S_ISDIR(self._stat.st_mode)
+
+    def stat(self) -> os.stat_result:
+        return self._stat
+
+
+def scan_directory(directory: Union[str, Path]) -> Iterator[FileEntry]:
+    """
+    Yield a FileEntry for every item directly inside directory.
+
+    Args:
+        directory: Directory to list.
+
+    Yields:
+        FileEntry records in scandir order.
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            yield FileEntry(entry)
+
+
+def scan_files(directory: Union[str, Path], skipped: Optional[list] = None) -> Iterator[FileEntry]:
+    """
+    Yield only the regular files directly inside directory.
+
+    Args:
+        directory: Directory to list.
+        skipped: If given, non-file entries are appended to this list.
+
+    Yields:
+        FileEntry records for files.
+    """
+    for entry in scan_directory(directory):
+        if entry.is_file:
+            yield entry
+        elif skipped is not None:
+            skipped.append(entry)
+
+
+def scan_paths(paths: Iterable[Union[str, Path]]) -> Iterator[FileEntry]:
+    """
+    Yield a FileEntry for each given path that still exists.
+
+    Used when the caller already knows which entries changed (e.g. from
+    filesystem events) and a directory listing would be wasted work.
+
+    Args:
+        paths: Paths to look up.
+
+    Yields:
+        FileEntry records, in input order; missing paths are skipped.
+    """
+    for path in paths:
+        try:
+            yield FileEntry(_PathEntry(os.fspath(path)))
+        except OSError:
+            continue
+
+
+def _compile_globs(patterns: Optional[Sequence[str]]):
+    """
+    Split glob patterns into a name regex and a relative-path regex.
+
+    Patterns containing "/" are matched against the path relative to the
+    walk root (always with "/" separators); all others against the base
+    name. Each group is compiled into a single alternation so matching an
+    entry costs one regex call however many patterns there are.
+
+    Returns:
+        (name_regex, path_regex); either may be None.
+    """
+    names, paths = [], []
+    for pattern in patterns or ():
+        pattern = pattern.replace("\\", "/").strip("/")
+        if pattern:
+            (paths if "/" in pattern else names).append(fnmatch.translate(os.path.normcase(pattern)))
+    return (
+        re.compile("|".join(names)) if names else None,
+        re.compile("|".join(paths)) if paths else None,
+    )
+
+
+class TreeWalker:
+    """
+    Iterative, streaming os.scandir walk of a directory tree.
+
+    Entries are yielded as they are read: the walker holds only one open
+    scandir iterator per directory level, so memory stays flat however
+    many entries the tree has. Directory symlinks are not followed.
+
+    Args:
+        root: Directory to walk.
+        include: Globs a file must match (any of) to be yielded.
+        exclude: Globs for files and directories to leave out; excluded
+            directories are not descended into.
+        max_depth: Directory levels to descend below root (0 = root only,
+            None = unlimited).
+        skip_marker: Directories containing a file with this name (e.g.
+            folders the organizer created) are not descended into.
+        skip_dirs: Directories (paths) that are not descended into.
+
+    Attributes:
+        skipped: Directories that were not descended into.
+        filtered: Files left out by the include/exclude globs.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        max_depth: Optional[int] = None,
+        skip_marker: Optional[str] = None,
+        skip_dirs: Optional[Iterable[Union[str, Path]]] = None
+    ):
+        self.root = os.fspath(root)
+        self.max_depth = max_depth
+        self.skip_marker = skip_marker
+        self._skip_dirs = {os.path.normcase(os.path.abspath(path)) for path in skip_dirs or ()}
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+        self._has_include = bool(include)
+        self.skipped = 0
+        self.filtered = 0
+
+    @staticmethod
+    def _matches(globs, name: str, rel_path: str) -> bool:
+        name_regex, path_regex = globs
+        return bool(
+            (name_regex is not None and name_regex.match(os.path.normcase(name)))
+            or (path_regex is not None and path_regex.match(os.path.normcase(rel_path)))
+        )
+
+    def _descend(self, entry: os.DirEntry, rel_path: str, depth: int) -> bool:
+        """Decide whether the directory entry should be walked."""
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        if self._matches(self._exclude, entry.name, rel_path):
+            return False
+        if self._skip_dirs and os.path.normcase(os.path.abspath(entry.path)) in self._skip_dirs:
+            return False
+        if self.skip_marker and os.path.lexists(os.path.join(entry.path, self.skip_marker)):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        # Each stack frame: (open scandir iterator, depth, relative prefix)
+        stack = [(os.scandir(self.root), 0, "")]
+        try:
+            while stack:
+                iterator, depth, prefix = stack[-1]
+                entry = next(iterator, None)
+                if entry is None:
+                    iterator.close()
+                    stack.pop()
+                    continue
+
+                rel_path = prefix + entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    if not self._descend(entry, rel_path, depth):
+                        self.skipped += 1
+                        continue
+                    try:
+                        stack.append((os.scandir(entry.path), depth + 1, rel_path + "/"))
+                    except OSError:
+                        self.skipped += 1
+                    continue
+
+                if entry.name == self.skip_marker:
+                    continue
+                record = FileEntry(entry)
+                if not record.is_file:
+                    self.skipped += 1
+                    continue
+                if self._matches(self._exclude, entry.name, rel_path) or (
+                    self._has_include and not self._matches(self._include, entry.name, rel_path)
+                ):
+                    self.filtered += 1
+                    continue
+                yield record
+        finally:
+            for iterator, _, _ in stack:
+                iterator.close()
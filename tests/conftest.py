@@ -0,0 +1,23 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import pytest
+
+import history
+from history import JournalHistoryStore, set_history_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    """
+    Point the history module at a journal store in tmp_path.
+    
+    The previous store is restored afterwards, so tests may also switch
+    to another store with set_history_store() without cleaning up.
+    """
+    previous = history.get_history_store()
+    journal = JournalHistoryStore(tmp_path / "history")
+    set_history_store(journal)
+    yield journal
+    set_history_store(previous)
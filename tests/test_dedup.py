@@ -0,0 +1,182 @@
+"""
+Unit tests for content-hash duplicate detection.
+"""
+
+import os
+import pytest
+
+import dedup
+from dedup import find_duplicates, link_to_original, PARTIAL_SIZE
+from history import SQLiteHistoryStore, set_history_store, undo_last_session
+from organizer import apply_plan, organize_files
+from plan import MovePlan, PlannedMove
+
+
+# Keep sessions out of the real history
+pytestmark = pytest.mark.usefixtures("store")
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Count the files read by each hashing stage."""
+    calls = {"partial": [], "full": []}
+    for stage, func in (("partial", dedup.partial_hash), ("full", dedup.full_hash)):
+        def wrapper(path, stage=stage, func=func):
+            calls[stage].append(os.path.basename(path))
+            return func(path)
+        monkeypatch.setattr(dedup, f"{stage}_hash", wrapper)
+    return calls
+
+
+def test_staged_hashing(tmp_path, counted):
+    """Unique sizes are never read; only partial-hash survivors are read in full."""
+    big = os.urandom(3 * PARTIAL_SIZE)
+    middle_changed = big[:PARTIAL_SIZE] + os.urandom(PARTIAL_SIZE) + big[2 * PARTIAL_SIZE:]
+    files = {
+        "big.bin": big, "big_copy.bin": big, "tweaked.bin": middle_changed,
+        "small.txt": b"hello", "small_copy.txt": b"hello", "unique.txt": b"only one",
+        "empty1": b"", "empty2": b"",
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+
+    paths = [str(tmp_path / name) for name in files]
+    duplicates = find_duplicates(paths, workers=2)
+
+    assert duplicates == {
+        str(tmp_path / "big_copy.bin"): str(tmp_path / "big.bin"),
+        str(tmp_path / "small_copy.txt"): str(tmp_path / "small.txt"),
+    }
+    assert "unique.txt" not in counted["partial"]
+    assert sorted(counted["full"]) == ["big.bin", "big_copy.bin", "tweaked.bin"]
+
+
+def test_known_files_are_originals(tmp_path):
+    """An already-organized copy wins, and is never reported itself."""
+    (tmp_path / "new.txt").write_text("same")
+    (tmp_path / "old.txt").write_text("same")
+    (tmp_path / "old2.txt").write_text("same")
+
+    duplicates = find_duplicates(
+        [str(tmp_path / "new.txt")], known=[str(tmp_path / "old.txt"), str(tmp_path / "old2.txt")]
+    )
+    assert duplicates == {str(tmp_path / "new.txt"): str(tmp_path / "old.txt")}
+
+
+def test_original_is_deterministic(tmp_path):
+    """The oldest copy wins, then the name without a copy suffix, whatever the order."""
+    names = ["photo (1).jpg", "photo_2.jpg", "photo.jpg", "photo-edit.jpg"]
+    for name in names:
+        (tmp_path / name).write_text("same")
+        os.utime(tmp_path / name, (1_000_000_000, 1_000_000_000))
+    paths = [str(tmp_path / name) for name in names]
+
+    for order in (paths, paths[::-1]):
+        assert set(find_duplicates(order).values()) == {str(tmp_path / "photo.jpg")}
+
+    os.utime(tmp_path / "photo_2.jpg", (900_000_000, 900_000_000))
+    assert set(find_duplicates(paths).values()) == {str(tmp_path / "photo_2.jpg")}
+
+
+class TestOrganizeDedup:
+    """Duplicate policies applied by organize_files."""
+
+    @pytest.fixture
+    def inbox(self, tmp_path):
+        source = tmp_path / "inbox"
+        dest = tmp_path / "sorted"
+        source.mkdir()
+        (dest / "Documents").mkdir(parents=True)
+        content = os.urandom(1000)
+        (source / "report.pdf").write_bytes(content)
+        (source / "report (1).pdf").write_bytes(content)
+        (dest / "Documents" / "archived.pdf").write_bytes(content)
+        (source / "notes.txt").write_text("unique")
+        return source, dest
+
+    def test_skip(self, inbox):
+        source, dest = inbox
+        stats = organize_files(str(source), str(dest), dedup="skip")
+
+        assert stats["moved"] == 1 and stats["duplicates"] == 2
+        assert sorted(os.listdir(source)) == ["report (1).pdf", "report.pdf"]
+
+    def test_move_to_duplicates_and_undo(self, inbox):
+        source, dest = inbox
+        stats = organize_files(str(source), str(dest), dedup="move")
+
+        assert stats["duplicates"] == 2
+        assert (dest / "Duplicates" / "report.pdf").exists()
+        assert (dest / "Duplicates" / "report (1).pdf").exists()
+
+        assert undo_last_session()["restored"] == 3
+        assert sorted(os.listdir(source)) == ["notes.txt", "report (1).pdf", "report.pdf"]
+
+    @pytest.mark.skipif(not hasattr(os, "link"), reason="no hard links")
+    def test_hardlink(self, inbox):
+        source, dest = inbox
+        organize_files(str(source), str(dest), dedup="hardlink")
+
+        archived = (dest / "Documents" / "archived.pdf").stat()
+        linked = (dest / "Documents" / "report.pdf").stat()
+        assert linked.st_ino == archived.st_ino
+        assert archived.st_nlink == 3
+
+    @pytest.mark.skipif(not hasattr(os, "link"), reason="no hard links")
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_undo_hardlink_restores_independent_files(self, inbox, tmp_path, backend):
+        if backend == "sqlite":
+            set_history_store(SQLiteHistoryStore(tmp_path / "history.db"))
+        source, dest = inbox
+        organize_files(str(source), str(dest), dedup="hardlink")
+
+        assert undo_last_session()["restored"] == 3
+        archived = dest / "Documents" / "archived.pdf"
+        assert archived.stat().st_nlink == 1
+        for name in ("report.pdf", "report (1).pdf"):
+            restored = (source / name).stat()
+            assert restored.st_nlink == 1 and restored.st_ino != archived.stat().st_ino
+            assert (source / name).read_bytes() == archived.read_bytes()
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="no hard links")
+def test_hardlink_follows_renamed_original(tmp_path):
+    """A duplicate is linked to where its original really went, never to a stranger."""
+    source = tmp_path / "src"
+    dest = tmp_path / "dst"
+    source.mkdir()
+    (source / "a.txt").write_text("same content")
+    (source / "b.txt").write_text("same content")
+    plan_file = tmp_path / "plan.jsonl"
+    organize_files(str(source), str(dest), dry_run=True, plan_out=str(plan_file), dedup="hardlink")
+
+    unrelated = dest / "Documents" / "a.txt"
+    unrelated.parent.mkdir(parents=True)
+    unrelated.write_text("UNRELATED important")
+    apply_plan(MovePlan.read_jsonl(str(plan_file)))
+
+    assert unrelated.read_text() == "UNRELATED important"
+    assert unrelated.stat().st_nlink == 1
+    original = (dest / "Documents" / "a_1.txt").stat()
+    linked = (dest / "Documents" / "b.txt").stat()
+    assert linked.st_ino == original.st_ino
+
+
+def test_link_refuses_different_content(tmp_path):
+    (tmp_path / "a").write_text("one")
+    (tmp_path / "b").write_text("two")
+    with pytest.raises(ValueError):
+        link_to_original(str(tmp_path / "b"), str(tmp_path / "a"))
+    assert (tmp_path / "b").read_text() == "two"
+
+
+def test_plan_round_trips_original(tmp_path):
+    """Duplicate moves keep their original through a plan file."""
+    plan = MovePlan("/src", "/dst", [
+        PlannedMove("/src/a", "/dst/Documents/a", "Documents", "extension"),
+        PlannedMove("/src/b", "/dst/Documents/b", "Documents", "hardlink", "/dst/Documents/a"),
+    ])
+    plan.write_jsonl(str(tmp_path / "plan.jsonl"))
+    loaded = MovePlan.read_jsonl(str(tmp_path / "plan.jsonl"))
+    assert loaded.moves == plan.moves
+    assert '"original"' not in (tmp_path / "plan.jsonl").read_text().splitlines()[1]
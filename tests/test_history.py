@@ -0,0 +1,486 @@
+"""
+Unit tests for history tracking and undo.
+"""
+
+import json
+import os
+import tracemalloc
+import pytest
+
+import history
+from history import (
+    JournalHistoryStore, start_session, record_movement, save_session,
+    get_history_summary, get_last_session, undo_last_session, undo_session,
+    select_movements, set_history_store
+)
+
+
+def _organize_one(tmp_path, name="a.txt"):
+    """Move one file and record it in a saved session."""
+    src = tmp_path / "src"
+    dest = tmp_path / "dest" / "Documents"
+    src.mkdir(exist_ok=True)
+    dest.mkdir(parents=True, exist_ok=True)
+    (src / name).write_text("x")
+    session = start_session(str(src), str(tmp_path / "dest"))
+    (src / name).rename(dest / name)
+    record_movement(session, str(src / name), str(dest / name))
+    save_session(session)
+    return session
+
+
+class TestJournalHistory:
+    """Tests for the append-only journal store."""
+    
+    def test_save_appends_journal_and_index(self, store, tmp_path):
+        """A saved session writes one journal line per move plus header and completion records."""
+        session = _organize_one(tmp_path)
+        
+        journal = store.journal_path(session["id"]).read_text().splitlines()
+        assert [json.loads(line)["to"] for line in journal] == [str(tmp_path / "dest" / "Documents" / "a.txt")]
+        index = [json.loads(line) for line in store.index_file.read_text().splitlines()]
+        assert index[0]["completed"] is False
+        assert index[-1] == {"id": session["id"], "completed": True, "files_moved": 1}
+        assert all("movements" not in record for record in index)
+        assert len(store.sessions()) == 1
+    
+    def test_summary_reads_only_index(self, store, tmp_path, monkeypatch):
+        """get_history_summary must not open movement journals."""
+        _organize_one(tmp_path)
+        monkeypatch.setattr(store, "iter_movements", lambda *_: pytest.fail("journal read"))
+        
+        summary = get_history_summary()
+        assert len(summary) == 1
+        assert summary[0]["files_moved"] == 1
+        assert summary[0]["undone"] is False
+    
+    def test_undo_marks_session(self, store, tmp_path):
+        """Undo restores files and appends an undone patch to the index."""
+        _organize_one(tmp_path)
+        assert get_last_session(include_movements=False)["files_moved"] == 1
+        
+        result = undo_last_session()
+        assert result["restored"] == 1
+        assert (tmp_path / "src" / "a.txt").exists()
+        assert get_history_summary()[0]["undone"] is True
+        assert get_last_session() is None
+    
+    def test_prune_keeps_last_sessions(self, tmp_path):
+        """Old sessions and their journals are dropped beyond max_sessions."""
+        journal = JournalHistoryStore(tmp_path / "history", max_sessions=2)
+        ids = []
+        for i in range(4):
+            session = start_session("src", "dest")
+            record_movement(session, f"src/{i}", f"dest/{i}")
+            session["completed"] = True
+            journal.save(session)
+            ids.append(session["id"])
+        
+        assert [s["id"] for s in journal.sessions()] == ids[-2:]
+        assert not journal.journal_path(ids[0]).exists()
+    
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_prune_spares_streaming_sessions(self, store, tmp_path, backend):
+        """A session still recording is neither pruned nor counted against the limit."""
+        from history import SQLiteHistoryStore
+        if backend == "journal":
+            target = JournalHistoryStore(tmp_path / "history", max_sessions=2)
+        else:
+            target = SQLiteHistoryStore(tmp_path / "history.db", max_sessions=2)
+        set_history_store(target)
+        try:
+            running = start_session("src", "dest", batch_size=1, sync_interval=3600)
+            record_movement(running, "src/early", "dest/early")
+            
+            finished = []
+            for i in range(3):
+                session = start_session("src", "dest")
+                record_movement(session, f"src/{i}", f"dest/{i}")
+                save_session(session)
+                finished.append(session["id"])
+            
+            ids = [s["id"] for s in target.sessions()]
+            assert running["id"] in ids
+            assert finished[0] not in ids and finished[1:] == [i for i in ids if i != running["id"]]
+            
+            record_movement(running, "src/late", "dest/late")
+            save_session(running)
+            header = target.get(running["id"])
+            assert header["completed"] and header["files_moved"] == 2
+            assert target.count_movements(running["id"]) == 2
+        finally:
+            if backend == "sqlite":
+                target.close()
+    
+    def test_prune_keeps_lines_from_another_writer(self, tmp_path):
+        """Index lines appended by another store (process) survive a prune rewrite."""
+        import threading
+        pruning = JournalHistoryStore(tmp_path / "history", max_sessions=2)
+        other = JournalHistoryStore(tmp_path / "history", max_sessions=2)
+        running = start_session("src", "dest")
+        other.begin(running)
+        
+        def append_updates():
+            for i in range(200):
+                other.update(running["id"], **{f"n{i}": i})
+        
+        writer = threading.Thread(target=append_updates)
+        writer.start()
+        for i in range(30):
+            session = start_session("src", "dest")
+            record_movement(session, f"src/{i}", f"dest/{i}")
+            session["completed"] = True
+            pruning.save(session)
+        writer.join()
+        
+        header = other.get(running["id"])
+        assert all(header.get(f"n{i}") == i for i in range(200))
+    
+    def test_legacy_migration(self, tmp_path):
+        """Sessions from organizer_history.json are imported once."""
+        legacy = tmp_path / "organizer_history.json"
+        legacy.write_text(json.dumps({"sessions": [{
+            "timestamp": "2024-01-01T00:00:00", "source_dir": "s", "dest_dir": "d",
+            "dry_run": False, "completed": True, "movements": [{"from": "s/a", "to": "d/a"}],
+        }]}))
+        journal = JournalHistoryStore(tmp_path / "history", legacy_file=legacy)
+        
+        sessions = journal.sessions()
+        assert len(sessions) == 1
+        assert list(journal.iter_movements(sessions[0]["id"])) == [{"from": "s/a", "to": "d/a"}]
+        assert not legacy.exists()
+    
+    def test_dry_run_not_saved(self, store):
+        """Dry-run sessions never reach the store."""
+        session = start_session("src", "dest", dry_run=True)
+        record_movement(session, "src/a", "dest/a")
+        save_session(session)
+        assert get_history_summary() == []
+
+
+class TestSQLiteHistory:
+    """Tests for the SQLite history backend."""
+    
+    @pytest.fixture
+    def sqlite_store(self, store, tmp_path):
+        from history import SQLiteHistoryStore
+        db = SQLiteHistoryStore(tmp_path / "history.db", batch_size=2)
+        set_history_store(db)
+        yield db
+        db.close()
+    
+    def test_wal_mode(self, sqlite_store):
+        """The database should run in WAL mode."""
+        mode = sqlite_store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "wal"
+    
+    def test_round_trip_and_undo(self, sqlite_store, tmp_path):
+        """Sessions saved in batches can be listed, read back and undone."""
+        _organize_one(tmp_path, "a.txt")
+        session = start_session("s", "d")
+        for i in range(5):
+            record_movement(session, f"s/{i}", f"d/{i}")
+        save_session(session)
+        
+        assert [s["files_moved"] for s in get_history_summary()] == [1, 5]
+        assert [m["to"] for m in sqlite_store.iter_movements(session["id"])] == [f"d/{i}" for i in range(5)]
+        
+        sqlite_store.update(session["id"], undone=True, note="manual")
+        header = sqlite_store.get(session["id"])
+        assert header["undone"] is True
+        assert header["note"] == "manual"
+        
+        result = undo_last_session()
+        assert result["restored"] == 1
+        assert (tmp_path / "src" / "a.txt").exists()
+    
+    def test_find_by_path(self, sqlite_store):
+        """Indexed lookup answers where a file went and which session moved it."""
+        first = start_session("s", "d")
+        record_movement(first, "/in/a.pdf", "/out/Documents/a.pdf")
+        save_session(first)
+        second = start_session("s", "d")
+        record_movement(second, "/out/Documents/a.pdf", "/in/a.pdf")
+        save_session(second)
+        
+        from history import find_movements
+        matches = find_movements("/in/a.pdf")
+        assert [m["session_id"] for m in matches] == [first["id"], second["id"]]
+        assert matches[0]["to"] == "/out/Documents/a.pdf"
+    
+    def test_unlimited_by_default(self, sqlite_store):
+        """The SQLite backend keeps more than MAX_HISTORY_SESSIONS."""
+        for i in range(history.MAX_HISTORY_SESSIONS + 3):
+            session = start_session("s", "d")
+            record_movement(session, f"s/{i}", f"d/{i}")
+            save_session(session)
+        assert len(get_history_summary()) == history.MAX_HISTORY_SESSIONS + 3
+    
+    def test_streaming_commits(self, sqlite_store):
+        """Streamed batches are committed before the session is finished."""
+        session = start_session("s", "d", batch_size=2, sync_interval=3600)
+        for i in range(5):
+            record_movement(session, f"s/{i}", f"d/{i}")
+        assert sqlite_store.count_movements(session["id"]) == 4
+        
+        save_session(session)
+        assert [m["to"] for m in sqlite_store.iter_movements(session["id"])] == [f"d/{i}" for i in range(5)]
+        assert sqlite_store.get(session["id"])["completed"] is True
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_linked_flag_streams_with_movements(store, tmp_path, backend):
+    """Hard-link flags are movement records, not header fields."""
+    import sqlite3
+    from history import SQLiteHistoryStore
+    if backend == "sqlite":
+        # A database created before the linked column existed
+        db_path = tmp_path / "history.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute(
+                "CREATE TABLE movements (session_id TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "from_path TEXT NOT NULL, to_path TEXT NOT NULL, PRIMARY KEY (session_id, seq))"
+            )
+        target = SQLiteHistoryStore(db_path)
+    else:
+        target = store
+    set_history_store(target)
+    session = start_session("s", "d", batch_size=1)
+    record_movement(session, "s/a", "d/a")
+    record_movement(session, "s/b", "d/b", linked=True)
+    save_session(session)
+    
+    assert list(target.iter_movements(session["id"])) == [
+        {"from": "s/a", "to": "d/a"}, {"from": "s/b", "to": "d/b", "linked": True}
+    ]
+    assert "linked" not in target.get(session["id"])
+
+
+class TestStreamingHistory:
+    """Tests for buffered, crash-safe movement recording."""
+    
+    def test_flushes_batches_before_save(self, store):
+        """Movements reach the journal in batches while the run is in progress."""
+        session = start_session("src", "dest", batch_size=3, sync_interval=3600)
+        for i in range(7):
+            record_movement(session, f"src/{i}", f"dest/{i}")
+            assert len(session["movements"]) < 3
+        
+        assert store.count_movements(session["id"]) == 6
+        assert store.get(session["id"])["completed"] is False
+        assert get_last_session() is None
+        
+        save_session(session)
+        assert store.count_movements(session["id"]) == 7
+        assert get_last_session(include_movements=False)["files_moved"] == 7
+    
+    def test_recover_crashed_session(self, store, monkeypatch):
+        """A session left open by a dead process is closed and becomes undoable."""
+        session = start_session("src", "dest", batch_size=2, sync_interval=3600)
+        for i in range(5):
+            record_movement(session, f"src/{i}", f"dest/{i}")
+        # Simulate a crash: save_session is never called
+        monkeypatch.setattr(history, "_session_alive", lambda session: False)
+        
+        assert history.recover_incomplete_sessions() == 1
+        header = store.get(session["id"])
+        assert header["completed"] is True
+        assert header["recovered"] is True
+        assert header["files_moved"] == 4
+    
+    def test_recover_skips_live_sessions(self, store):
+        """Sessions still owned by a running process are left open."""
+        session = start_session("src", "dest", batch_size=1)
+        record_movement(session, "src/a", "dest/a")
+        
+        assert history.recover_incomplete_sessions() == 0
+        assert store.get(session["id"])["completed"] is False
+    
+    def test_recover_session_of_earlier_process_with_our_pid(self, store):
+        """A crashed run that had our pid (PID 1 in a container) is still recovered."""
+        session = start_session("src", "dest", batch_size=1)
+        record_movement(session, "src/a", "dest/a")
+        history._open_sessions.discard(session["id"])  # As if from a previous run
+        
+        assert history.recover_incomplete_sessions() == 1
+        assert store.get(session["id"])["recovered"] is True
+    
+    def test_empty_session_leaves_no_trace(self, store):
+        """A session that moved nothing is never written."""
+        save_session(start_session("src", "dest"))
+        assert store.sessions() == []
+
+
+class TestParallelUndo:
+    """Tests for the batched undo engine."""
+    
+    def test_parallel_undo_restores_and_cleans_touched_dirs(self, store, tmp_path):
+        """Files come back with a pool, and only folders the session used are removed."""
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        src.mkdir()
+        (dest / "Unrelated").mkdir(parents=True)
+        session = start_session(str(src), str(dest))
+        for i in range(20):
+            category = dest / ("Images" if i % 2 else "Documents") / "2024"
+            category.mkdir(parents=True, exist_ok=True)
+            (category.parent / ".sfo_organized").touch()
+            (category / f"f{i}.txt").write_text(str(i))
+            record_movement(session, str(src / f"f{i}.txt"), str(category / f"f{i}.txt"))
+        save_session(session)
+        
+        result = undo_last_session(workers=4)
+        
+        assert result["restored"] == 20
+        assert result["errors"] == 0
+        assert sorted(p.name for p in src.iterdir()) == sorted(f"f{i}.txt" for i in range(20))
+        assert not (dest / "Images").exists()
+        assert not (dest / "Documents").exists()
+        assert (dest / "Unrelated").exists()
+    
+    def test_missing_file_counts_as_error(self, store, tmp_path):
+        """A file deleted since the session is reported, not fatal."""
+        session = start_session(str(tmp_path / "src"), str(tmp_path / "dest"))
+        record_movement(session, str(tmp_path / "src" / "gone.txt"), str(tmp_path / "dest" / "gone.txt"))
+        save_session(session)
+        
+        result = undo_last_session(workers=2)
+        assert result["success"] is True
+        assert result["restored"] == 0
+        assert result["errors"] == 1
+
+
+def _organize_tree(tmp_path, names):
+    """Move files into dest/<ext folder> and record them as one session."""
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    src.mkdir(exist_ok=True)
+    session = start_session(str(src), str(dest))
+    for name in names:
+        folder = dest / name.rsplit(".", 1)[1].upper()
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / name).write_text(name)
+        record_movement(session, str(src / name), str(folder / name))
+    save_session(session)
+    return session
+
+
+class TestUndoSession:
+    """Tests for undoing a chosen session, fully or by path."""
+    
+    def test_undo_older_session_by_id(self, store, tmp_path):
+        """An older session can be reverted while a newer one stays in place."""
+        first = _organize_tree(tmp_path, ["a.pdf"])
+        second = _organize_tree(tmp_path, ["b.png"])
+        
+        result = undo_session(first["id"])
+        
+        assert result["restored"] == 1
+        assert (tmp_path / "src" / "a.pdf").exists()
+        assert (tmp_path / "dest" / "PNG" / "b.png").exists()
+        assert store.get(first["id"])["undone"] is True
+        assert get_last_session(include_movements=False)["id"] == second["id"]
+    
+    def test_subtree_filter(self, store, tmp_path):
+        """A directory filter restores only files under it and marks a partial undo."""
+        session = _organize_tree(tmp_path, ["a.pdf", "b.pdf", "c.png"])
+        
+        result = undo_session(session["id"], path_filter=str(tmp_path / "dest" / "PDF"))
+        
+        assert result["restored"] == 2
+        assert (tmp_path / "dest" / "PNG" / "c.png").exists()
+        assert not (tmp_path / "dest" / "PDF").exists()
+        header = store.get(session["id"])
+        assert header["partial_undo"] is True
+        assert header["undone_files"] == 2
+        assert not header.get("undone")
+        
+        # The rest can still be undone; files already back are skipped
+        result = undo_last_session()
+        assert result["restored"] == 1
+        assert result["skipped"] == 2
+        assert result["errors"] == 0
+        assert store.get(session["id"])["undone"] is True
+    
+    def test_glob_filter(self, store, tmp_path):
+        """Glob filters match the original or current path."""
+        session = _organize_tree(tmp_path, ["a.pdf", "b.png", "c.png"])
+        
+        assert [m["to"] for m in select_movements(session["id"], "*.png")] == [
+            str(tmp_path / "dest" / "PNG" / "b.png"), str(tmp_path / "dest" / "PNG" / "c.png")
+        ]
+        result = undo_session(session["id"], path_filter="*/b.png")
+        assert result["restored"] == 1
+        assert (tmp_path / "src" / "b.png").exists()
+    
+    def test_unknown_or_undone_session(self, store, tmp_path):
+        """Unknown ids and already-undone sessions are refused."""
+        session = _organize_tree(tmp_path, ["a.pdf"])
+        assert undo_session("missing")["success"] is False
+        assert undo_session(session["id"])["success"] is True
+        assert undo_session(session["id"])["success"] is False
+    
+    def test_filter_reads_only_that_session(self, store, tmp_path, monkeypatch):
+        """Selecting a subset streams one session's movements only."""
+        first = _organize_tree(tmp_path, ["a.pdf"])
+        _organize_tree(tmp_path, ["b.pdf"])
+        read = []
+        original = store.iter_movements
+        monkeypatch.setattr(store, "iter_movements", lambda sid: read.append(sid) or original(sid))
+        
+        select_movements(first["id"], "*.pdf")
+        assert read == [first["id"]]
+
+
+class TestMovementList:
+    """Tests for the compact movement representation."""
+    
+    def test_round_trip_exact_paths(self):
+        """Paths come back byte-for-byte, including odd separators."""
+        moves = [
+            {"from": os.path.join("src", "a.pdf"), "to": os.path.join("dest", "Documents", "a.pdf")},
+            {"from": "plain.txt", "to": os.path.join("dest", "plain_1.txt")},
+            {"from": os.sep + "root.txt", "to": os.path.join("dest", "", "x.txt")},
+        ]
+        moves[1]["linked"] = True
+        movements = history.MovementList(moves)
+        
+        assert list(movements) == moves
+        assert movements[1] == moves[1]
+        assert list(reversed(movements)) == moves[::-1]
+        assert movements == moves
+    
+    def test_session_uses_compact_buffer(self, store):
+        """record_movement keeps the same logical history."""
+        session = start_session("src", "dest", batch_size=10_000)
+        record_movement(session, os.path.join("src", "a"), os.path.join("dest", "A", "a"))
+        assert isinstance(session["movements"], history.MovementList)
+        save_session(session)
+        assert list(store.iter_movements(session["id"])) == [
+            {"from": os.path.join("src", "a"), "to": os.path.join("dest", "A", "a")}
+        ]
+    
+    def test_smaller_than_dicts(self):
+        """Interned prefixes should cut memory several-fold for a large run."""
+        src = os.path.join(os.sep + "home", "user", "Downloads", "incoming")
+        dest = os.path.join(os.sep + "home", "user", "Organized", "Documents", "2024")
+        names = [f"file_{i}.pdf" for i in range(20_000)]
+        
+        def measure(build):
+            tracemalloc.start()
+            value = build()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del value
+            return size
+        
+        def build_compact():
+            movements = history.MovementList()
+            for name in names:
+                movements.add(os.path.join(src, name), os.path.join(dest, name))
+            return movements
+        
+        as_dicts = measure(lambda: [
+            {"from": os.path.join(src, name), "to": os.path.join(dest, name)} for name in names
+        ])
+        assert measure(build_compact) * 3 < as_dicts
@@ -0,0 +1,81 @@
+"""
+Unit tests for the pluggable keyword matchers.
+"""
+
+import random
+import pytest
+from matcher import (
+    LinearMatcher, AhoCorasickMatcher, create_matcher, register_matcher, MATCHER_BACKENDS
+)
+from rules import KEYWORD_RULES, RuleStore
+
+
+class TestAhoCorasickMatcher:
+    """Tests for the Aho-Corasick automaton."""
+    
+    def test_priority_not_position(self):
+        """The lowest keyword index wins, regardless of where it occurs."""
+        matcher = AhoCorasickMatcher(["report", "tax"])
+        assert matcher.first_match("tax_report.pdf") == 0
+        assert matcher.first_match("tax_2024.pdf") == 1
+    
+    def test_overlapping_keywords(self):
+        """Keywords that are suffixes of other keywords are found via failure links."""
+        matcher = AhoCorasickMatcher(["audiobook", "book", "ok"])
+        assert matcher.first_match("my_audiobook.mp3") == 0
+        assert matcher.first_match("notebook.txt") == 1
+        assert matcher.first_match("bookok") == 1
+        assert matcher.first_match("oklahoma") == 2
+    
+    def test_no_match(self):
+        """Names without any keyword should return None."""
+        matcher = AhoCorasickMatcher(["invoice", "receipt"])
+        assert matcher.first_match("vacation.jpg") is None
+        assert matcher.first_match("") is None
+    
+    def test_agrees_with_linear(self):
+        """Aho-Corasick must return exactly what the linear scan returns."""
+        keywords = list(KEYWORD_RULES)
+        linear = LinearMatcher(keywords)
+        automaton = AhoCorasickMatcher(keywords)
+        rng = random.Random(0)
+        alphabet = "abcdefghijklmnopqrstuvwxyz _."
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            if rng.random() < 0.5:
+                text += rng.choice(keywords)
+            assert automaton.first_match(text) == linear.first_match(text)
+
+
+class TestMatcherBackends:
+    """Tests for backend selection and registration."""
+    
+    def test_auto_selects_by_size(self):
+        """The auto backend should switch to Aho-Corasick for large rule sets."""
+        assert isinstance(create_matcher(["a", "b"]), LinearMatcher)
+        many = [f"kw{i}" for i in range(10_000)]
+        assert isinstance(create_matcher(many), AhoCorasickMatcher)
+    
+    def test_unknown_backend(self):
+        """Unknown backends should raise ValueError."""
+        with pytest.raises(ValueError):
+            create_matcher(["a"], "nope")
+    
+    def test_register_custom_backend(self, tmp_path):
+        """A registered backend should be usable from RuleStore."""
+        register_matcher("test-linear", LinearMatcher)
+        try:
+            store = RuleStore(tmp_path / "none.json", check_interval=0, matcher="test-linear")
+            assert isinstance(store.matcher, LinearMatcher)
+            assert store.match("invoice.pdf") == "Documents"
+        finally:
+            MATCHER_BACKENDS.pop("test-linear", None)
+    
+    def test_rule_store_backends_agree(self, tmp_path):
+        """Both backends should classify identically through RuleStore."""
+        store = RuleStore(tmp_path / "none.json", check_interval=0, matcher="linear")
+        names = ["whatsapp image 01.jpg", "tax_report.pdf", "setup_v2.exe", "random.bin"]
+        expected = [store.match(n) for n in names]
+        store.set_matcher("aho-corasick")
+        assert isinstance(store.matcher, AhoCorasickMatcher)
+        assert [store.match(n) for n in names] == expected
@@ -2,6 +2,8 @@
 Unit tests for the file organizer module.
 """
 
+import os
+import json
 import pytest
 import tempfile
 import shutil
@@ -9,6 +11,7 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 from organizer import get_category, organize_files, flatten_directory, ORGANIZER_MARKER
+from plan import MovePlan
 
 
 class TestGetCategory:
@@ -271,6 +274,80 @@ class TestFlattenDirectory:
         
         assert stats["skipped_dirs"] == 3
     
+    def test_flatten_nested_single_pass(self, store, tmp_path):
+        """Nested folders are flattened and removed, each listed only once."""
+        from logging_config import setup_logging
+        setup_logging(level="WARNING", log_file=None)
+        
+        source = tmp_path / "root"
+        nested = source / "Images" / "2024" / "01"
+        nested.mkdir(parents=True)
+        (source / "Images" / ORGANIZER_MARKER).touch()
+        (source / "Images" / "2024" / ORGANIZER_MARKER).touch()
+        (source / "Images" / "a.jpg").touch()
+        (nested / "b.jpg").touch()
+        (source / "Images" / "2024" / "empty").mkdir()
+        
+        real_scandir = os.scandir
+        with patch("os.scandir", side_effect=real_scandir) as mock_scandir:
+            stats = flatten_directory(str(source))
+        
+        assert stats["moved"] == 2
+        assert stats["removed_dirs"] == 4
+        assert sorted(p.name for p in source.iterdir()) == ["a.jpg", "b.jpg"]
+        # Root listing, name index, and one listing per flattened folder
+        assert mock_scandir.call_count == 2 + 4
+    
+    def test_parallel_flatten(self, store, tmp_path):
+        """Concurrent folders share one name index and all moves are undoable."""
+        from logging_config import setup_logging
+        setup_logging(level="WARNING", log_file=None)
+        from history import undo_last_session
+        
+        source = tmp_path / "root"
+        for i in range(12):
+            (source / f"d{i}" / "sub").mkdir(parents=True)
+            (source / f"d{i}" / "same.txt").write_text(str(i))
+            (source / f"d{i}" / "sub" / f"f{i}.pdf").touch()
+        
+        stats = flatten_directory(str(source), flatten_all=True, workers=4)
+        
+        assert stats == {"moved": 24, "errors": 0, "removed_dirs": 24, "skipped_dirs": 0}
+        names = [p.name for p in source.iterdir()]
+        assert len(names) == 24
+        assert sum(name.startswith("same") for name in names) == 12
+        
+        result = undo_last_session()
+        assert result["restored"] == 24
+        assert (source / "d5" / "sub" / "f5.pdf").exists()
+    
+    def test_flatten_keeps_folders_with_leftovers(self, temp_dir):
+        """A folder is kept when something inside it could not be moved."""
+        from logging_config import setup_logging
+        setup_logging(level="WARNING", log_file=None)
+        
+        source = Path(temp_dir)
+        tagged = source / "Documents"
+        (tagged / "sub").mkdir(parents=True)
+        (tagged / ORGANIZER_MARKER).touch()
+        (tagged / "sub" / "stuck.pdf").touch()
+        (tagged / "ok.pdf").touch()
+        
+        real_move = __import__("organizer").move_file
+        
+        def failing_move(src, dest):
+            if src.endswith("stuck.pdf"):
+                raise PermissionError("locked")
+            real_move(src, dest)
+        
+        with patch("organizer.move_file", side_effect=failing_move):
+            stats = flatten_directory(str(source))
+        
+        assert stats["moved"] == 1
+        assert stats["errors"] == 1
+        assert stats["removed_dirs"] == 0
+        assert (tagged / "sub" / "stuck.pdf").exists()
+    
     def test_flatten_no_tagged_folders(self, temp_dir):
         """Flatten should do nothing if no tagged folders exist."""
         from logging_config import setup_logging
@@ -292,3 +369,258 @@ class TestFlattenDirectory:
         assert stats["moved"] == 0
         assert stats["removed_dirs"] == 0
 
+
+
+class TestParallelMoves:
+    """Tests for concurrent move execution."""
+    
+    def test_parallel_duplicates_resolved(self, tmp_path):
+        """Same-named files from a worker pool must not overwrite each other."""
+        from logging_config import setup_logging
+        setup_logging(level="WARNING", log_file=None)
+        
+        source = tmp_path / "src"
+        dest = tmp_path / "dest"
+        source.mkdir()
+        (dest / "Images").mkdir(parents=True)
+        (dest / "Images" / "image.png").write_text("existing")
+        for i in range(20):
+            (source / f"shot{i}.png").write_text(str(i))
+        (source / "image.png").write_text("new")
+        
+        stats = organize_files(str(source), str(dest), workers=4)
+        
+        assert stats["moved"] == 21
+        assert stats["errors"] == 0
+        assert (dest / "Images" / "image.png").read_text() == "existing"
+        assert (dest / "Images" / "image_1.png").read_text() == "new"
+    
+    def test_results_in_submission_order(self):
+        """MoveExecutor should yield results in input order."""
+        import time
+        from executor import MoveExecutor
+        
+        def slow_first(n):
+            time.sleep(0.05 if n == 0 else 0)
+            return n * 2
+        
+        results = list(MoveExecutor(workers=4).run(range(10), slow_first))
+        assert [item for item, _, _ in results] == list(range(10))
+        assert [result for _, result, _ in results] == [n * 2 for n in range(10)]
+    
+    def test_errors_reported_per_item(self):
+        """A failing item should not stop the rest."""
+        from executor import MoveExecutor
+        
+        def fail_on_odd(n):
+            if n % 2:
+                raise OSError("odd")
+        
+        errors = [error for _, _, error in MoveExecutor(workers=3).run(range(6), fail_on_odd)]
+        assert [e is None for e in errors] == [True, False] * 3
+
+
+class TestNameIndex:
+    """Tests for in-memory duplicate-name resolution."""
+    
+    def test_reserve_matches_legacy_suffixes(self, tmp_path):
+        """Collisions get _1, _2, ... in order, skipping names already on disk."""
+        from executor import NameIndex
+        (tmp_path / "image.png").touch()
+        (tmp_path / "image_2.png").touch()
+        
+        index = NameIndex()
+        names = [index.reserve(tmp_path, "image.png") for _ in range(4)]
+        assert names == ["image_1.png", "image_3.png", "image_4.png", "image_5.png"]
+        assert index.reserve(tmp_path, "other.png") == "other.png"
+    
+    def test_missing_directory(self, tmp_path):
+        """A directory that doesn't exist yet has no taken names."""
+        from executor import NameIndex
+        index = NameIndex()
+        target = tmp_path / "Images"
+        assert index.reserve(target, "a.jpg") == "a.jpg"
+        assert index.reserve(target, "a.jpg") == "a_1.jpg"
+    
+    def test_case_insensitive_volume(self, tmp_path, monkeypatch):
+        """On macOS / Windows, Image.png on disk blocks an incoming image.png."""
+        import executor
+        from executor import NameIndex
+        monkeypatch.setattr(executor, "FOLD_NAMES", True)
+        (tmp_path / "Image.png").touch()
+        (tmp_path / "Cafe\u0301.txt").touch()
+        
+        index = NameIndex()
+        assert index.reserve(tmp_path, "image.png") == "image_1.png"
+        assert index.reserve(tmp_path, "IMAGE_1.png") == "IMAGE_1_1.png"
+        assert index.reserve(tmp_path, "caf\u00e9.txt") == "caf\u00e9_1.txt"
+    
+    def test_bounded_index(self, tmp_path):
+        """Past max_names, old directories are dropped and big ones probed on disk."""
+        from executor import NameIndex
+        small = tmp_path / "small"
+        big = tmp_path / "big"
+        small.mkdir()
+        big.mkdir()
+        (small / "a.txt").touch()
+        
+        index = NameIndex(max_names=3)
+        assert index.reserve(small, "a.txt") == "a_1.txt"
+        names = [index.reserve(big, "f.txt") for _ in range(4)]
+        assert names == ["f.txt", "f_1.txt", "f_2.txt", "f_3.txt"]
+        assert index._size <= 3
+        
+        # big/ is now probed: names are free again until they exist on disk
+        (big / "f.txt").touch()
+        assert index.reserve(big, "f.txt") == "f_1.txt"
+        assert index.reserve(small, "a.txt") == "a_1.txt"
+    
+    def test_directory_listed_once(self, tmp_path):
+        """Many collisions should not re-list or stat the directory."""
+        import os
+        from unittest.mock import patch
+        from executor import NameIndex
+        
+        index = NameIndex()
+        with patch("executor.os.scandir", wraps=os.scandir) as mock_scandir:
+            for _ in range(500):
+                index.reserve(tmp_path, "image.png")
+        assert mock_scandir.call_count == 1
+    
+    def test_flatten_many_duplicates(self, tmp_path):
+        """Flatten should give every same-named file a unique root name."""
+        from logging_config import setup_logging
+        setup_logging(level="WARNING", log_file=None)
+        
+        for i in range(5):
+            folder = tmp_path / f"Export{i}"
+            folder.mkdir()
+            (folder / ORGANIZER_MARKER).touch()
+            (folder / "image.png").write_text(str(i))
+        
+        stats = flatten_directory(str(tmp_path))
+        assert stats["moved"] == 5
+        names = sorted(p.name for p in tmp_path.iterdir())
+        assert names == ["image.png", "image_1.png", "image_2.png", "image_3.png", "image_4.png"]
+
+
+class TestCategoryDirCache:
+    """Tests for create-once category folder preparation."""
+    
+    def test_prepare_once(self, tmp_path):
+        """Each folder is created and marker-checked only once."""
+        from unittest.mock import patch
+        from organizer import CategoryDirCache
+        
+        cache = CategoryDirCache()
+        target = tmp_path / "Images"
+        with patch.object(Path, "mkdir", autospec=True, side_effect=Path.mkdir) as mock_mkdir:
+            for _ in range(50):
+                cache.prepare(target)
+        assert mock_mkdir.call_count == 1
+        assert (target / ORGANIZER_MARKER).exists()
+    
+    def test_failure_remembered(self, tmp_path):
+        """A folder that can't be created fails fast for later files."""
+        from organizer import CategoryDirCache
+        
+        blocker = tmp_path / "Images"
+        blocker.write_text("a file where the folder should go")
+        cache = CategoryDirCache()
+        assert cache.prepare_all([blocker]) == 1
+        with pytest.raises(OSError):
+            cache.prepare(blocker)
+    
+    def test_plan_lists_dest_dirs(self, tmp_path):
+        """Planning collects each destination folder once, in first-use order."""
+        from organizer import plan_organize
+        for name in ["a.jpg", "b.pdf", "c.jpg"]:
+            (tmp_path / name).touch()
+        plan = plan_organize(str(tmp_path), str(tmp_path))
+        assert sorted(plan.dest_dirs) == sorted([str(tmp_path / "Images"), str(tmp_path / "Documents")])
+
+
+class TestRecursiveOrganize:
+    """Tests for --recursive organization of nested folders."""
+    
+    @pytest.fixture
+    def tree(self, store, tmp_path):
+        source = tmp_path / "src"
+        for rel in ["top.pdf", "a/x.jpg", "a/b/y.pdf", "a/b/c/deep.mp3",
+                    "node_modules/m.js", "a/notes.tmp"]:
+            (source / rel).parent.mkdir(parents=True, exist_ok=True)
+            (source / rel).touch()
+        organized = source / "Documents"
+        organized.mkdir()
+        (organized / "old.pdf").touch()
+        (organized / ORGANIZER_MARKER).touch()
+        return source
+    
+    def test_recursive_with_filters(self, tree):
+        """Nested files move; excluded, too-deep and organized folders stay."""
+        stats = organize_files(
+            source_dir=str(tree), dest_dir=str(tree), recursive=True,
+            exclude=["node_modules", "*.tmp"], max_depth=2
+        )
+        
+        assert stats == {"moved": 3, "skipped": 3, "errors": 0}
+        assert (tree / "Documents" / "y.pdf").exists()
+        assert (tree / "Images" / "x.jpg").exists()
+        assert (tree / "a" / "b" / "c" / "deep.mp3").exists()
+        assert (tree / "node_modules" / "m.js").exists()
+        assert (tree / "a" / "notes.tmp").exists()
+    
+    def test_recursive_dry_run_and_include(self, tree):
+        """Include globs limit the files; a dry run moves nothing."""
+        stats = organize_files(
+            source_dir=str(tree), dest_dir=str(tree), dry_run=True,
+            recursive=True, include=["*.pdf"]
+        )
+        
+        assert stats["moved"] == 2
+        assert (tree / "a" / "b" / "y.pdf").exists()
+    
+    def test_unmarked_category_folders_left_alone(self, tree):
+        """Existing category folders without a marker are not re-planned."""
+        images = tree / "Images"
+        images.mkdir()
+        (images / "old.jpg").touch()
+        (tree / "2023").mkdir()
+        (tree / "2023" / "stray.txt").touch()
+        
+        organize_files(source_dir=str(tree), dest_dir=str(tree), recursive=True,
+                       exclude=["node_modules", "*.tmp"])
+        
+        assert sorted(p.name for p in images.iterdir() if p.name != ORGANIZER_MARKER) == ["old.jpg", "x.jpg"]
+        assert (tree / "Documents" / "stray.txt").exists()
+    
+    def test_file_already_in_its_category_is_skipped(self, tmp_path):
+        """A file whose target folder is the one it is in stays put."""
+        from organizer import plan_organize
+        images = tmp_path / "Images"
+        images.mkdir()
+        (images / "old.jpg").touch()
+        (images / "notes.txt").touch()
+        
+        plan = plan_organize(str(images), str(tmp_path))
+        assert [Path(move.source).name for move in plan] == ["notes.txt"]
+        assert plan.skipped == 1
+    
+    def test_recursive_plan_out(self, tree, tmp_path):
+        """A streamed plan is written to disk and applied from there."""
+        plan_file = tmp_path / "plan.jsonl"
+        stats = organize_files(
+            source_dir=str(tree), dest_dir=str(tree), recursive=True,
+            include=["*.pdf"], plan_out=str(plan_file)
+        )
+        
+        assert stats["moved"] == 2
+        lines = plan_file.read_text().splitlines()
+        assert len(lines) == 4
+        
+        # Totals known only after the walk are in the trailer, and win on reading
+        assert json.loads(lines[0])["skipped"] == 0
+        loaded = MovePlan.read_jsonl(str(plan_file))
+        assert loaded.skipped == stats["skipped"] > 0
+        assert loaded.dest_dirs == [str(tree / "Documents")]
+        assert (tree / "Documents" / "top.pdf").exists()
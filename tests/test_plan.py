@@ -0,0 +1,151 @@
+"""
+Unit tests for move plans (plan/apply split).
+"""
+
+import pytest
+from pathlib import Path
+
+from logging_config import setup_logging
+from organizer import plan_organize, apply_plan, organize_files
+from plan import MovePlan, MOVE_REASON_RULE, MOVE_REASON_EXTENSION
+
+
+@pytest.fixture
+def env(store, tmp_path):
+    setup_logging(level="WARNING", log_file=None)
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    src.mkdir()
+    dest.mkdir()
+    (src / "photo.jpg").touch()
+    (src / "invoice.xyz").touch()
+    (src / "sub").mkdir()
+    return src, dest
+
+
+def test_plan_does_not_touch_disk(env):
+    """Planning should classify and resolve names without creating anything."""
+    src, dest = env
+    plan = plan_organize(str(src), str(dest))
+    
+    by_name = {Path(m.source).name: m for m in plan}
+    assert by_name["photo.jpg"].category == "Images"
+    assert by_name["photo.jpg"].reason == MOVE_REASON_EXTENSION
+    assert by_name["invoice.xyz"].reason == MOVE_REASON_RULE
+    assert by_name["invoice.xyz"].dest == str(dest / "Documents" / "invoice.xyz")
+    assert plan.skipped == 1
+    assert list(dest.iterdir()) == []
+
+
+def test_jsonl_round_trip_and_apply(env, tmp_path):
+    """A dry-run plan written to JSONL can be applied later."""
+    src, dest = env
+    plan_file = tmp_path / "plan.jsonl"
+    
+    stats = organize_files(str(src), str(dest), dry_run=True, plan_out=str(plan_file))
+    assert stats["moved"] == 2
+    assert (src / "photo.jpg").exists()
+    
+    loaded = MovePlan.read_jsonl(str(plan_file))
+    assert loaded.source_dir == str(src)
+    assert len(loaded) == 2
+    
+    stats = apply_plan(MovePlan.read_jsonl(str(plan_file), stream=True))
+    assert stats == {"moved": 2, "skipped": 1, "errors": 0}
+    assert (dest / "Images" / "photo.jpg").exists()
+    assert (dest / "Documents" / "invoice.xyz").exists()
+
+
+def test_apply_revalidates_destination(env):
+    """A destination created after planning must not be overwritten."""
+    src, dest = env
+    plan = plan_organize(str(src), str(dest))
+    (dest / "Images").mkdir()
+    (dest / "Images" / "photo.jpg").write_text("late arrival")
+    
+    stats = apply_plan(plan)
+    assert stats["errors"] == 0
+    assert (dest / "Images" / "photo.jpg").read_text() == "late arrival"
+    assert (dest / "Images" / "photo_1.jpg").exists()
+
+
+def test_apply_renames_on_late_conflict(env):
+    """Without revalidation a late arrival is still kept, and the move renamed."""
+    src, dest = env
+    plan = plan_organize(str(src), str(dest))
+    (dest / "Images").mkdir()
+    (dest / "Images" / "photo.jpg").write_text("late arrival")
+    
+    stats = apply_plan(plan, revalidate=False)
+    assert stats["errors"] == 0
+    assert (dest / "Images" / "photo.jpg").read_text() == "late arrival"
+    assert (dest / "Images" / "photo_1.jpg").exists()
+    assert not (src / "photo.jpg").exists()
+
+
+def test_trailer_carries_streamed_totals(tmp_path, monkeypatch):
+    """Counts filled in while moves stream out are read back from the trailer."""
+    import plan as plan_module
+    monkeypatch.setattr(plan_module, "TRAILER_BLOCK", 16)
+    plan = MovePlan("/src", "/dst")
+    
+    def moves():
+        yield from []
+        plan.skipped, plan.errors = 3, 1
+        plan.dest_dirs.extend(f"/dst/Folder{i}" for i in range(20))
+    plan.moves = moves()
+    plan.write_jsonl(str(tmp_path / "plan.jsonl"))
+    
+    loaded = MovePlan.read_jsonl(str(tmp_path / "plan.jsonl"), stream=True)
+    assert (loaded.skipped, loaded.errors, len(loaded.dest_dirs)) == (3, 1, 20)
+    assert list(loaded) == []
+
+
+def test_reads_version_1_plans(tmp_path):
+    """Plans written before the trailer existed still load."""
+    path = tmp_path / "old.jsonl"
+    path.write_text(
+        '{"version": 1, "source_dir": "/src", "dest_dir": "/dst", "skipped": 2}\n'
+        '{"source": "/src/a", "dest": "/dst/Documents/a", "category": "Documents", "reason": "extension"}\n'
+    )
+    loaded = MovePlan.read_jsonl(str(path))
+    assert loaded.skipped == 2 and len(loaded) == 1
+
+
+def test_read_rejects_non_plan(tmp_path):
+    """Files that aren't plans should raise ValueError."""
+    bogus = tmp_path / "bogus.jsonl"
+    bogus.write_text('{"hello": 1}\n')
+    with pytest.raises(ValueError):
+        MovePlan.read_jsonl(str(bogus))
+
+
+def test_dry_run_apply_plan_moves_nothing(env, tmp_path, monkeypatch):
+    """-n --apply-plan previews the saved plan instead of applying it."""
+    import sys
+    import organizer
+    src, dest = env
+    plan_file = tmp_path / "plan.jsonl"
+    plan_organize(str(src), str(dest)).write_jsonl(str(plan_file))
+    
+    monkeypatch.setattr(sys, "argv", ["organizer.py", "-n", "--apply-plan", str(plan_file), "--no-log-file"])
+    monkeypatch.setattr(organizer, "recover_incomplete_sessions", lambda: 0)
+    assert organizer.main() == 0
+    assert (src / "photo.jpg").exists()
+    assert list(dest.iterdir()) == []
+
+
+def test_relative_dirs_are_recorded_absolute(env, tmp_path, monkeypatch, capsys):
+    """Plans and history hold absolute paths, so --find works from anywhere."""
+    import sys
+    import organizer
+    monkeypatch.chdir(tmp_path)
+    
+    plan = plan_organize("src", "dest")
+    assert all(Path(move.source).is_absolute() and Path(move.dest).is_absolute() for move in plan)
+    organize_files("src", "dest")
+    
+    monkeypatch.setattr(sys, "argv", ["organizer.py", "--find", "src/photo.jpg", "--no-log-file"])
+    monkeypatch.setattr(organizer, "recover_incomplete_sessions", lambda: 0)
+    assert organizer.main() == 0
+    assert str(tmp_path / "dest" / "Images" / "photo.jpg") in capsys.readouterr().out
@@ -2,8 +2,14 @@
 Unit tests for rule-based file classification.
 """
 
+import os
+import json
 import pytest
-from rules import classify_by_rules, classify_by_extension, classify_file
+from pathlib import Path
+from rules import (
+    classify_by_rules, classify_by_extension, classify_file, classify_many,
+    RuleStore, ExtensionIndex, REASON_RULE, REASON_EXTENSION
+)
 
 
 class TestClassifyByRules:
@@ -107,3 +113,136 @@ class TestClassifyFile:
     def test_unknown_file(self):
         """Files with no keyword and unknown extension should be 'Other'."""
         assert classify_file("random.xyz", ".xyz") == "Other"
+
+
+class TestRuleStore:
+    """Tests for the cached, compiled rule store."""
+    
+    def _write_rules(self, path, keyword_rules):
+        path.write_text(json.dumps({"keyword_rules": keyword_rules}), encoding="utf-8")
+    
+    def test_custom_rules_take_priority(self, tmp_path):
+        """Custom rules should be checked before built-in rules."""
+        rules_file = tmp_path / "custom_rules.json"
+        self._write_rules(rules_file, {"invoice": "Finance"})
+        store = RuleStore(rules_file, check_interval=0)
+        assert store.match("invoice_2024.pdf") == "Finance"
+        assert store.match("screenshot.png") == "Images"
+    
+    def test_missing_file_uses_builtin_rules(self, tmp_path):
+        """A missing rules file should fall back to built-in rules only."""
+        store = RuleStore(tmp_path / "missing.json", check_interval=0)
+        assert store.match("invoice.pdf") == "Documents"
+        assert store.custom_rules == {}
+    
+    def test_file_parsed_once(self, tmp_path):
+        """An unchanged rules file should not be re-read."""
+        rules_file = tmp_path / "custom_rules.json"
+        self._write_rules(rules_file, {"zzz": "Sleep"})
+        store = RuleStore(rules_file, check_interval=0)
+        assert store.refresh() is True
+        assert store.refresh() is False
+    
+    def test_reload_on_change(self, tmp_path):
+        """Editing the rules file should invalidate the compiled rules."""
+        rules_file = tmp_path / "custom_rules.json"
+        self._write_rules(rules_file, {"zzz": "Sleep"})
+        store = RuleStore(rules_file, check_interval=0)
+        assert store.match("zzz.bin") == "Sleep"
+        
+        self._write_rules(rules_file, {"zzz": "Snooze", "extra": "More"})
+        st = rules_file.stat()
+        os.utime(rules_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert store.match("zzz.bin") == "Snooze"
+
+
+class TestExtensionIndex:
+    """Tests for the precomputed extension -> category index."""
+    
+    def test_first_category_wins(self):
+        """An extension listed twice should resolve to the first category."""
+        index = ExtensionIndex({"A": [".x"], "B": [".x", ".y"]}, {})
+        assert index.category(".x") == "A"
+        assert index.category(".Y") == "B"
+        assert index.category(".z") == "Other"
+    
+    def test_overrides_and_detailed(self):
+        """Overrides replace FILE_CATEGORIES entries; detailed lookups are separate."""
+        index = ExtensionIndex({"Documents": [".pdf"]}, {".PDF": "PDFs"}, {"PDF": "Scans"})
+        assert index.category(".pdf") == "Scans"
+        assert index.detailed_category(".pdf") == "PDFs"
+        assert index.detailed_category(".doc") is None
+    
+    def test_index_is_frozen(self):
+        """The lookup tables should be read-only."""
+        index = ExtensionIndex({"Images": [".jpg"]}, {})
+        with pytest.raises(TypeError):
+            index.categories[".png"] = "Images"
+    
+    def test_rebuilds_on_rules_file_change(self, tmp_path):
+        """extension_overrides edits should be picked up by the store."""
+        rules_file = tmp_path / "custom_rules.json"
+        rules_file.write_text(json.dumps({"extension_overrides": {}}), encoding="utf-8")
+        store = RuleStore(rules_file, check_interval=0)
+        assert store.extension_index.category(".log") == "Other"
+        
+        rules_file.write_text(json.dumps({"extension_overrides": {".log": "Logs"}}), encoding="utf-8")
+        st = rules_file.stat()
+        os.utime(rules_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert store.extension_index.category(".log") == "Logs"
+    
+    def test_rebuilds_on_category_change(self, tmp_path):
+        """Edits to FILE_CATEGORIES should invalidate the index."""
+        from app_config import FILE_CATEGORIES
+        store = RuleStore(tmp_path / "none.json", check_interval=0)
+        assert store.extension_index.category(".heic") == "Other"
+        FILE_CATEGORIES["Images"].append(".heic")
+        try:
+            assert store.extension_index.category(".heic") == "Images"
+        finally:
+            FILE_CATEGORIES["Images"].remove(".heic")
+
+
+class TestClassifyMany:
+    """Tests for batch classification."""
+    
+    NAMES = [
+        "photo.JPG", "invoice.txt", "system_backup.xyz", "random.xyz", "notes.md",
+        "tax_notes.md", ".bashrc", "archive.tar.gz", "trailing.", "video_clip.jpg",
+        "photo.JPG", "README",
+    ]
+    
+    def test_matches_classify_file(self):
+        """Batch results should equal per-file classify_file results."""
+        result = classify_many(self.NAMES)
+        expected = [classify_file(n, Path(n).suffix) for n in self.NAMES]
+        assert list(result) == expected
+        assert len(result) == len(self.NAMES)
+    
+    def test_compact_result(self):
+        """Ids should index into a category table with no duplicates."""
+        result = classify_many(self.NAMES)
+        assert len(set(result.categories)) == len(result.categories)
+        assert result[0] == result.categories[result.category_ids[0]] == "Images"
+        assert result.reasons[2] == REASON_RULE
+        assert result.reasons[0] == REASON_EXTENSION
+    
+    def test_extension_only(self):
+        """use_keywords=False should ignore keyword rules."""
+        result = classify_many(["system_backup.xyz", "photo.png"], use_keywords=False)
+        assert list(result) == ["Other", "Images"]
+        assert result.counts() == {"Other": 1, "Images": 1}
+    
+    def test_numpy_backend(self):
+        """The NumPy path should give the same categories as the pure-Python path."""
+        pytest.importorskip("numpy")
+        plain = classify_many(self.NAMES, use_numpy=False)
+        vectorized = classify_many(self.NAMES, use_numpy=True)
+        assert list(vectorized) == list(plain)
+        assert list(vectorized.reasons) == list(plain.reasons)
+    
+    def test_empty(self):
+        """An empty listing should produce an empty result."""
+        result = classify_many([])
+        assert len(result) == 0
+        assert result.counts() == {}
@@ -0,0 +1,122 @@
+"""
+Unit tests for the scandir-based scanner.
+"""
+
+import os
+from pathlib import Path
+
+from scanner import FileEntry, scan_directory, scan_files, scan_paths
+
+
+def test_scan_files_and_skipped(tmp_path):
+    """Files are yielded; directories go to the skipped list."""
+    (tmp_path / "a.txt").touch()
+    (tmp_path / "b.jpg").touch()
+    (tmp_path / "sub").mkdir()
+    
+    skipped = []
+    names = sorted(entry.name for entry in scan_files(tmp_path, skipped))
+    
+    assert names == ["a.txt", "b.jpg"]
+    assert [entry.name for entry in skipped] == ["sub"]
+    assert skipped[0].is_dir
+
+
+def test_path_like_behaviour(tmp_path):
+    """FileEntry should mirror Path name/stem/suffix and work with os.fspath."""
+    for name in ["photo.JPG", "archive.tar.gz", ".bashrc", "trailing.", "README"]:
+        (tmp_path / name).touch()
+    
+    for entry in scan_directory(tmp_path):
+        path = Path(entry.path)
+        assert entry.suffix == path.suffix
+        assert entry.stem == path.stem
+        assert os.fspath(entry) == str(path)
+        assert entry.as_path() == path
+
+
+def test_stat_called_once(tmp_path):
+    """Repeated size/mtime access should reuse one stat result."""
+    target = tmp_path / "file.bin"
+    target.write_bytes(b"12345")
+    
+    dir_entry = next(os.scandir(tmp_path))
+    
+    class CountingEntry:
+        name, path = dir_entry.name, dir_entry.path
+        calls = 0
+        
+        def is_file(self):
+            return dir_entry.is_file()
+        
+        def is_dir(self):
+            return dir_entry.is_dir()
+        
+        def stat(self):
+            CountingEntry.calls += 1
+            return dir_entry.stat()
+    
+    entry = FileEntry(CountingEntry())
+    assert entry.size == 5
+    assert entry.mtime == target.stat().st_mtime
+    entry.stat()
+    assert CountingEntry.calls == 1
+
+
+def test_scan_paths_skips_missing(tmp_path):
+    """scan_paths looks up only the given paths and drops vanished ones."""
+    (tmp_path / "a.txt").write_text("abc")
+    (tmp_path / "sub").mkdir()
+    
+    entries = list(scan_paths([tmp_path / "a.txt", tmp_path / "gone.txt", tmp_path / "sub"]))
+    
+    assert [entry.name for entry in entries] == ["a.txt", "sub"]
+    assert entries[0].is_file and entries[0].size == 3
+    assert entries[1].is_dir and not entries[1].is_file
+
+
+def test_tree_walker(tmp_path):
+    """The walker descends, prunes and filters as configured."""
+    from scanner import TreeWalker
+    for rel in ["a.txt", "sub/b.txt", "sub/deep/c.txt", "sub/skip.log",
+                "done/d.txt", "done/.marker", "build/e.txt"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).touch()
+    
+    def walk(**kwargs):
+        walker = TreeWalker(tmp_path, skip_marker=".marker", **kwargs)
+        rel_paths = sorted(Path(entry.path).relative_to(tmp_path).as_posix() for entry in walker)
+        return rel_paths, walker
+    
+    rel_paths, walker = walk()
+    assert rel_paths == ["a.txt", "build/e.txt", "sub/b.txt", "sub/deep/c.txt", "sub/skip.log"]
+    assert walker.skipped == 1
+    
+    rel_paths, walker = walk(max_depth=1, exclude=["build", "*.log"])
+    assert rel_paths == ["a.txt", "sub/b.txt"]
+    assert walker.skipped == 3
+    assert walker.filtered == 1
+    
+    # Path globs use fnmatch rules, so "*" also crosses "/"
+    rel_paths, _ = walk(include=["sub/*.txt", "a.*"])
+    assert rel_paths == ["a.txt", "sub/b.txt", "sub/deep/c.txt"]
+
+
+def test_tree_walker_streams(tmp_path):
+    """Entries are yielded before the walk finishes and scandir handles are closed early."""
+    from scanner import TreeWalker
+    for i in range(3):
+        (tmp_path / f"d{i}").mkdir()
+        (tmp_path / f"d{i}" / "f.txt").touch()
+    
+    walker = iter(TreeWalker(tmp_path))
+    first = next(walker)
+    assert first.is_file
+    walker.close()
+    
+    if hasattr(os, "symlink"):
+        try:
+            os.symlink(tmp_path, tmp_path / "d0" / "loop")
+        except OSError:
+            return
+        assert len(list(TreeWalker(tmp_path))) == 3
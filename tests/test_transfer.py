@@ -0,0 +1,149 @@
+"""
+Unit tests for the rename / streamed-copy transfer engine.
+"""
+
+import errno
+import os
+import pytest
+
+import transfer
+from transfer import (
+    TransferStats, copy_file, transfer_file,
+    METHOD_COPY, METHOD_RENAME, TEMP_PREFIX, VERIFY_HASH
+)
+
+
+@pytest.fixture
+def payload(tmp_path):
+    source = tmp_path / "src" / "big.bin"
+    source.parent.mkdir()
+    source.write_bytes(os.urandom(300_000))
+    os.utime(source, (1_000_000_000, 1_000_000_000))
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
+    return source, dest_dir / "big.bin"
+
+
+def _refuse_renames(monkeypatch):
+    """Refuse renames of anything but copy temp files, as across devices."""
+    rename = transfer.rename_no_replace
+
+    def refuse(source, dest):
+        if not os.path.basename(source).startswith(TEMP_PREFIX):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        rename(source, dest)
+    monkeypatch.setattr(transfer, "rename_no_replace", refuse)
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Make every destination look like it is on another device."""
+    _refuse_renames(monkeypatch)
+
+
+def test_same_device_renames(payload):
+    source, dest = payload
+    stats = TransferStats()
+    assert transfer_file(str(source), str(dest), stats=stats) == METHOD_RENAME
+    assert dest.exists() and not source.exists()
+    assert (stats.renamed, stats.copied) == (1, 0)
+
+
+def test_rename_needs_no_stat(payload, monkeypatch):
+    """A same-device move is decided by the rename itself, without stat calls."""
+    source, dest = payload
+    calls = []
+    for name in ("stat", "lstat"):
+        original = getattr(os, name)
+        monkeypatch.setattr(transfer.os, name, lambda *a, o=original, **k: calls.append(a) or o(*a, **k))
+    assert transfer_file(str(source), str(dest)) == METHOD_RENAME
+    assert calls == []
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="no symlinks")
+def test_symlink_moves_as_a_link(tmp_path):
+    target = tmp_path / "target.txt"
+    target.write_text("x")
+    link = tmp_path / "link.txt"
+    try:
+        os.symlink(target, link)
+    except OSError:
+        pytest.skip("symlinks not permitted")
+    transfer_file(str(link), str(tmp_path / "moved.txt"))
+    assert os.readlink(tmp_path / "moved.txt") == str(target)
+    assert target.stat().st_nlink == 1
+
+
+@pytest.mark.parametrize("move", ["rename", "copy"])
+def test_existing_destination_is_never_replaced(payload, monkeypatch, move):
+    source, dest = payload
+    if move == "copy":
+        _refuse_renames(monkeypatch)
+    dest.write_text("already here")
+
+    with pytest.raises(FileExistsError):
+        transfer_file(str(source), str(dest))
+    assert dest.read_text() == "already here"
+    assert source.exists()
+    assert os.listdir(dest.parent) == ["big.bin"]
+
+
+@pytest.mark.parametrize("disable", [(), ("copy_file_range",), ("copy_file_range", "sendfile")])
+def test_cross_device_copy(payload, cross_device, monkeypatch, disable):
+    """Each copy strategy streams in chunks, keeps metadata and removes the source."""
+    for name in disable:
+        monkeypatch.delattr(os, name, raising=False)
+    source, dest = payload
+    data = source.read_bytes()
+    progress = []
+    stats = TransferStats()
+
+    method = transfer_file(str(source), str(dest), progress=lambda done, total: progress.append((done, total)),
+                           chunk_size=64 * 1024, stats=stats)
+
+    assert method == METHOD_COPY
+    assert dest.read_bytes() == data
+    assert not source.exists()
+    assert int(dest.stat().st_mtime) == 1_000_000_000
+    assert len(progress) == 5 and progress[-1] == (len(data), len(data))
+    assert stats.copied == 1 and stats.bytes_copied == len(data)
+    assert "MiB/s" in stats.summary()
+
+
+def test_exdev_rename_falls_back_to_copy(payload, monkeypatch):
+    source, dest = payload
+
+    def refusing(func):
+        def wrapper(src, dst, **kwargs):
+            if src == str(source):
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            return func(src, dst, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(transfer.os, "rename", refusing(os.rename))
+    monkeypatch.setattr(transfer.os, "link", refusing(os.link))
+    assert transfer_file(str(source), str(dest)) == METHOD_COPY
+    assert dest.exists() and not source.exists()
+
+
+def test_failed_verification_keeps_source(payload, cross_device, monkeypatch):
+    """A copy that does not verify leaves neither dest nor a temp file behind."""
+    source, dest = payload
+    digests = iter([b"a", b"b"])
+    monkeypatch.setattr(transfer, "_file_digest", lambda path: next(digests))
+
+    with pytest.raises(OSError):
+        transfer_file(str(source), str(dest), verify=VERIFY_HASH)
+
+    assert source.exists()
+    assert os.listdir(dest.parent) == []
+
+
+def test_hash_verify_and_bad_mode(payload):
+    source, dest = payload
+    copy_file(str(source), str(dest), verify=VERIFY_HASH)
+    assert dest.read_bytes() == source.read_bytes()
+    assert not any(name.startswith(TEMP_PREFIX) for name in os.listdir(dest.parent))
+
+    with pytest.raises(ValueError):
+        copy_file(str(source), str(dest.parent / "x.bin"), verify="paranoid")
@@ -0,0 +1,411 @@
+"""
+Unit tests for incremental Watch Mode.
+"""
+
+import json
+import time
+import pytest
+from pathlib import Path
+
+from watcher import IncrementalWatcher, StabilityTracker, WatchRoot, WatchService, WATCHDOG_AVAILABLE
+
+
+# Keep watch-mode sessions out of the real history
+pytestmark = pytest.mark.usefixtures("store")
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll predicate until it is true or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.fixture
+def folders(tmp_path):
+    source = tmp_path / "inbox"
+    dest = tmp_path / "sorted"
+    source.mkdir()
+    return source, dest
+
+
+class TestIncrementalWatcher:
+    """Tests for the event-driven pipeline."""
+
+    def test_submit_dedups_and_filters(self, folders):
+        """Repeated events queue a path once; nested or foreign paths are ignored."""
+        source, dest = folders
+        watcher = IncrementalWatcher(WatchRoot(str(source), str(dest)))
+
+        assert watcher.submit(str(source / "a.pdf"))
+        assert watcher.submit(str(source / "a.pdf"))
+        assert not watcher.submit(str(source / "Documents" / "b.pdf"))
+        assert not watcher.submit(str(dest / "c.pdf"))
+        assert not watcher.submit(str(source / ".sfo_organized"))
+        assert watcher.pending == 1
+
+    def test_events_organize_only_changed_files(self, folders, monkeypatch):
+        """After the start-up reconcile, new files are handled without rescanning."""
+        source, dest = folders
+        (source / "old.pdf").write_text("x")
+        root = WatchRoot(str(source), str(dest))
+        scans = []
+        original_scan = root.scan
+        monkeypatch.setattr(root, "scan", lambda: scans.append(1) or original_scan())
+
+        with IncrementalWatcher(root, reconcile_interval=3600, quiet_period=0.1) as watcher:
+            watcher.start(observe=False)
+            assert wait_for(lambda: (dest / "Documents" / "old.pdf").exists())
+
+            (source / "new.png").write_text("x")
+            watcher.submit(str(source / "new.png"))
+            assert wait_for(lambda: (dest / "Images" / "new.png").exists())
+
+        assert len(scans) == 1
+        assert root.stats["moved"] == 2
+
+    def test_reconcile_catches_missed_files(self, folders):
+        """A file with no event is picked up by the periodic reconcile scan."""
+        source, dest = folders
+
+        with IncrementalWatcher(WatchRoot(str(source), str(dest)), reconcile_interval=0.1, quiet_period=0.1) as watcher:
+            watcher.start(observe=False)
+            (source / "missed.txt").write_text("x")
+            assert wait_for(lambda: (dest / "Documents" / "missed.txt").exists())
+
+    def test_overflow_falls_back_to_reconcile(self, folders):
+        """Events beyond the queue bound are dropped and recovered by a rescan."""
+        source, dest = folders
+        root = WatchRoot(str(source), str(dest))
+
+        with IncrementalWatcher(root, reconcile_interval=3600, quiet_period=0.1, max_pending=3) as watcher:
+            watcher.start(observe=False)
+            assert wait_for(lambda: root.stats["reconciles"] == 1)
+
+            names = [f"f{i}.txt" for i in range(6)]
+            for name in names:
+                (source / name).write_text("x")
+                watcher.submit(str(source / name))
+
+            metrics = watcher.metrics()
+            assert metrics["dropped"] == 3
+            assert metrics["overflows"] == 1
+            assert metrics["max_depth"] <= 3
+
+            assert wait_for(lambda: all((dest / "Documents" / name).exists() for name in names))
+            assert root.stats["reconciles"] == 2
+            assert wait_for(lambda: not watcher.metrics()["overflowed"])
+
+    def test_metrics_after_processing(self, folders):
+        """Depth and lag return to zero once the queue is drained."""
+        source, dest = folders
+        (source / "a.pdf").write_text("x")
+
+        with IncrementalWatcher(WatchRoot(str(source), str(dest)), reconcile_interval=3600, quiet_period=0.1) as watcher:
+            watcher.start(observe=False)
+            assert wait_for(lambda: watcher.metrics()["processed"] == 1)
+            metrics = watcher.metrics()
+
+        assert metrics["depth"] == 0
+        assert metrics["lag"] == 0.0
+        assert metrics["max_depth"] == 1
+        assert metrics["dropped"] == 0
+
+    def test_vanished_path_is_ignored(self, folders):
+        """A path that is gone by the time it is processed is not an error."""
+        source, dest = folders
+        root = WatchRoot(str(source), str(dest))
+
+        result = root.organize([str(source / "gone.pdf")])
+        assert result == {"moved": 0, "skipped": 0, "errors": 0}
+
+    @pytest.mark.skipif(not WATCHDOG_AVAILABLE, reason="watchdog not installed")
+    def test_native_events(self, folders):
+        """Files created in the folder are organized via watchdog events."""
+        source, dest = folders
+
+        with IncrementalWatcher(WatchRoot(str(source), str(dest)), reconcile_interval=3600, quiet_period=0.1) as watcher:
+            watcher.start()
+            time.sleep(0.2)
+            (source / "report.pdf").write_text("x")
+            assert wait_for(lambda: (dest / "Documents" / "report.pdf").exists())
+
+
+class TestStabilityTracker:
+    """Tests for the quiet-period / partial-download detector (fake clock)."""
+
+    def test_released_after_quiet_period(self, tmp_path):
+        path = tmp_path / "a.pdf"
+        path.write_text("x")
+        tracker = StabilityTracker(quiet_period=1.0, resolution=0.25)
+
+        tracker.add(str(path), now=100.0)
+        assert tracker.tick(now=100.5) == []
+        assert tracker.tick(now=101.5) == [str(path)]
+        assert len(tracker) == 0
+
+    def test_quiet_period_longer_than_wheel(self, tmp_path):
+        """Checks due after more than one lap of the wheel wait for their lap."""
+        path = tmp_path / "a.pdf"
+        path.write_text("x")
+        tracker = StabilityTracker(quiet_period=5.0, resolution=0.25, slots=8)
+
+        tracker.add(str(path), now=0.0)
+        for step in range(1, 20):
+            assert tracker.tick(now=step * 0.25) == []
+        assert tracker.tick(now=5.5) == [str(path)]
+
+    def test_growing_file_is_held(self, tmp_path):
+        path = tmp_path / "big.iso"
+        path.write_text("x")
+        tracker = StabilityTracker(quiet_period=1.0, resolution=0.25)
+
+        tracker.add(str(path), now=0.0)
+        path.write_text("xx")
+        assert tracker.tick(now=1.5) == []
+        assert tracker.tick(now=3.0) == [str(path)]
+
+    def test_partial_download_twin_holds_file(self, tmp_path):
+        """x.pdf waits while x.pdf.part exists; the .part file is never released."""
+        final = tmp_path / "x.pdf"
+        partial = tmp_path / "x.pdf.part"
+        final.write_text("")
+        partial.write_text("data")
+        tracker = StabilityTracker(quiet_period=1.0, resolution=0.25)
+
+        tracker.add(str(partial), now=0.0)
+        tracker.add(str(final), now=0.0)
+        assert tracker.tick(now=5.0) == []
+
+        # Once the download lands, the final file still has to settle
+        partial.rename(final)
+        assert tracker.tick(now=10.0) == []
+        assert tracker.tick(now=12.0) == [str(final)]
+        assert len(tracker) == 0
+
+    def test_closed_file_skips_quiet_period(self, tmp_path):
+        path = tmp_path / "small.txt"
+        path.write_text("x")
+        tracker = StabilityTracker(quiet_period=60.0, resolution=0.25)
+
+        tracker.add(str(path), now=0.0)
+        tracker.add(str(path), closed=True, now=0.1)
+        assert tracker.tick(now=0.6) == [str(path)]
+
+    def test_vanished_file_is_dropped(self, tmp_path):
+        tracker = StabilityTracker(quiet_period=0.5, resolution=0.25)
+        tracker.add(str(tmp_path / "gone.txt"), now=0.0)
+        assert tracker.tick(now=2.0) == []
+        assert len(tracker) == 0
+
+    def test_many_files_checked_in_one_tick(self, tmp_path):
+        """Thousands of in-flight files are released by a single batched pass."""
+        tracker = StabilityTracker(quiet_period=1.0, resolution=0.25, slots=8)
+        paths = []
+        for i in range(2000):
+            path = tmp_path / f"f{i}.bin"
+            path.write_bytes(b"x")
+            paths.append(str(path))
+            tracker.add(str(path), now=0.0)
+
+        assert tracker.tick(now=0.5) == []
+        assert sorted(tracker.tick(now=2.0)) == sorted(paths)
+        assert len(tracker) == 0
+
+
+class TestWatchService:
+    """Tests for watching many roots with one observer and a shared pool."""
+
+    def _roots(self, tmp_path, count):
+        roots = []
+        for i in range(count):
+            source = tmp_path / f"inbox{i}"
+            source.mkdir()
+            roots.append(WatchRoot(str(source), str(tmp_path / f"sorted{i}")))
+        return roots
+
+    def test_per_root_destination_and_rules(self, tmp_path):
+        """Each root uses its own destination and rule set."""
+        rules = tmp_path / "rules.json"
+        rules.write_text(json.dumps({"keyword_rules": {"scan": "Scans"}}))
+        plain = tmp_path / "plain"
+        custom = tmp_path / "custom"
+        plain.mkdir()
+        custom.mkdir()
+        (plain / "scan_001.xyz").write_text("x")
+        (custom / "scan_001.xyz").write_text("x")
+        roots = [
+            WatchRoot(str(plain), str(tmp_path / "out_plain")),
+            WatchRoot(str(custom), str(tmp_path / "out_custom"), rules_file=str(rules)),
+        ]
+
+        with WatchService(roots, workers=2, reconcile_interval=3600, quiet_period=0.1) as service:
+            service.start(observe=False)
+            assert wait_for(lambda: (tmp_path / "out_plain" / "Other" / "scan_001.xyz").exists())
+            assert wait_for(lambda: (tmp_path / "out_custom" / "Scans" / "scan_001.xyz").exists())
+            assert wait_for(lambda: all(
+                root["moved"] == 1 for root in service.metrics()["roots"].values()
+            ))
+
+    def test_roots_sharing_a_destination(self, tmp_path, monkeypatch):
+        """Batches into one destination never overlap, so no file is lost."""
+        inbox_a = tmp_path / "inboxA"
+        inbox_b = tmp_path / "inboxB"
+        inbox_a.mkdir()
+        inbox_b.mkdir()
+        (inbox_a / "scan.pdf").write_text("from A")
+        (inbox_b / "scan.pdf").write_text("from B")
+        roots = [WatchRoot(str(inbox_a), str(tmp_path / "sorted")),
+                 WatchRoot(str(inbox_b), str(tmp_path / "sorted"))]
+        active = []
+        overlaps = []
+        for root in roots:
+            original = root.organize
+
+            def organize(paths, original=original):
+                active.append(1)
+                overlaps.append(len(active))
+                time.sleep(0.1)
+                try:
+                    return original(paths)
+                finally:
+                    active.pop()
+            monkeypatch.setattr(root, "organize", organize)
+
+        with WatchService(roots, workers=2, reconcile_interval=3600, quiet_period=0.1) as service:
+            service.start(observe=False)
+            assert wait_for(lambda: all(root.stats["moved"] == 1 for root in roots))
+
+        documents = tmp_path / "sorted" / "Documents"
+        assert sorted(p.read_text() for p in documents.glob("*.pdf")) == ["from A", "from B"]
+        assert max(overlaps) == 1
+
+    def test_noisy_root_does_not_starve_others(self, tmp_path, monkeypatch):
+        """Round-robin dispatch serves a quiet root between a noisy root's batches."""
+        noisy, quiet = self._roots(tmp_path, 2)
+        for i in range(20):
+            (Path(noisy.source_dir) / f"n{i}.txt").write_text("x")
+        (Path(quiet.source_dir) / "q.txt").write_text("x")
+        order = []
+        for root in (noisy, quiet):
+            original = root.organize
+            monkeypatch.setattr(root, "organize", lambda paths, r=root, o=original: order.append(r) or o(paths))
+
+        with WatchService([noisy, quiet], workers=1, batch_size=2, reconcile_interval=3600, quiet_period=0.1) as service:
+            service.start(observe=False)
+            assert wait_for(lambda: noisy.stats["moved"] == 20 and quiet.stats["moved"] == 1)
+
+        assert len(order) == 11
+        assert order.index(quiet) <= 2
+
+    def test_one_observer_for_all_roots(self, tmp_path):
+        """Events from every root arrive through a single observer."""
+        roots = self._roots(tmp_path, 3)
+
+        with WatchService(roots, reconcile_interval=3600, quiet_period=0.1) as service:
+            service.start()
+            assert len(service._observer.emitters) == 3
+            time.sleep(0.2)
+            for i, root in enumerate(roots):
+                (Path(root.source_dir) / f"doc{i}.pdf").write_text("x")
+            assert wait_for(lambda: all(
+                (tmp_path / f"sorted{i}" / "Documents" / f"doc{i}.pdf").exists() for i in range(3)
+            ))
+
+    def test_rejects_duplicate_roots(self, tmp_path):
+        source = tmp_path / "inbox"
+        source.mkdir()
+        with pytest.raises(ValueError):
+            WatchService([WatchRoot(str(source)), WatchRoot(str(source) + "/")])
+
+    def test_submit_routes_to_root(self, tmp_path):
+        """Paths are queued on the root that contains them, and only there."""
+        first, second = self._roots(tmp_path, 2)
+        service = WatchService([first, second])
+
+        assert service.submit(str(Path(second.source_dir) / "a.pdf"))
+        assert not service.submit(str(tmp_path / "elsewhere.pdf"))
+        depths = {path: m["depth"] for path, m in service.metrics()["roots"].items()}
+        assert depths == {first.source_dir: 0, second.source_dir: 1}
+
+    def test_load_watch_roots(self, tmp_path):
+        config = tmp_path / "roots.json"
+        config.write_text(json.dumps({"roots": [
+            {"source": str(tmp_path / "a"), "dest": str(tmp_path / "out")},
+            {"source": str(tmp_path / "b"), "smart_context": True},
+        ]}))
+
+        from watcher import load_watch_roots
+        roots = load_watch_roots(str(config))
+        assert [root.dest_dir for root in roots] == [str(tmp_path / "out"), str(tmp_path / "b")]
+        assert roots[1].smart_context is True
+
+        config.write_text(json.dumps([{"dest": "x"}]))
+        with pytest.raises(ValueError):
+            load_watch_roots(str(config))
+
+
+class TestPollingBackend:
+    """Tests for the snapshot-polling event source."""
+
+    def test_snapshot_reports_new_and_changed_files(self, tmp_path):
+        from watcher import DirectorySnapshot
+        (tmp_path / "a.txt").write_text("x")
+        (tmp_path / "sub").mkdir()
+        snapshot = DirectorySnapshot(str(tmp_path))
+
+        assert snapshot.update() == [str(tmp_path / "a.txt")]
+        assert snapshot.update() == []
+
+        (tmp_path / "a.txt").write_text("longer")
+        (tmp_path / "b.txt").write_text("x")
+        assert sorted(snapshot.update()) == [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+
+        (tmp_path / "b.txt").unlink()
+        assert snapshot.update() == []
+        assert len(snapshot) == 1
+
+    def test_interval_adapts_to_churn(self, tmp_path):
+        from watcher import SnapshotPoller
+        service = WatchService([WatchRoot(str(tmp_path))], backend="poll")
+        poller = SnapshotPoller(service, interval=2.0, min_interval=0.5, max_interval=4.0)
+        state = poller._roots[0]
+
+        (tmp_path / "a.txt").write_text("x")
+        assert poller.poll(state) == 1
+        assert state["interval"] == 1.0
+        assert service.pending == 1
+
+        for _ in range(5):
+            poller.poll(state)
+        assert state["interval"] == 4.0
+
+    def test_unreachable_root_backs_off(self, tmp_path):
+        from watcher import SnapshotPoller
+        source = tmp_path / "share"
+        source.mkdir()
+        service = WatchService([WatchRoot(str(source))], backend="poll")
+        poller = SnapshotPoller(service, interval=1.0, max_interval=8.0)
+        source.rmdir()
+
+        assert poller.poll(poller._roots[0]) == 0
+        assert poller.intervals() == {str(source): 8.0}
+
+    def test_poll_backend_organizes_new_files(self, folders):
+        source, dest = folders
+        root = WatchRoot(str(source), str(dest))
+
+        with WatchService([root], backend="poll", poll_interval=0.1,
+                          reconcile_interval=3600, quiet_period=0.1) as service:
+            service.start()
+            assert wait_for(lambda: root.stats["reconciles"] == 1)
+            (source / "late.pdf").write_text("x")
+            assert wait_for(lambda: (dest / "Documents" / "late.pdf").exists())
+            assert root.stats["reconciles"] == 1
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            WatchService([WatchRoot(str(tmp_path))], backend="fanotify")
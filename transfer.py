@@ -0,0 +1,307 @@
+"""
+File transfer engine for SFO File Organizer.
+
+A move within one filesystem is a rename. Across devices (e.g.
+organizing into an archive volume) shutil.move would silently fall back
+to copy2 + unlink with no progress or control; transfer_file instead
+streams the data in large chunks, using os.copy_file_range or
+os.sendfile where the platform supports them so the bytes never pass
+through Python, reports progress per chunk, optionally verifies the
+copy, and commits it atomically: data is written to a hidden temporary
+name in the destination folder, flushed to disk, renamed into place, and
+only then is the source removed. An interrupted copy never leaves a
+half-written file under the real name.
+
+Neither path ever replaces an existing destination: renames and commits
+go through rename_no_replace, which raises FileExistsError instead, so
+a stale duplicate-name index costs a retry rather than a file.
+
+TransferStats aggregates bytes and time across a run (and across worker
+threads) so callers can report throughput.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import stat
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+# Bytes copied per system call / progress callback
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# How a cross-device copy is checked before the source is removed
+VERIFY_NONE = "none"
+VERIFY_SIZE = "size"
+VERIFY_HASH = "hash"
+VERIFY_MODES = (VERIFY_NONE, VERIFY_SIZE, VERIFY_HASH)
+
+# How a file was transferred
+METHOD_RENAME = "rename"
+METHOD_COPY = "copy"
+
+# Prefix of the temporary name a copy is written under
+TEMP_PREFIX = ".sfo-part-"
+
+# Errors that mean a zero-copy call is unsupported here, not that the copy failed
+_UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class TransferStats:
+    """
+    Thread-safe totals for a batch of transfers.
+
+    Attributes:
+        renamed: Files moved with a same-filesystem rename.
+        copied: Files moved with a cross-device copy.
+        bytes_copied: Bytes written by cross-device copies.
+        copy_seconds: Wall time spent in cross-device copies.
+    """
+
+    def __init__(self):
+        self.renamed = 0
+        self.copied = 0
+        self.bytes_copied = 0
+        self.copy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, method: str, size: int = 0, seconds: float = 0.0) -> None:
+        """Record one finished transfer."""
+        with self._lock:
+            if method == METHOD_RENAME:
+                self.renamed += 1
+            else:
+                self.copied += 1
+                self.bytes_copied += size
+                self.copy_seconds += seconds
+
+    @property
+    def throughput(self) -> float:
+        """Average cross-device copy speed in bytes per second."""
+        return self.bytes_copied / self.copy_seconds if self.copy_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        """One-line human-readable summary of cross-device copies."""
+        mib = self.bytes_copied / (1024 * 1024)
+        return (f"Copied {self.copied} files ({mib:.1f} MiB) across devices "
+                f"at {self.throughput / (1024 * 1024):.1f} MiB/s")
+
+
+def rename_no_replace(source: str, dest: str) -> None:
+    """
+    Rename source to dest, failing if dest already exists.
+
+    On POSIX this is os.link + os.unlink, which refuses an existing name
+    atomically; Windows' os.rename already refuses one. Filesystems
+    without hard links (FAT, some SMB mounts) fall back to a lexists
+    check before the rename.
+
+    Raises:
+        FileExistsError: If dest exists.
+        OSError: Any other rename failure (e.g. EXDEV across mounts).
+    """
+    if os.name == "nt":
+        os.rename(source, dest)
+        return
+    try:
+        # A symlink source is linked itself, not its target
+        os.link(source, dest, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except (OSError, NotImplementedError) as e:
+        if getattr(e, "errno", None) == errno.EXDEV:
+            raise
+        if os.path.lexists(dest):
+            raise FileExistsError(errno.EEXIST, "Destination exists", dest)
+        os.rename(source, dest)
+        return
+    os.unlink(source)
+
+
+def _copy_range(src_fd: int, dst_fd: int, size: int, chunk_size: int,
+                progress: Optional[ProgressCallback]) -> int:
+    """Copy size bytes between descriptors, fastest available call first."""
+    copied = 0
+    use_range = hasattr(os, "copy_file_range")
+    use_sendfile = hasattr(os, "sendfile") and os.name == "posix"
+    buffer = None
+
+    while copied < size:
+        count = min(chunk_size, size - copied)
+        sent = 0
+        if use_range:
+            try:
+                sent = os.copy_file_range(src_fd, dst_fd, count)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                use_range = False
+                continue
+        elif use_sendfile:
+            try:
+                sent = os.sendfile(dst_fd, src_fd, copied, count)
+                if sent:
+                    # sendfile with an explicit offset leaves the source
+                    # position alone; keep it in step for the next call
+                    os.lseek(src_fd, copied + sent, os.SEEK_SET)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED and e.errno != errno.ENOTSOCK:
+                    raise
+                use_sendfile = False
+                continue
+        else:
+            if buffer is None:
+                buffer = bytearray(min(chunk_size, max(size, 1)))
+            view = memoryview(buffer)[:count]
+            read = os.readv(src_fd, [view]) if hasattr(os, "readv") else _read_into(src_fd, view)
+            if read:
+                _write_all(dst_fd, view[:read])
+            sent = read
+
+        if not sent:
+            # Source shrank while copying; stop at what was there
+            break
+        copied += sent
+        if progress is not None:
+            progress(copied, size)
+    return copied
+
+
+def _read_into(fd: int, view: memoryview) -> int:
+    data = os.read(fd, len(view))
+    view[:len(data)] = data
+    return len(data)
+
+
+def _write_all(fd: int, view: memoryview) -> None:
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _file_digest(path: str, chunk_size: int = CHUNK_SIZE) -> bytes:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def copy_file(
+    source: str,
+    dest: str,
+    progress: Optional[ProgressCallback] = None,
+    verify: str = VERIFY_SIZE,
+    chunk_size: int = CHUNK_SIZE
+) -> int:
+    """
+    Copy source to dest through a temporary name and commit it atomically.
+
+    Args:
+        source: File to copy.
+        dest: Final destination path.
+        progress: Called as progress(bytes_done, bytes_total) after each chunk.
+        verify: VERIFY_NONE, VERIFY_SIZE or VERIFY_HASH.
+        chunk_size: Bytes per copy call.
+
+    Returns:
+        Number of bytes copied.
+
+    Raises:
+        FileExistsError: If dest already exists (it is left untouched).
+        OSError: If the copy fails or does not verify; dest is not created.
+        ValueError: If verify is not a known mode.
+    """
+    if verify not in VERIFY_MODES:
+        raise ValueError(f"Unknown verify mode: {verify}")
+
+    folder, name = os.path.split(os.path.abspath(dest))
+    temp_path = os.path.join(folder, f"{TEMP_PREFIX}{uuid.uuid4().hex[:8]}-{name}")
+
+    try:
+        with open(source, "rb") as src, open(temp_path, "xb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            copied = _copy_range(src.fileno(), dst.fileno(), size, chunk_size, progress)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        shutil.copystat(source, temp_path)
+
+        if verify != VERIFY_NONE and os.stat(temp_path).st_size != os.stat(source).st_size:
+            raise OSError(errno.EIO, f"Size mismatch after copying {source}")
+        if verify == VERIFY_HASH and _file_digest(temp_path) != _file_digest(source):
+            raise OSError(errno.EIO, f"Checksum mismatch after copying {source}")
+
+        rename_no_replace(temp_path, dest)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return copied
+
+
+def transfer_file(
+    source: str,
+    dest: str,
+    progress: Optional[ProgressCallback] = None,
+    verify: str = VERIFY_SIZE,
+    chunk_size: int = CHUNK_SIZE,
+    stats: Optional[TransferStats] = None
+) -> str:
+    """
+    Move source to dest, renaming when possible and copying otherwise.
+
+    Args:
+        source: File to move.
+        dest: Destination path (its folder must exist).
+        progress: Per-chunk callback for cross-device copies.
+        verify: How to check a cross-device copy before deleting source.
+        chunk_size: Bytes per copy call.
+        stats: If given, the transfer is added to these totals.
+
+    Returns:
+        METHOD_RENAME or METHOD_COPY.
+
+    Raises:
+        FileExistsError: If dest already exists; nothing is moved.
+    """
+    source = os.fspath(source)
+    dest = os.fspath(dest)
+
+    # Try the rename first and let the filesystem say whether it crosses
+    # devices, so the common case costs no stat calls at all
+    try:
+        rename_no_replace(source, dest)
+        if stats is not None:
+            stats.add(METHOD_RENAME)
+        return METHOD_RENAME
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    try:
+        mode = os.lstat(source).st_mode
+    except OSError:
+        mode = 0
+    if not stat.S_ISREG(mode):
+        # Directories, symlinks and oddities keep shutil.move's semantics
+        if os.path.lexists(dest):
+            raise FileExistsError(errno.EEXIST, "Destination exists", dest)
+        shutil.move(source, dest)
+        if stats is not None:
+            stats.add(METHOD_RENAME)
+        return METHOD_RENAME
+
+    started = time.perf_counter()
+    copied = copy_file(source, dest, progress=progress, verify=verify, chunk_size=chunk_size)
+    os.unlink(source)
+    if stats is not None:
+        stats.add(METHOD_COPY, copied, time.perf_counter() - started)
+    return METHOD_COPY
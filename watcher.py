@@ -0,0 +1,824 @@
+"""
+Incremental Watch Mode for SFO File Organizer.
+
+Filesystem events only name the paths that changed. They are collected in
+a de-duplicated pending set, and a worker thread classifies and moves just
+those files. A periodic reconcile scan re-queues every file still sitting
+in the watched folder, catching anything an event missed, so the cost of
+watching follows churn rather than folder size.
+
+Before a path is queued it has to settle: a StabilityTracker holds it
+until its size and mtime stop changing for a quiet period (or the writer
+closes it), and while a partial-download twin such as ``x.pdf.part``
+exists. Checks are bucketed on a timer wheel, so thousands of in-flight
+files cost one batched pass per tick rather than one sleep each.
+
+Events come from watchdog's native observer, or, for SMB/NFS mounts where
+native notifications are unreliable, from SnapshotPoller, which diffs a
+compact per-root snapshot with one scandir per poll.
+
+All organizing happens on the watcher's own thread, never on the watchdog
+dispatch thread, so a slow batch can't stall event delivery. The queue is
+bounded: when it fills up new events are dropped (never blocked on) and a
+reconcile scan runs once it has drained, so nothing is lost.
+"""
+
+import os
+import json
+import stat
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+from logging_config import get_logger
+from organizer import ORGANIZER_MARKER, detect_folder_context, organize_paths
+from rules import RuleStore
+from scanner import scan_files
+
+# Seconds between reconcile scans of the whole folder
+RECONCILE_INTERVAL = 60.0
+
+# Maximum paths organized per batch (one history session each)
+BATCH_SIZE = 500
+
+# Event sources for WatchService
+WATCH_BACKENDS = ("native", "poll")
+
+# Polling backend: starting interval and the bounds it adapts between
+POLL_INTERVAL = 2.0
+POLL_MIN_INTERVAL = 0.5
+POLL_MAX_INTERVAL = 30.0
+
+# Paths that may be settling or queued at once; beyond this, events are
+# dropped and a reconcile scan picks the files up once the queue drains
+QUEUE_LIMIT = 10_000
+
+# Seconds a file's size and mtime must stay unchanged before it is moved
+QUIET_PERIOD = 2.0
+
+# Timer wheel: seconds per tick and number of slots
+WHEEL_RESOLUTION = 0.25
+WHEEL_SLOTS = 64
+
+# Extensions browsers and download tools use while a file is incomplete
+PARTIAL_EXTENSIONS = frozenset({".crdownload", ".part", ".partial", ".download", ".tmp"})
+
+
+def _signature(path: str):
+    """(size, mtime_ns) of path, or None if it is gone or not a file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class StabilityTracker:
+    """
+    Hold paths until they stop changing.
+
+    A path is released by tick() once its (size, mtime) is unchanged across
+    a quiet_period, or on the first tick after a close-after-write event.
+    It is held for as long as a partial-download twin (``<path>.part``,
+    ``<path>.crdownload``, ...) exists; partial files themselves are never
+    released, since finishing a download renames or replaces them.
+
+    Pending checks sit in a hashed timer wheel of ``slots`` buckets, each
+    ``resolution`` seconds wide; tick() only visits the buckets that came
+    due since the last tick.
+
+    Args:
+        quiet_period: Seconds without change before a file counts as stable.
+        resolution: Seconds per wheel tick.
+        slots: Number of wheel buckets.
+        partial_extensions: Lower-case extensions marking incomplete files.
+    """
+
+    def __init__(
+        self,
+        quiet_period: float = QUIET_PERIOD,
+        resolution: float = WHEEL_RESOLUTION,
+        slots: int = WHEEL_SLOTS,
+        partial_extensions: Iterable[str] = PARTIAL_EXTENSIONS
+    ):
+        self.quiet_period = quiet_period
+        self.resolution = resolution
+        self.partial_extensions = frozenset(partial_extensions)
+        self._wheel = [[] for _ in range(slots)]
+        self._tracked = {}   # path -> [signature, due tick, closed]
+        self._partials = {}  # final path -> partial path being written
+        self._tick = None
+        self._lock = threading.Lock()
+
+    def _tick_of(self, now: float) -> int:
+        return int(now / self.resolution)
+
+    def _schedule(self, path: str, entry: list, due: int) -> None:
+        entry[1] = due
+        self._wheel[due % len(self._wheel)].append((path, due))
+
+    def add(self, path: str, closed: bool = False, now: Optional[float] = None) -> None:
+        """
+        Start (or keep) tracking a path.
+
+        Args:
+            path: File that was created or changed.
+            closed: The writer closed the file, so it can go on the next tick.
+            now: Current time.monotonic(), for tests.
+        """
+        now = time.monotonic() if now is None else now
+        base, ext = os.path.splitext(path)
+        if ext.lower() in self.partial_extensions:
+            with self._lock:
+                self._partials[base] = path
+            return
+
+        with self._lock:
+            if self._tick is None:
+                self._tick = self._tick_of(now)
+            entry = self._tracked.get(path)
+            if entry is None:
+                entry = self._tracked[path] = [_signature(path), None, closed]
+                wait = 0 if closed else self.quiet_period
+                self._schedule(path, entry, max(self._tick_of(now + wait), self._tick) + 1)
+            elif closed and not entry[2]:
+                entry[2] = True
+                self._schedule(path, entry, self._tick + 1)
+
+    def tick(self, now: Optional[float] = None) -> List[str]:
+        """
+        Check every path whose turn has come.
+
+        Returns:
+            Paths that are stable and can be organized.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._tick is None:
+                return []
+            target = self._tick_of(now)
+            steps = min(target - self._tick, len(self._wheel))
+            due = []
+            for offset in range(1, steps + 1):
+                slot_index = (self._tick + offset) % len(self._wheel)
+                keep = []
+                for path, due_tick in self._wheel[slot_index]:
+                    entry = self._tracked.get(path)
+                    if entry is None or entry[1] != due_tick:
+                        continue  # Stale slot entry; the path was rescheduled or released
+                    if due_tick <= target:
+                        due.append((path, entry[0], entry[2]))
+                    else:
+                        keep.append((path, due_tick))  # A later lap of the wheel
+                self._wheel[slot_index] = keep
+            self._tick = max(self._tick, target)
+            partials = {path: self._partials.get(path) for path, _, _ in due}
+
+        # Stat outside the lock so event threads are never blocked on I/O
+        ready, recheck, gone = [], [], []
+        for path, old_signature, closed in due:
+            partial = partials[path]
+            if partial is not None and os.path.lexists(partial):
+                recheck.append((path, old_signature))
+                continue
+            signature = _signature(path)
+            if signature is None:
+                gone.append(path)
+            elif closed or signature == old_signature:
+                ready.append(path)
+            else:
+                recheck.append((path, signature))
+
+        with self._lock:
+            for path in ready + gone:
+                self._tracked.pop(path, None)
+                self._partials.pop(path, None)
+            wait = self._tick_of(now + self.quiet_period) + 1
+            for path, signature in recheck:
+                entry = self._tracked.get(path)
+                if entry is not None:
+                    entry[0] = signature
+                    entry[2] = False
+                    self._schedule(path, entry, max(wait, self._tick + 1))
+        return ready
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tracked)
+
+
+class WatchRoot:
+    """
+    One watched folder and where its files go.
+
+    Args:
+        source_dir: Folder to watch (only files directly inside it are organized).
+        dest_dir: Destination for category folders (defaults to source_dir).
+        smart_context: Adapt organization to the folder's content.
+        rules_file: Custom rules JSON for this folder (default: the shared rules).
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        dest_dir: Optional[str] = None,
+        smart_context: bool = False,
+        rules_file: Optional[str] = None
+    ):
+        self.source_dir = os.path.abspath(source_dir)
+        self.dest_dir = os.path.abspath(dest_dir or source_dir)
+        self.smart_context = smart_context
+        self.rule_store = RuleStore(rules_file) if rules_file else None
+        self.context = None
+        self._key = os.path.normcase(self.source_dir)
+        self.stats = {"moved": 0, "skipped": 0, "errors": 0, "batches": 0, "reconciles": 0}
+
+    def owns(self, path: str) -> bool:
+        """True if path is directly inside this root (and not our marker)."""
+        if os.path.basename(path) == ORGANIZER_MARKER:
+            return False
+        return os.path.normcase(os.path.dirname(os.path.abspath(path))) == self._key
+
+    def scan(self) -> List[str]:
+        """
+        List the files currently in the root and refresh Smart Context.
+
+        Returns:
+            Paths of every file directly inside the root.
+        """
+        files = [entry for entry in scan_files(self.source_dir) if entry.name != ORGANIZER_MARKER]
+        if self.smart_context:
+            self.context = detect_folder_context(Path(self.source_dir), [entry.name for entry in files])
+        self.stats["reconciles"] += 1
+        return [entry.path for entry in files]
+
+    def organize(self, paths: Iterable[str]) -> dict:
+        """Organize the given files and add the result to this root's stats."""
+        result = organize_paths(
+            paths, self.source_dir, self.dest_dir,
+            smart_context=self.smart_context, context=self.context,
+            rule_store=self.rule_store
+        )
+        for key in ("moved", "skipped", "errors"):
+            self.stats[key] += result.get(key, 0)
+        self.stats["batches"] += 1
+        return result
+
+
+def load_watch_roots(config_file: str) -> List[WatchRoot]:
+    """
+    Read watch roots from a JSON file.
+
+    The file holds a list (or ``{"roots": [...]}``) of objects with
+    ``source`` and optional ``dest``, ``smart_context`` and ``rules_file``.
+
+    Raises:
+        ValueError: If the file is not a list of roots with a source each.
+    """
+    with open(config_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("roots")
+    if not isinstance(data, list) or not all(isinstance(item, dict) and item.get("source") for item in data):
+        raise ValueError(f"Not a watch root list: {config_file}")
+    return [
+        WatchRoot(
+            item["source"], item.get("dest"),
+            smart_context=bool(item.get("smart_context", False)),
+            rules_file=item.get("rules_file"),
+        )
+        for item in data
+    ]
+
+
+class DirectorySnapshot:
+    """
+    Compact listing of one folder for change detection.
+
+    Only base names and a (size, mtime_ns, inode) tuple per file are kept,
+    never full paths or stat results.
+
+    Args:
+        directory: Folder to snapshot.
+    """
+
+    __slots__ = ("directory", "entries")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.entries = {}
+
+    def update(self) -> List[str]:
+        """
+        Rescan the folder with a single scandir and replace the snapshot.
+
+        Returns:
+            Paths of files that are new or whose size, mtime or inode changed.
+
+        Raises:
+            OSError: If the folder cannot be listed; the snapshot is kept.
+        """
+        entries = {}
+        changed = []
+        previous = self.entries
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue  # Vanished between listing and stat
+                signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+                entries[entry.name] = signature
+                if previous.get(entry.name) != signature:
+                    changed.append(entry.path)
+        self.entries = entries
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class SnapshotPoller(threading.Thread):
+    """
+    Polling event source for filesystems without native notifications.
+
+    Each root is rescanned on its own schedule and new or changed files are
+    submitted to the service. A root's interval halves (down to
+    min_interval) after a poll that found changes and grows by half (up to
+    max_interval) after a quiet one, so busy inboxes are polled often and
+    idle ones cost little. Files already present at start are left to the
+    service's start-up reconcile scan.
+
+    Has the same start()/stop()/join() surface as a watchdog Observer.
+
+    Args:
+        service: WatchService to submit changed paths to.
+        interval: Starting poll interval in seconds.
+        min_interval: Fastest poll interval.
+        max_interval: Slowest poll interval.
+    """
+
+    def __init__(
+        self,
+        service: "WatchService",
+        interval: float = POLL_INTERVAL,
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL
+    ):
+        super().__init__(name="sfo-watch-poll", daemon=True)
+        self.service = service
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.logger = get_logger()
+        self._stopped = threading.Event()
+        now = time.monotonic()
+        self._roots = []
+        for root in service.roots:
+            snapshot = DirectorySnapshot(root.source_dir)
+            try:
+                snapshot.update()  # Baseline
+            except OSError as e:
+                self.logger.warning(f"Watch Mode: cannot list {root.source_dir}: {e}")
+            self._roots.append({"snapshot": snapshot, "interval": interval, "due": now + interval, "failing": False})
+
+    def poll(self, state: dict) -> int:
+        """Poll one root now, submit changes and adapt its interval."""
+        snapshot = state["snapshot"]
+        try:
+            changed = snapshot.update()
+        except OSError as e:
+            if not state["failing"]:
+                self.logger.warning(f"Watch Mode: cannot list {snapshot.directory}: {e}")
+            state["failing"] = True
+            state["interval"] = self.max_interval
+            return 0
+        state["failing"] = False
+        for path in changed:
+            self.service.submit(path)
+        if changed:
+            state["interval"] = max(self.min_interval, state["interval"] / 2)
+        else:
+            state["interval"] = min(self.max_interval, state["interval"] * 1.5)
+        return len(changed)
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            for state in self._roots:
+                if now >= state["due"]:
+                    self.poll(state)
+                    state["due"] = time.monotonic() + state["interval"]
+            next_due = min((state["due"] for state in self._roots), default=now + self.max_interval)
+            self._stopped.wait(max(0.0, next_due - time.monotonic()))
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def intervals(self) -> dict:
+        """Current poll interval per root, in seconds."""
+        return {state["snapshot"].directory: state["interval"] for state in self._roots}
+
+
+class _RootQueue:
+    """Scheduling state of one root inside a WatchService."""
+
+    def __init__(self, root: WatchRoot, quiet_period: float):
+        self.root = root
+        self.tracker = StabilityTracker(quiet_period)
+        self.pending = {}  # Settled path -> time it was queued (insertion-ordered)
+        self.overflowed = False
+        self.busy = False  # A batch or reconcile for this root is running
+        self.dest_key = os.path.normcase(root.dest_dir)
+        self.next_reconcile = 0.0  # Reconcile as soon as the service starts
+        self.counters = {
+            "submitted": 0, "dropped": 0, "overflows": 0, "processed": 0,
+            "max_depth": 0, "last_batch_seconds": 0.0,
+        }
+
+    def depth(self) -> int:
+        return len(self.pending) + len(self.tracker)
+
+
+class WatchService:
+    """
+    Watch several roots with one observer and one shared worker pool.
+
+    Each root has its own destination, Smart Context setting, rule set,
+    stability tracker, bounded queue, reconcile timer and stats. A
+    scheduler thread hands batches to the pool round-robin, with at most
+    one batch in flight per destination, so a noisy inbox can occupy one
+    worker but never starve the others, and batches of roots that share
+    a destination never race each other for names in it.
+
+    Args:
+        roots: Folders to watch.
+        workers: Size of the shared worker pool.
+        reconcile_interval: Seconds between full scans of each root.
+        batch_size: Maximum paths organized per batch.
+        quiet_period: Seconds a file must stay unchanged before it is moved.
+        max_pending: Per-root queue bound (settling plus queued paths). On
+            overflow events are dropped and a reconcile scan of that root
+            runs once its queue has drained to half.
+        backend: Event source, "native" (watchdog) or "poll" (SnapshotPoller).
+        poll_interval: Starting interval for the "poll" backend.
+
+    Raises:
+        ValueError: For an unknown backend or a root listed twice.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[WatchRoot],
+        workers: int = 2,
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        batch_size: int = BATCH_SIZE,
+        quiet_period: float = QUIET_PERIOD,
+        max_pending: int = QUEUE_LIMIT,
+        backend: str = "native",
+        poll_interval: float = POLL_INTERVAL
+    ):
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"Unknown watch backend: {backend}")
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.workers = max(1, int(workers or 1))
+        self.reconcile_interval = reconcile_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.logger = get_logger()
+        self._queues = []
+        self._by_dir = {}
+        for root in roots:
+            if root._key in self._by_dir:
+                raise ValueError(f"Folder is watched twice: {root.source_dir}")
+            queue = _RootQueue(root, quiet_period)
+            self._queues.append(queue)
+            self._by_dir[root._key] = queue
+        self._cond = threading.Condition()
+        self._cursor = 0  # Round-robin position
+        self._in_flight = 0
+        self._busy_dests = set()  # dest_key of every batch in flight
+        self._stopping = False
+        self._thread = None
+        self._pool = None
+        self._observer = None
+
+    @property
+    def roots(self) -> List[WatchRoot]:
+        return [queue.root for queue in self._queues]
+
+    def _queue_for(self, path: str) -> Optional[_RootQueue]:
+        queue = self._by_dir.get(os.path.normcase(os.path.dirname(os.path.abspath(path))))
+        if queue is None or not queue.root.owns(path):
+            return None
+        return queue
+
+    def submit(self, path: str, closed: bool = False) -> bool:
+        """
+        Queue a changed path for organizing once it has settled.
+
+        Args:
+            path: File named by an event or a reconcile scan.
+            closed: The writer closed the file (skips the quiet period).
+
+        Returns:
+            False if the path is not directly inside a watched root.
+        """
+        queue = self._queue_for(path)
+        if queue is None:
+            return False
+        with self._cond:
+            depth = queue.depth()
+            if queue.overflowed or depth >= self.max_pending:
+                # Never block the event thread: drop, and reconcile later
+                if not queue.overflowed:
+                    queue.overflowed = True
+                    queue.counters["overflows"] += 1
+                    self.logger.warning(
+                        f"Watch Mode: queue full for {queue.root.source_dir}, falling back to a reconcile scan"
+                    )
+                queue.counters["dropped"] += 1
+                return True
+            queue.counters["submitted"] += 1
+            queue.counters["max_depth"] = max(queue.counters["max_depth"], depth + 1)
+        queue.tracker.add(path, closed=closed)
+        with self._cond:
+            self._cond.notify()
+        return True
+
+    def request_reconcile(self) -> None:
+        """Ask for every root to be rescanned as soon as possible."""
+        with self._cond:
+            for queue in self._queues:
+                queue.next_reconcile = 0.0
+            self._cond.notify()
+
+    @property
+    def pending(self) -> int:
+        """Number of paths settling or waiting to be organized, all roots."""
+        with self._cond:
+            return sum(queue.depth() for queue in self._queues)
+
+    def _root_metrics(self, queue: _RootQueue, now: float) -> dict:
+        oldest = next(iter(queue.pending.values()), None)
+        result = dict(queue.counters)
+        result.update(queue.root.stats)
+        result.update(
+            queued=len(queue.pending),
+            settling=len(queue.tracker),
+            depth=queue.depth(),
+            lag=0.0 if oldest is None else now - oldest,
+            overflowed=queue.overflowed,
+            busy=queue.busy,
+        )
+        return result
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of queue health and per-root stats.
+
+        Returns:
+            Dictionary with ``workers``, ``in_flight`` and ``roots``: per
+            source folder, its queue metrics (queued, settling, depth,
+            max_depth, lag in seconds of the oldest queued path, submitted,
+            dropped, overflows, processed, overflowed, last_batch_seconds)
+            merged with its organize stats (moved, skipped, errors,
+            batches, reconciles).
+        """
+        now = time.monotonic()
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "roots": {queue.root.source_dir: self._root_metrics(queue, now) for queue in self._queues},
+            }
+
+    def start(self, observe: bool = True) -> None:
+        """
+        Start the scheduler and worker pool and, if observe, the event
+        source: one watchdog Observer with every root scheduled on it, or
+        one SnapshotPoller for the "poll" backend.
+
+        Raises:
+            RuntimeError: If the native backend is used without watchdog.
+        """
+        if observe and self.backend == "native" and not WATCHDOG_AVAILABLE:
+            raise RuntimeError("watchdog library not installed. Install with: pip install watchdog")
+        self._stopping = False
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sfo-watch-worker")
+        self._thread = threading.Thread(target=self._run, name="sfo-watch", daemon=True)
+        self._thread.start()
+        if observe and self.backend == "poll":
+            self._observer = SnapshotPoller(self, interval=self.poll_interval)
+            self._observer.start()
+        elif observe:
+            self._observer = Observer()
+            handler = WatchEventHandler(self)
+            for queue in self._queues:
+                self._observer.schedule(handler, queue.root.source_dir, recursive=False)
+            self._observer.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the observer and scheduler; batches in progress are finished."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _take_batch(self, queue: _RootQueue) -> list:
+        """Pop up to batch_size pending paths of one root (caller holds the lock)."""
+        batch = []
+        for path in queue.pending:
+            batch.append(path)
+            if len(batch) >= self.batch_size:
+                break
+        for path in batch:
+            del queue.pending[path]
+        return batch
+
+    def _next_wait(self, now: float) -> float:
+        """Seconds the scheduler may sleep (caller holds the lock)."""
+        timeout = self.reconcile_interval
+        pool_full = self._in_flight >= self.workers
+        for queue in self._queues:
+            if len(queue.tracker):
+                timeout = min(timeout, queue.tracker.resolution)
+            if pool_full or queue.busy:
+                continue  # A finishing batch notifies the scheduler
+            if queue.pending and queue.dest_key not in self._busy_dests:
+                return 0.0
+            timeout = min(timeout, queue.next_reconcile - now)
+        return max(timeout, 0.0)
+
+    def _dispatch(self) -> None:
+        """Hand work to free workers, one root at a time (caller holds the lock)."""
+        now = time.monotonic()
+        count = len(self._queues)
+        for step in range(count):
+            if self._in_flight >= self.workers:
+                return
+            index = (self._cursor + step) % count
+            queue = self._queues[index]
+            if queue.busy:
+                continue
+            # After an overflow, rescan once the backlog has drained to half
+            if queue.overflowed and queue.depth() <= self.max_pending // 2:
+                queue.overflowed = False
+                queue.next_reconcile = 0.0
+            if now >= queue.next_reconcile:
+                queue.next_reconcile = now + self.reconcile_interval
+                batch = None
+            elif queue.pending and queue.dest_key not in self._busy_dests:
+                batch = self._take_batch(queue)
+                self._busy_dests.add(queue.dest_key)
+            else:
+                continue
+            queue.busy = True
+            self._in_flight += 1
+            self._cursor = (index + 1) % count
+            self._pool.submit(self._work, queue, batch)
+
+    def _work(self, queue: _RootQueue, batch: Optional[list]) -> None:
+        """Run one batch (or a reconcile scan when batch is None) on a pool thread."""
+        started = time.monotonic()
+        try:
+            if batch is None:
+                for path in queue.root.scan():
+                    self.submit(path)
+            else:
+                self.logger.info(f"Watch Mode: organizing {len(batch)} changed file(s) in {queue.root.source_dir}")
+                queue.root.organize(batch)
+        except Exception as e:
+            self.logger.error(f"Watch Mode Error ({queue.root.source_dir}): {e}")
+        finally:
+            with self._cond:
+                if batch is not None:
+                    self._busy_dests.discard(queue.dest_key)
+                    queue.counters["processed"] += len(batch)
+                    queue.counters["last_batch_seconds"] = time.monotonic() - started
+                queue.busy = False
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                timeout = self._next_wait(time.monotonic())
+                if timeout > 0:
+                    self._cond.wait(timeout)
+                    if self._stopping:
+                        return
+
+            # Release files that have settled since the last pass
+            now = time.monotonic()
+            ready = [(queue, queue.tracker.tick(now)) for queue in self._queues]
+
+            with self._cond:
+                for queue, paths in ready:
+                    for path in paths:
+                        queue.pending.setdefault(path, now)
+                self._dispatch()
+
+    def __enter__(self) -> "WatchService":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class IncrementalWatcher(WatchService):
+    """
+    Organize a single WatchRoot as files arrive.
+
+    Paths handed to submit() (usually by WatchEventHandler) wait in a
+    StabilityTracker until they settle, then are queued once no matter how
+    many events named them. Batches run one at a time, with a reconcile
+    scan every reconcile_interval seconds.
+
+    Args:
+        root: Folder to watch.
+        reconcile_interval: Seconds between full scans of the root.
+        batch_size: Maximum paths organized per batch.
+        quiet_period: Seconds a file must stay unchanged before it is moved.
+        max_pending: Queue bound (settling plus queued paths). On overflow
+            events are dropped and a reconcile scan runs once the queue has
+            drained to half.
+        backend: Event source, "native" or "poll".
+    """
+
+    def __init__(
+        self,
+        root: WatchRoot,
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        batch_size: int = BATCH_SIZE,
+        quiet_period: float = QUIET_PERIOD,
+        max_pending: int = QUEUE_LIMIT,
+        backend: str = "native"
+    ):
+        super().__init__(
+            [root], workers=1, reconcile_interval=reconcile_interval,
+            batch_size=batch_size, quiet_period=quiet_period, max_pending=max_pending,
+            backend=backend
+        )
+        self.root = root
+
+    @property
+    def tracker(self) -> StabilityTracker:
+        return self._queues[0].tracker
+
+    def metrics(self) -> dict:
+        """Queue health of the single root (see WatchService.metrics)."""
+        return super().metrics()["roots"][self.root.source_dir]
+
+    def __enter__(self) -> "IncrementalWatcher":
+        return self
+
+
+class WatchEventHandler(FileSystemEventHandler):
+    """Watchdog handler that forwards changed file paths to a watch service."""
+
+    def __init__(self, watcher: WatchService):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.submit(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.submit(event.src_path)
+
+    def on_closed(self, event):
+        # Close-after-write (inotify): the writer is done, skip the quiet period
+        if not event.is_directory:
+            self.watcher.submit(event.src_path, closed=True)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.submit(event.dest_path)